@@ -2,7 +2,8 @@
 from datetime import datetime
 from typing import List, Optional, Dict, Any
 from sqlmodel import SQLModel, Field, JSON, Column
-from sqlalchemy import BigInteger, DateTime, String
+from sqlalchemy import BigInteger, DateTime, Index, String, UniqueConstraint
+from sqlalchemy.dialects.postgresql import JSONB
 from shared.models import RunStatus, AgentStep
 
 # --- Core Tables ---
@@ -23,16 +24,33 @@ class Dossier(SQLModel, table=True):
     __tablename__ = "dossiers"
     
     run_id: str = Field(primary_key=True, foreign_key="runs.id")
-    # Store the entire complex structure as JSONB in Postgres
-    data: Dict[str, Any] = Field(default_factory=dict, sa_column=Column(JSON))
+    # Store the entire complex structure as JSONB in Postgres (sections are patched with jsonb_set)
+    data: Dict[str, Any] = Field(default_factory=dict, sa_column=Column(JSONB))
 
 class ResearchCitation(SQLModel, table=True):
     __tablename__ = "citations"
+    __table_args__ = (
+        UniqueConstraint("run_id", "url", name="citations_run_url"),
+        # Covers "runs citing domain X" without touching the heap
+        Index("citations_domain_run", "domain", "run_id"),
+    )
     
+    # One row per cited URL of a run
     id: Optional[int] = Field(default=None, primary_key=True)
     run_id: str = Field(foreign_key="runs.id")
-    # List of citation objects
-    data: List[Dict[str, Any]] = Field(default_factory=list, sa_column=Column(JSON))
+    url: str
+    title: str = ""
+    snippet: str = ""
+    # Lowercased host without "www.", indexed for cross-run lookups
+    domain: str = ""
+
+class StepCheckpoint(SQLModel, table=True):
+    __tablename__ = "step_checkpoints"
+
+    # No foreign key: a fork's checkpoints are seeded before its run row exists
+    run_id: str = Field(primary_key=True)
+    step: str = Field(primary_key=True)
+    data: Dict[str, Any] = Field(default_factory=dict, sa_column=Column(JSONB))
 
 class Artifact(SQLModel, table=True):
     __tablename__ = "artifacts"
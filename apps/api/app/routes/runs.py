@@ -4,8 +4,7 @@ import logging
 from datetime import datetime
 from typing import AsyncGenerator
 
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, HTTPException, Request
 from sse_starlette.sse import EventSourceResponse
 
 from app.models.dossier import (
@@ -16,7 +15,9 @@ from app.models.dossier import (
     AskQuestionRequest,
     AskQuestionResponse,
 )
-from app.storage import get_storage_backend
+from app.config import settings
+from app.storage import get_storage_backend, event_bus
+from app.storage.download import artifact_response
 from services.runner import WorkflowRunner
 
 logger = logging.getLogger(__name__)
@@ -55,44 +56,32 @@ async def stream_events(run_id: str):
     
     async def event_generator() -> AsyncGenerator[dict, None]:
         """Generate SSE events."""
-        last_update = None
-        max_iterations = 600
-        iteration = 0
-        
-        while iteration < max_iterations:
-            try:
-                dossier = await storage.get_dossier(run_id)
-                if not dossier:
-                    yield {
-                        "event": "error",
-                        "data": '{"message": "Run not found"}',
-                    }
-                    break
-                
-                if dossier.updated_at != last_update:
-                    yield {
-                        "event": "update",
-                        "data": dossier.model_dump_json(),
-                    }
-                    last_update = dossier.updated_at
-                
-                if dossier.status in [RunStatus.COMPLETED, RunStatus.FAILED]:
+        try:
+            async for event in event_bus.watch(
+                run_id, lambda: storage.get_dossier(run_id), settings.sse_poll_interval
+            ):
+                yield {
+                    "event": "update",
+                    "data": event.payload,
+                }
+
+                if event.status in [RunStatus.COMPLETED, RunStatus.FAILED]:
                     yield {
                         "event": "complete",
-                        "data": dossier.model_dump_json(),
+                        "data": event.payload,
                     }
-                    break
-                
-                await asyncio.sleep(1)
-                iteration += 1
-                
-            except Exception as e:
-                logger.error(f"Error streaming events: {e}")
-                yield {
-                    "event": "error",
-                    "data": f'{{"message": "{str(e)}"}}',
-                }
-                break
+                    return
+
+            yield {
+                "event": "error",
+                "data": '{"message": "Run not found"}',
+            }
+        except Exception as e:
+            logger.error(f"Error streaming events: {e}")
+            yield {
+                "event": "error",
+                "data": f'{{"message": "{str(e)}"}}',
+            }
     
     return EventSourceResponse(event_generator())
 
@@ -118,29 +107,9 @@ async def list_runs(limit: int = 20):
 
 
 @router.get("/runs/{run_id}/artifact/{filename}")
-async def download_artifact(run_id: str, filename: str):
+async def download_artifact(run_id: str, filename: str, request: Request):
     """Download an artifact (report.md or report.pdf)."""
-    storage = get_storage_backend()
-    
-    try:
-        content = await storage.get_artifact(run_id, filename)
-        
-        if filename.endswith(".md"):
-            media_type = "text/markdown"
-        elif filename.endswith(".pdf"):
-            media_type = "application/pdf"
-        else:
-            media_type = "application/octet-stream"
-        
-        return StreamingResponse(
-            iter([content]),
-            media_type=media_type,
-            headers={
-                "Content-Disposition": f"attachment; filename={run_id}_{filename}"
-            },
-        )
-    except FileNotFoundError:
-        raise HTTPException(status_code=404, detail="Artifact not found")
+    return await artifact_response(get_storage_backend(), run_id, filename, request.headers)
 
 
 @router.post("/runs/{run_id}/ask", response_model=AskQuestionResponse)
@@ -1,10 +1,45 @@
-from .base import StorageBackend
+from typing import Optional
+
+from .base import ArtifactInfo, StorageBackend, decode_cursor, encode_cursor, normalize_domain, parse_range
+from .events import DossierEvent, event_bus
 from .local import LocalStorageBackend
 
 
+_backend: Optional[StorageBackend] = None
+
+
 def get_storage_backend() -> StorageBackend:
-    """Get the appropriate storage backend. Uses local JSON storage."""
-    return LocalStorageBackend()
+    """Get the process-wide storage backend.
+
+    Uses Postgres when ``database_url`` is set, DynamoDB + S3 when
+    ``aws_dynamodb_table`` is set, local JSON storage otherwise.
+    """
+    global _backend
+    if _backend is None:
+        from app.config import settings
+
+        if settings.database_url:
+            from .postgres import PostgresStorageBackend
+            _backend = PostgresStorageBackend(settings.database_url)
+        elif settings.aws_dynamodb_table:
+            from .aws import AWSStorageBackend
+            _backend = AWSStorageBackend()
+        else:
+            _backend = LocalStorageBackend(
+                compact_json=settings.storage_compact_json,
+                fsync=settings.storage_fsync,
+            )
+    return _backend
 
 
-__all__ = ["StorageBackend", "get_storage_backend"]
+__all__ = [
+    "StorageBackend",
+    "ArtifactInfo",
+    "get_storage_backend",
+    "encode_cursor",
+    "decode_cursor",
+    "normalize_domain",
+    "parse_range",
+    "DossierEvent",
+    "event_bus",
+]
@@ -1,122 +1,525 @@
 """AWS storage backend (DynamoDB + S3)."""
+import asyncio
+import functools
+import gzip
+import hashlib
 import json
-from typing import List, Optional
+import logging
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional
 
 import boto3
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+from botocore.config import Config
 from botocore.exceptions import ClientError
 
-from .base import StorageBackend
-from app.models.dossier import StartupDossier
+from .base import ARTIFACT_CHUNK_SIZE, ArtifactInfo, StorageBackend, artifact_content_type, decode_cursor, sortable_timestamp
+from .events import event_bus
+from shared.models import VentureDossier
 from app.config import settings
 
+logger = logging.getLogger(__name__)
+
+# GSI listing runs newest-first: one partition per creation month, sorted by
+# "<created_at>#<run_id>" so the sort key is unique and doubles as the cursor.
+RUNS_INDEX = "created-bucket-index"
+
+# Dossier sections stored as gzipped JSON objects in S3; everything else stays
+# in the DynamoDB item.
+SECTIONS = (
+    "clarification",
+    "market_research",
+    "competitive_analysis",
+    "strategy",
+    "vc_interview",
+    "funding_strategy",
+    "scorecard",
+)
+
+# Seconds this process trusts its own upload of a section object and skips
+# re-uploading it; collect_sections never deletes objects younger than this
+UPLOAD_MEMORY_SECONDS = 3600.0
+
+# Step checkpoints live under their own key prefix, not next to a run's artifacts
+CHECKPOINT_PREFIX = "checkpoints/"
+
+
+def _bucket(created_at: str) -> str:
+    return created_at[:7]
+
+
+def _previous_bucket(bucket: str) -> str:
+    year, month = int(bucket[:4]), int(bucket[5:7])
+    year, month = (year - 1, 12) if month == 1 else (year, month - 1)
+    return f"{year:04d}-{month:02d}"
+
 
 class AWSStorageBackend(StorageBackend):
-    """AWS DynamoDB + S3 storage."""
-    
-    def __init__(self):
-        self.dynamodb = boto3.resource(
-            "dynamodb",
-            region_name=settings.aws_region,
-            aws_access_key_id=settings.aws_access_key_id,
-            aws_secret_access_key=settings.aws_secret_access_key,
+    """AWS DynamoDB + S3 storage.
+
+    ``list_runs`` queries the monthly ``created_bucket`` partitions of the
+    runs index newest-first, walking back at most ``aws_list_lookback_months``
+    months, so a page costs reads proportional to its size rather than to
+    the table.
+
+    Dossiers are split: the DynamoDB item holds the small, hot fields (status,
+    current_step, timestamps) plus a ``sections`` map of section name to the
+    SHA-256 of its JSON, and each section lives gzipped in S3 under that
+    digest. Content addressing makes unchanged sections free to save and
+    lets loaded sections be cached indefinitely, so ``get_dossier`` only
+    fetches sections that changed, and only the ones the caller asks for.
+    Identical sections are shared between saves and runs, so objects are
+    never deleted on save; ``collect_sections`` sweeps the ones no item
+    references any more (earlier versions of a section saved mid-run).
+    Items written before the split, with sections inline, are still read.
+
+    boto3 is blocking, so every call runs on a bounded thread pool sized to
+    the clients' connection pools; the event loop only awaits the result.
+    Low-level clients are used because, unlike boto3 resources, they are
+    safe to share between threads.
+    """
+
+    def __init__(self, table_name: Optional[str] = None, bucket_name: Optional[str] = None):
+        config = Config(
+            max_pool_connections=settings.aws_max_pool_connections,
+            connect_timeout=settings.aws_connect_timeout,
+            read_timeout=settings.aws_read_timeout,
+            retries={"mode": settings.aws_retry_mode, "max_attempts": settings.aws_max_attempts},
         )
-        self.s3 = boto3.client(
-            "s3",
-            region_name=settings.aws_region,
-            aws_access_key_id=settings.aws_access_key_id,
-            aws_secret_access_key=settings.aws_secret_access_key,
+        credentials = {
+            "region_name": settings.aws_region,
+            "aws_access_key_id": settings.aws_access_key_id,
+            "aws_secret_access_key": settings.aws_secret_access_key,
+            "config": config,
+        }
+        self.dynamodb = boto3.client("dynamodb", endpoint_url=settings.aws_dynamodb_endpoint_url, **credentials)
+        self.s3 = boto3.client("s3", **credentials)
+        self.table_name = table_name or settings.aws_dynamodb_table
+        self.bucket_name = bucket_name or settings.aws_s3_bucket
+        self.lookback_months = settings.aws_list_lookback_months
+        self._executor = ThreadPoolExecutor(
+            max_workers=settings.aws_max_pool_connections, thread_name_prefix="aws-storage"
         )
-        self.table_name = settings.aws_dynamodb_table
-        self.bucket_name = settings.aws_s3_bucket
-    
+        self._serializer = TypeSerializer()
+        self._deserializer = TypeDeserializer()
+        # digest -> parsed section JSON; entries never go stale
+        self._sections: "OrderedDict[str, Any]" = OrderedDict()
+        self._section_cache_size = settings.aws_section_cache_entries
+        # digest -> when this process uploaded it, so unchanged sections are not re-uploaded
+        self._uploaded: "OrderedDict[str, float]" = OrderedDict()
+
+    async def _call(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run a blocking boto3 call on the storage thread pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+
     async def initialize(self):
         """Verify AWS resources exist."""
+        await self._call(self._ensure_table)
+        await self._call(self._ensure_bucket)
+        if not await self._call(self._has_runs_index):
+            logger.warning(
+                f"DynamoDB table {self.table_name} has no {RUNS_INDEX}; "
+                "run migrate_run_index() before listing runs"
+            )
+
+    async def close(self):
+        """Wait for in-flight calls and stop the thread pool."""
+        await asyncio.get_running_loop().run_in_executor(
+            None, functools.partial(self._executor.shutdown, wait=True)
+        )
+
+    def _ensure_table(self):
         try:
-            self.table = self.dynamodb.Table(self.table_name)
-            self.table.load()
+            self.dynamodb.describe_table(TableName=self.table_name)
         except ClientError as e:
-            if e.response["Error"]["Code"] == "ResourceNotFoundException":
-                self.table = self.dynamodb.create_table(
-                    TableName=self.table_name,
-                    KeySchema=[{"AttributeName": "run_id", "KeyType": "HASH"}],
-                    AttributeDefinitions=[
-                        {"AttributeName": "run_id", "AttributeType": "S"},
-                        {"AttributeName": "created_at", "AttributeType": "S"},
-                    ],
-                    GlobalSecondaryIndexes=[{
-                        "IndexName": "created_at-index",
-                        "KeySchema": [{"AttributeName": "created_at", "KeyType": "HASH"}],
-                        "Projection": {"ProjectionType": "ALL"},
-                        "ProvisionedThroughput": {
-                            "ReadCapacityUnits": 5,
-                            "WriteCapacityUnits": 5,
-                        },
-                    }],
-                    BillingMode="PAY_PER_REQUEST",
-                )
-                self.table.wait_until_exists()
-    
-    async def save_dossier(self, dossier: StartupDossier):
-        """Save dossier to DynamoDB."""
-        item = json.loads(dossier.model_dump_json())
-        self.table.put_item(Item=item)
-    
-    async def get_dossier(self, run_id: str) -> Optional[StartupDossier]:
-        """Get dossier from DynamoDB."""
+            if e.response["Error"]["Code"] != "ResourceNotFoundException":
+                raise
+            self.dynamodb.create_table(
+                TableName=self.table_name,
+                KeySchema=[{"AttributeName": "run_id", "KeyType": "HASH"}],
+                AttributeDefinitions=[
+                    {"AttributeName": "run_id", "AttributeType": "S"},
+                    *self._index_attributes(),
+                ],
+                GlobalSecondaryIndexes=[self._index_definition()],
+                BillingMode="PAY_PER_REQUEST",
+            )
+            self.dynamodb.get_waiter("table_exists").wait(TableName=self.table_name)
+
+    def _ensure_bucket(self):
         try:
-            response = self.table.get_item(Key={"run_id": run_id})
-            if "Item" in response:
-                return StartupDossier(**response["Item"])
-            return None
-        except ClientError:
-            return None
-    
-    async def list_runs(self, limit: int = 20) -> List[dict]:
-        """List recent runs from DynamoDB."""
+            self.s3.head_bucket(Bucket=self.bucket_name)
+        except ClientError as e:
+            if e.response["Error"]["Code"] not in ("404", "NoSuchBucket"):
+                raise
+            extra = {}
+            if settings.aws_region != "us-east-1":
+                extra["CreateBucketConfiguration"] = {"LocationConstraint": settings.aws_region}
+            self.s3.create_bucket(Bucket=self.bucket_name, **extra)
+
+    async def save_dossier(self, dossier: VentureDossier):
+        """Upload changed sections to S3, then write the metadata item."""
+        doc = dossier.model_dump(mode="json")
+        digests, uploads, uploaded = {}, [], []
+        now = time.monotonic()
+        for name in SECTIONS:
+            value = doc.pop(name)
+            if value is None:
+                continue
+            body = json.dumps(value, separators=(",", ":"), sort_keys=True).encode("utf-8")
+            digest = hashlib.sha256(body).hexdigest()
+            digests[name] = digest
+            if now - self._uploaded.get(digest, -UPLOAD_MEMORY_SECONDS) >= UPLOAD_MEMORY_SECONDS:
+                uploads.append(self._call(self._put_section, digest, body))
+                uploaded.append(digest)
+            self._remember(digest, value)
+        # Sections land before the item that points at them
+        await asyncio.gather(*uploads)
+        for digest in uploaded:
+            self._mark_uploaded(digest, now)
+
+        item = json.loads(json.dumps(doc), parse_float=Decimal)
+        item["sections"] = digests
+        item.update(self._index_keys(dossier.created_at, dossier.run_id))
+        await self._call(self.dynamodb.put_item, TableName=self.table_name, Item=self._serialize(item))
+        event_bus.publish(dossier)
+
+    async def get_dossier(
+        self, run_id: str, sections: Optional[Iterable[str]] = None
+    ) -> Optional[VentureDossier]:
+        """Read the metadata item and load its sections, from cache where possible.
+
+        Only ``sections`` (all by default) are fetched; the others are left unset.
+        """
         try:
-            response = self.table.scan(Limit=limit)
-            items = response.get("Items", [])
-            items.sort(key=lambda x: x.get("created_at", ""), reverse=True)
-            
-            return [
-                {
-                    "run_id": item["run_id"],
-                    "raw_idea": item["raw_idea"],
-                    "status": item["status"],
-                    "created_at": item["created_at"],
-                }
-                for item in items[:limit]
-            ]
+            response = await self._call(
+                self.dynamodb.get_item, TableName=self.table_name, Key=self._serialize({"run_id": run_id})
+            )
         except ClientError:
-            return []
-    
+            return None
+        if "Item" not in response:
+            return None
+
+        item = self._deserialize(response["Item"])
+        digests = item.pop("sections", None) or {}
+        if sections is not None:
+            wanted = set(sections)
+            digests = {name: digest for name, digest in digests.items() if name in wanted}
+        # Built locally: remembering one section may evict another just loaded
+        values = {}
+        for digest in set(digests.values()):
+            if digest in self._sections:
+                self._sections.move_to_end(digest)
+                values[digest] = self._sections[digest]
+        missing = [d for d in set(digests.values()) if d not in values]
+        loaded = await asyncio.gather(*(self._call(self._get_section, d) for d in missing))
+        for digest, value in zip(missing, loaded):
+            values[digest] = value
+            self._remember(digest, value)
+        for name, digest in digests.items():
+            item[name] = values[digest]
+        return VentureDossier.model_validate(item)
+
+    @staticmethod
+    def _section_key(digest: str) -> str:
+        return f"sections/{digest[:2]}/{digest}.json.gz"
+
+    def _put_section(self, digest: str, body: bytes):
+        self.s3.put_object(
+            Bucket=self.bucket_name,
+            Key=self._section_key(digest),
+            Body=gzip.compress(body, compresslevel=6),
+            ContentType="application/json",
+            ContentEncoding="gzip",
+        )
+
+    def _get_section(self, digest: str) -> Any:
+        response = self.s3.get_object(Bucket=self.bucket_name, Key=self._section_key(digest))
+        return json.loads(gzip.decompress(response["Body"].read()))
+
+    def _remember(self, digest: str, value: Any):
+        self._sections[digest] = value
+        self._sections.move_to_end(digest)
+        while len(self._sections) > self._section_cache_size:
+            self._sections.popitem(last=False)
+
+    def _mark_uploaded(self, digest: str, when: float):
+        self._uploaded[digest] = when
+        self._uploaded.move_to_end(digest)
+        while len(self._uploaded) > self._section_cache_size * 4:
+            self._uploaded.popitem(last=False)
+
+    async def list_runs(
+        self, limit: int = 20, status: Optional[str] = None, cursor: Optional[str] = None
+    ) -> List[dict]:
+        """List recent runs by querying the monthly index partitions newest-first."""
+        before = decode_cursor(cursor) if cursor else None
+        return await self._call(self._list_runs, limit, status, before)
+
+    def _list_runs(self, limit: int, status: Optional[str], before: Optional[tuple]) -> List[dict]:
+        if before:
+            created_at, run_id = before
+            bucket, before_key = _bucket(created_at), f"{created_at}#{run_id}"
+        else:
+            bucket, before_key = _bucket(sortable_timestamp(datetime.utcnow())), None
+
+        runs: List[dict] = []
+        for _ in range(self.lookback_months):
+            query: Dict[str, Any] = {
+                "TableName": self.table_name,
+                "IndexName": RUNS_INDEX,
+                "KeyConditionExpression": "created_bucket = :bucket",
+                "ExpressionAttributeValues": {":bucket": {"S": bucket}},
+                "ScanIndexForward": False,
+            }
+            if before_key:
+                query["KeyConditionExpression"] += " AND created_key < :before"
+                query["ExpressionAttributeValues"][":before"] = {"S": before_key}
+            if status:
+                # "status" is a DynamoDB reserved word
+                query["FilterExpression"] = "#status = :status"
+                query["ExpressionAttributeNames"] = {"#status": "status"}
+                query["ExpressionAttributeValues"][":status"] = {"S": status}
+
+            while len(runs) < limit:
+                # With a status filter a page may come back short; keep reading
+                response = self.dynamodb.query(Limit=limit - len(runs), **query)
+                runs.extend(self._summary(self._deserialize(item)) for item in response.get("Items", []))
+                if "LastEvaluatedKey" not in response:
+                    break
+                query["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+            if len(runs) >= limit:
+                break
+            bucket, before_key = _previous_bucket(bucket), None
+        return runs[:limit]
+
+    async def migrate_run_index(self) -> int:
+        """Add the runs index to an existing table and backfill its keys.
+
+        Safe to re-run: items that already carry index keys are skipped.
+        """
+        return await self._call(self._migrate_run_index)
+
+    def _migrate_run_index(self) -> int:
+        if not self._has_runs_index():
+            self.dynamodb.update_table(
+                TableName=self.table_name,
+                AttributeDefinitions=self._index_attributes(),
+                GlobalSecondaryIndexUpdates=[{"Create": self._index_definition()}],
+            )
+            logger.info(f"Creating {RUNS_INDEX} on {self.table_name}")
+
+        scan = {"TableName": self.table_name, "ProjectionExpression": "run_id, created_at, created_key"}
+        updated = 0
+        while True:
+            response = self.dynamodb.scan(**scan)
+            for raw in response.get("Items", []):
+                item = self._deserialize(raw)
+                if "created_key" in item or "created_at" not in item:
+                    continue
+                keys = self._index_keys(datetime.fromisoformat(item["created_at"]), item["run_id"])
+                self.dynamodb.update_item(
+                    TableName=self.table_name,
+                    Key=self._serialize({"run_id": item["run_id"]}),
+                    UpdateExpression="SET created_bucket = :b, created_key = :k",
+                    ExpressionAttributeValues={
+                        ":b": {"S": keys["created_bucket"]},
+                        ":k": {"S": keys["created_key"]},
+                    },
+                )
+                updated += 1
+            if "LastEvaluatedKey" not in response:
+                break
+            scan["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+        logger.info(f"Backfilled run index keys on {updated} items")
+        return updated
+
+    async def collect_sections(self, grace_seconds: float = 86400.0) -> int:
+        """Delete section objects no run item references; returns how many.
+
+        Objects younger than ``grace_seconds`` are kept, since a save uploads
+        its sections before writing the item that points at them and skips
+        re-uploading objects it wrote within ``UPLOAD_MEMORY_SECONDS``. Safe
+        to run while the API and workers are serving.
+        """
+        if grace_seconds < UPLOAD_MEMORY_SECONDS:
+            raise ValueError(f"grace_seconds must be at least {UPLOAD_MEMORY_SECONDS:.0f}")
+        return await self._call(self._collect_sections, grace_seconds)
+
+    def _collect_sections(self, grace_seconds: float) -> int:
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=grace_seconds)
+        referenced = set()
+        scan = {"TableName": self.table_name, "ProjectionExpression": "sections"}
+        while True:
+            response = self.dynamodb.scan(**scan)
+            for raw in response.get("Items", []):
+                referenced.update((self._deserialize(raw).get("sections") or {}).values())
+            if "LastEvaluatedKey" not in response:
+                break
+            scan["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+        stale = []
+        for page in self.s3.get_paginator("list_objects_v2").paginate(Bucket=self.bucket_name, Prefix="sections/"):
+            for obj in page.get("Contents", []):
+                digest = obj["Key"].rsplit("/", 1)[-1].split(".", 1)[0]
+                if digest not in referenced and obj["LastModified"] < cutoff:
+                    stale.append(obj["Key"])
+        for start in range(0, len(stale), 1000):
+            self.s3.delete_objects(
+                Bucket=self.bucket_name,
+                Delete={"Objects": [{"Key": key} for key in stale[start:start + 1000]], "Quiet": True},
+            )
+        logger.info(f"Deleted {len(stale)} unreferenced section objects")
+        return len(stale)
+
+    def _has_runs_index(self) -> bool:
+        table = self.dynamodb.describe_table(TableName=self.table_name)["Table"]
+        indexes = table.get("GlobalSecondaryIndexes", [])
+        return any(index["IndexName"] == RUNS_INDEX for index in indexes)
+
+    def _serialize(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        return {key: self._serializer.serialize(value) for key, value in item.items()}
+
+    def _deserialize(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        return {key: self._deserializer.deserialize(value) for key, value in item.items()}
+
+    @staticmethod
+    def _index_keys(created_at: datetime, run_id: str) -> dict:
+        stamp = sortable_timestamp(created_at)
+        return {"created_bucket": _bucket(stamp), "created_key": f"{stamp}#{run_id}"}
+
+    @staticmethod
+    def _index_attributes() -> List[dict]:
+        return [
+            {"AttributeName": "created_bucket", "AttributeType": "S"},
+            {"AttributeName": "created_key", "AttributeType": "S"},
+        ]
+
+    @staticmethod
+    def _index_definition() -> dict:
+        return {
+            "IndexName": RUNS_INDEX,
+            "KeySchema": [
+                {"AttributeName": "created_bucket", "KeyType": "HASH"},
+                {"AttributeName": "created_key", "KeyType": "RANGE"},
+            ],
+            # Only what list_runs returns, so index writes stay small
+            "Projection": {"ProjectionType": "INCLUDE", "NonKeyAttributes": ["idea_text", "status"]},
+        }
+
+    @staticmethod
+    def _summary(item: dict) -> dict:
+        created_at, _, _ = item["created_key"].partition("#")
+        return {
+            "run_id": item["run_id"],
+            "idea_text": item["idea_text"],
+            "status": item["status"],
+            "created_at": created_at,
+        }
+
     async def save_artifact(self, run_id: str, filename: str, content: bytes):
         """Save artifact to S3."""
         key = f"{run_id}/{filename}"
-        self.s3.put_object(
+        await self._call(
+            self.s3.put_object,
             Bucket=self.bucket_name,
             Key=key,
             Body=content,
-            ContentType=self._get_content_type(filename),
+            ContentType=artifact_content_type(filename),
         )
-    
+
     async def get_artifact(self, run_id: str, filename: str) -> bytes:
         """Get artifact from S3."""
         key = f"{run_id}/{filename}"
         try:
-            response = self.s3.get_object(Bucket=self.bucket_name, Key=key)
-            return response["Body"].read()
+            return await self._call(self._read_object, key)
         except ClientError as e:
             if e.response["Error"]["Code"] == "NoSuchKey":
                 raise FileNotFoundError(f"Artifact {filename} not found for run {run_id}")
             raise
-    
-    def _get_content_type(self, filename: str) -> str:
-        """Get content type from filename."""
-        if filename.endswith(".md"):
-            return "text/markdown"
-        elif filename.endswith(".pdf"):
-            return "application/pdf"
-        elif filename.endswith(".json"):
-            return "application/json"
-        return "application/octet-stream"
+
+    def _read_object(self, key: str) -> bytes:
+        # The body streams from the socket, so read it on the pool thread too
+        response = self.s3.get_object(Bucket=self.bucket_name, Key=key)
+        return response["Body"].read()
+
+    async def save_checkpoint(self, run_id: str, step: str, checkpoint: dict):
+        """Put the checkpoint under the ``checkpoints/`` prefix, apart from the run's artifacts."""
+        await self._call(
+            self.s3.put_object,
+            Bucket=self.bucket_name,
+            Key=f"{CHECKPOINT_PREFIX}{run_id}/{step}.json",
+            Body=json.dumps(checkpoint, separators=(",", ":")).encode("utf-8"),
+            ContentType="application/json",
+        )
+
+    async def get_checkpoint(self, run_id: str, step: str) -> Optional[dict]:
+        """Read a step's checkpoint object, or None if there is none."""
+        try:
+            body = await self._call(self._read_object, f"{CHECKPOINT_PREFIX}{run_id}/{step}.json")
+        except ClientError as e:
+            if e.response["Error"]["Code"] == "NoSuchKey":
+                return None
+            raise
+        return json.loads(body)
+
+    async def stat_artifact(self, run_id: str, filename: str) -> ArtifactInfo:
+        """HEAD the artifact object."""
+        try:
+            response = await self._call(self.s3.head_object, Bucket=self.bucket_name, Key=f"{run_id}/{filename}")
+        except ClientError as e:
+            # HEAD responses carry no body, so a missing key reports as a bare 404
+            if e.response["Error"]["Code"] in ("404", "NoSuchKey"):
+                raise FileNotFoundError(f"Artifact {filename} not found for run {run_id}")
+            raise
+        return ArtifactInfo(
+            size=response["ContentLength"],
+            etag=response["ETag"].strip('"'),
+            content_type=response.get("ContentType") or artifact_content_type(filename),
+        )
+
+    async def open_artifact(
+        self, run_id: str, filename: str, start: int = 0, end: Optional[int] = None
+    ) -> AsyncIterator[bytes]:
+        """Stream the artifact from S3, asking only for the requested range."""
+        if end is not None and end <= start:
+            return
+        request = {"Bucket": self.bucket_name, "Key": f"{run_id}/{filename}"}
+        if start or end is not None:
+            request["Range"] = f"bytes={start}-{'' if end is None else end - 1}"
+        body = (await self._call(self.s3.get_object, **request))["Body"]
+        try:
+            chunks = body.iter_chunks(ARTIFACT_CHUNK_SIZE)
+            while True:
+                # Each read blocks on the socket, so it runs on the pool
+                chunk = await self._call(next, chunks, None)
+                if chunk is None:
+                    break
+                yield chunk
+        finally:
+            body.close()
+
+    async def artifact_url(self, run_id: str, filename: str, disposition: str) -> Optional[str]:
+        """Presigned GET URL, so clients download straight from S3.
+
+        The object is HEADed first so a missing artifact is still a 404 from
+        the API rather than an S3 error page.
+        """
+        if not settings.aws_s3_presign_downloads:
+            return None
+        await self.stat_artifact(run_id, filename)
+        return self.s3.generate_presigned_url(
+            "get_object",
+            Params={
+                "Bucket": self.bucket_name,
+                "Key": f"{run_id}/{filename}",
+                "ResponseContentDisposition": disposition,
+            },
+            ExpiresIn=settings.aws_s3_presign_expiry,
+        )
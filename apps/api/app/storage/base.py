@@ -1,13 +1,37 @@
 """Base storage interface."""
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import AsyncIterator, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import sqlite3
 import uuid
 
 from shared.models import VentureDossier
 
+ARTIFACT_CHUNK_SIZE = 64 * 1024
+
+
+@dataclass
+class ArtifactInfo:
+    """Size and validator of a stored artifact, enough to answer conditional and range requests."""
+
+    size: int
+    etag: str  # unquoted
+    content_type: str
+
 
 class StorageBackend(ABC):
     """Abstract storage backend."""
+
+    # Whether runs_citing_domain is served from an index of citation domains
+    indexes_citations: bool = False
     
     @abstractmethod
     async def initialize(self):
@@ -20,13 +44,27 @@ class StorageBackend(ABC):
         pass
     
     @abstractmethod
-    async def get_dossier(self, run_id: str) -> Optional[VentureDossier]:
-        """Get a dossier by run_id."""
+    async def get_dossier(
+        self, run_id: str, sections: Optional[Iterable[str]] = None
+    ) -> Optional[VentureDossier]:
+        """Get a dossier by run_id.
+
+        ``sections`` names the dossier sections the caller needs. Backends
+        that store sections separately load only those and leave the rest
+        unset; others return the whole dossier. A partial dossier is for
+        reading only: saving it would drop the sections left unset.
+        """
         pass
     
     @abstractmethod
-    async def list_runs(self, limit: int = 20) -> List[dict]:
-        """List recent runs."""
+    async def list_runs(
+        self, limit: int = 20, status: Optional[str] = None, cursor: Optional[str] = None
+    ) -> List[dict]:
+        """List recent runs, newest first.
+
+        ``cursor`` is the value of ``encode_cursor`` for the last run of the
+        previous page.
+        """
         pass
     
     @abstractmethod
@@ -38,7 +76,185 @@ class StorageBackend(ABC):
     async def get_artifact(self, run_id: str, filename: str) -> bytes:
         """Get an artifact."""
         pass
+
+    async def stat_artifact(self, run_id: str, filename: str) -> ArtifactInfo:
+        """Size, ETag and content type of an artifact.
+
+        Raises FileNotFoundError when it does not exist. This default loads
+        the artifact; backends that can stat without reading override it.
+        """
+        content = await self.get_artifact(run_id, filename)
+        return ArtifactInfo(len(content), hashlib.md5(content).hexdigest(), artifact_content_type(filename))
+
+    async def open_artifact(
+        self, run_id: str, filename: str, start: int = 0, end: Optional[int] = None
+    ) -> AsyncIterator[bytes]:
+        """Stream bytes ``start`` up to (not including) ``end`` of an artifact.
+
+        Call ``stat_artifact`` first: errors here surface only once the
+        stream is iterated.
+        """
+        content = await self.get_artifact(run_id, filename)
+        yield content[start:end]
+
+    async def artifact_url(self, run_id: str, filename: str, disposition: str) -> Optional[str]:
+        """Short-lived URL clients can download the artifact from directly.
+
+        None when the backend cannot hand out such URLs, in which case the
+        API streams the artifact itself.
+        """
+        return None
     
+    @abstractmethod
+    async def save_checkpoint(self, run_id: str, step: str, checkpoint: dict):
+        """Record a pipeline step's checkpoint, replacing any earlier one.
+
+        Checkpoints are kept apart from the run's artifacts, one per step so
+        steps that finish together do not overwrite each other.
+        """
+        pass
+
+    @abstractmethod
+    async def get_checkpoint(self, run_id: str, step: str) -> Optional[dict]:
+        """The last checkpoint saved for a step, or None."""
+        pass
+
+    async def runs_citing_domain(self, domain: str, limit: int = 20) -> List[dict]:
+        """Runs with at least one citation from ``domain``, newest first.
+
+        Only available when ``indexes_citations`` is true; callers check it
+        rather than relying on this default raising.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not index citations")
+
+    async def close(self):
+        """Release connections and other resources held by the backend."""
+        pass
+
     def generate_run_id(self) -> str:
         """Generate a unique run ID."""
         return str(uuid.uuid4())
+
+
+def normalize_domain(value: str) -> str:
+    """Lowercased host of a URL or bare domain, without a leading ``www.``."""
+    value = value.strip().lower()
+    host = urlsplit(value if "//" in value else f"//{value}").hostname or ""
+    return host[4:] if host.startswith("www.") else host
+
+
+def citation_rows(dossier: VentureDossier) -> List[dict]:
+    """Citation rows for a run, one per URL (the first occurrence wins)."""
+    rows = {}
+    for section in (dossier.market_research, dossier.competitive_analysis):
+        if not section:
+            continue
+        for c in section.citations:
+            if c.url and c.url not in rows:
+                rows[c.url] = {
+                    "run_id": dossier.run_id,
+                    "url": c.url,
+                    "title": c.title,
+                    "snippet": c.snippet,
+                    "domain": normalize_domain(c.domain or c.url),
+                }
+    return list(rows.values())
+
+
+def encode_cursor(run: dict) -> str:
+    """Opaque pagination cursor pointing just past ``run``."""
+    raw = f"{run['created_at']}|{run['run_id']}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """Inverse of ``encode_cursor``: (created_at, run_id)."""
+    try:
+        created_at, run_id = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").split("|", 1)
+    except (ValueError, UnicodeError):
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    return created_at, run_id
+
+
+def sortable_timestamp(value: datetime) -> str:
+    """ISO timestamp of fixed width, so lexical order matches chronological order."""
+    return value.isoformat(timespec="microseconds")
+
+
+def open_sqlite(path: Path, schema: str) -> sqlite3.Connection:
+    """Open (creating if needed) a WAL-mode SQLite file shared across threads and processes.
+
+    The connection is in autocommit mode; callers serialise use with their
+    own lock and issue ``BEGIN``/``COMMIT`` where they need a transaction.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    # Other processes hold the write lock only briefly
+    conn.execute("PRAGMA busy_timeout=5000")
+    conn.executescript(schema)
+    return conn
+
+
+def artifact_content_type(filename: str) -> str:
+    """Content type from an artifact's extension."""
+    if filename.endswith(".md"):
+        return "text/markdown"
+    elif filename.endswith(".pdf"):
+        return "application/pdf"
+    elif filename.endswith(".json"):
+        return "application/json"
+    return "application/octet-stream"
+
+
+def file_artifact_info(file_path: Path) -> ArtifactInfo:
+    """``ArtifactInfo`` of a file on disk, with an ETag from its mtime and size."""
+    try:
+        st = os.stat(file_path)
+    except (FileNotFoundError, NotADirectoryError):
+        raise FileNotFoundError(f"Artifact {file_path} not found")
+    return ArtifactInfo(st.st_size, f"{st.st_mtime_ns:x}-{st.st_size:x}", artifact_content_type(file_path.name))
+
+
+async def iter_file(file_path: Path, start: int = 0, end: Optional[int] = None) -> AsyncIterator[bytes]:
+    """Read a byte range of a file in chunks, off the event loop."""
+    with open(file_path, "rb") as f:
+        f.seek(start)
+        remaining = None if end is None else end - start
+        while remaining is None or remaining > 0:
+            size = ARTIFACT_CHUNK_SIZE if remaining is None else min(ARTIFACT_CHUNK_SIZE, remaining)
+            chunk = await asyncio.to_thread(f.read, size)
+            if not chunk:
+                break
+            if remaining is not None:
+                remaining -= len(chunk)
+            yield chunk
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """Parse a single-range ``Range: bytes=...`` header into (start, end exclusive).
+
+    Returns None for headers that should be ignored (other units, multiple
+    ranges, malformed) and raises ValueError when the range cannot be
+    satisfied for an artifact of ``size`` bytes.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, sep, last = spec.strip().partition("-")
+    if not sep:
+        return None
+    try:
+        if first:
+            start, end = int(first), int(last) + 1 if last else size
+        else:
+            # Suffix range: the last N bytes
+            start, end = size - int(last), size
+    except ValueError:
+        return None
+    if first and (start < 0 or (last and end <= start)):
+        return None
+    if start >= size or end <= start:
+        raise ValueError(f"Unsatisfiable range: {header!r}")
+    return max(start, 0), min(end, size)
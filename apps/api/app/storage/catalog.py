@@ -0,0 +1,170 @@
+"""Embedded SQLite index of runs for fast, paginated listing."""
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+from shared.models import VentureDossier
+
+from .base import citation_rows, open_sqlite, sortable_timestamp
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    idea_text TEXT NOT NULL,
+    status TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_created ON runs (created_at DESC, run_id DESC);
+CREATE INDEX IF NOT EXISTS runs_status_created ON runs (status, created_at DESC, run_id DESC);
+CREATE TABLE IF NOT EXISTS citations (
+    run_id TEXT NOT NULL,
+    url TEXT NOT NULL,
+    domain TEXT NOT NULL,
+    PRIMARY KEY (run_id, url)
+);
+CREATE INDEX IF NOT EXISTS citations_domain ON citations (domain, run_id);
+"""
+
+# Bumped when the schema gains data that only a rebuild can fill in
+# (1: citation domains)
+CATALOG_VERSION = 1
+
+
+class RunCatalog:
+    """One row per run with the fields ``list_runs`` returns, plus the
+    domains each run cites.
+
+    Listing is newest-first with keyset pagination on (created_at, run_id),
+    so each page is an index range scan regardless of how many runs exist.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        # Set when the file predates CATALOG_VERSION and needs a rebuild
+        self.outdated = False
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = open_sqlite(self.path, SCHEMA)
+            self.outdated = conn.execute("PRAGMA user_version").fetchone()[0] < CATALOG_VERSION
+            self._conn = conn
+        return self._conn
+
+    def upsert(self, dossier: VentureDossier):
+        with self._lock:
+            conn = self.conn
+            conn.execute("BEGIN")
+            try:
+                conn.execute(
+                    """
+                    INSERT INTO runs (run_id, idea_text, status, created_at, updated_at)
+                    VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT (run_id) DO UPDATE SET
+                        status = excluded.status,
+                        updated_at = excluded.updated_at
+                    """,
+                    self._row(dossier),
+                )
+                self._write_citations(conn, dossier)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    @staticmethod
+    def _write_citations(conn: sqlite3.Connection, dossier: VentureDossier):
+        conn.execute("DELETE FROM citations WHERE run_id = ?", (dossier.run_id,))
+        conn.executemany(
+            "INSERT INTO citations (run_id, url, domain) VALUES (?, ?, ?)",
+            ((r["run_id"], r["url"], r["domain"]) for r in citation_rows(dossier) if r["domain"]),
+        )
+
+    def rebuild(self, dossiers: Iterable[VentureDossier]):
+        """Replace the index contents with the given dossiers."""
+        with self._lock:
+            conn = self.conn
+            conn.execute("BEGIN")
+            try:
+                conn.execute("DELETE FROM runs")
+                conn.execute("DELETE FROM citations")
+                for dossier in dossiers:
+                    conn.execute("INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?, ?)", self._row(dossier))
+                    self._write_citations(conn, dossier)
+                conn.execute(f"PRAGMA user_version = {CATALOG_VERSION}")
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            self.outdated = False
+
+    def count(self) -> int:
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+
+    def list(
+        self,
+        limit: int = 20,
+        status: Optional[str] = None,
+        before: Optional[Tuple[str, str]] = None,
+    ) -> List[dict]:
+        """Newest runs first, optionally filtered by status and starting after a cursor."""
+        clauses, params = [], []
+        if status:
+            clauses.append("status = ?")
+            params.append(status)
+        if before:
+            clauses.append("(created_at, run_id) < (?, ?)")
+            params.extend(before)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        params.append(limit)
+        with self._lock:
+            rows = self.conn.execute(
+                f"""
+                SELECT run_id, idea_text, status, created_at FROM runs {where}
+                ORDER BY created_at DESC, run_id DESC LIMIT ?
+                """,
+                params,
+            ).fetchall()
+        return [
+            {"run_id": r[0], "idea_text": r[1], "status": r[2], "created_at": r[3]}
+            for r in rows
+        ]
+
+    def runs_citing(self, domain: str, limit: int = 20) -> List[dict]:
+        """Runs citing ``domain`` (already normalized), newest first, with their citation counts."""
+        with self._lock:
+            rows = self.conn.execute(
+                """
+                SELECT r.run_id, r.idea_text, r.status, r.created_at, COUNT(*)
+                FROM citations c JOIN runs r ON r.run_id = c.run_id
+                WHERE c.domain = ?
+                GROUP BY r.run_id
+                ORDER BY r.created_at DESC, r.run_id DESC
+                LIMIT ?
+                """,
+                (domain, limit),
+            ).fetchall()
+        return [
+            {"run_id": r[0], "idea_text": r[1], "status": r[2], "created_at": r[3], "citations": r[4]}
+            for r in rows
+        ]
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    @staticmethod
+    def _row(dossier: VentureDossier) -> tuple:
+        return (
+            dossier.run_id,
+            dossier.idea_text,
+            dossier.status.value,
+            sortable_timestamp(dossier.created_at),
+            sortable_timestamp(dossier.updated_at),
+        )
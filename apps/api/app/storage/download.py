@@ -0,0 +1,58 @@
+"""HTTP responses for artifact downloads, shared by the API routes."""
+from typing import Mapping
+
+from fastapi import HTTPException
+from fastapi.responses import RedirectResponse, Response, StreamingResponse
+
+from .base import StorageBackend, parse_range
+
+
+async def artifact_response(
+    storage: StorageBackend, run_id: str, filename: str, headers: Mapping[str, str]
+) -> Response:
+    """Answer a download request for an artifact.
+
+    Redirects to a presigned URL when the backend offers one (S3);
+    otherwise streams the artifact, honouring ``Range``, ``If-Range`` and
+    ``If-None-Match`` from the request ``headers``. Raises a 404
+    HTTPException for missing artifacts.
+    """
+    # Path segments cannot contain "/", but ".." would still escape the run's directory
+    if run_id.startswith(".") or filename.startswith("."):
+        raise HTTPException(status_code=404, detail="Artifact not found")
+    disposition = f"attachment; filename={run_id}_{filename}"
+
+    try:
+        url = await storage.artifact_url(run_id, filename, disposition)
+        if url:
+            return RedirectResponse(url, status_code=307)
+        info = await storage.stat_artifact(run_id, filename)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Artifact not found")
+
+    etag = f'"{info.etag}"'
+    if_none_match = headers.get("if-none-match")
+    if if_none_match and (if_none_match.strip() == "*" or etag in [t.strip() for t in if_none_match.split(",")]):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    response_headers = {"Content-Disposition": disposition, "ETag": etag, "Accept-Ranges": "bytes"}
+    start, end, status_code = 0, info.size, 200
+    range_header = headers.get("range")
+    # A stale If-Range means the client's partial copy is outdated: send it all
+    if range_header and headers.get("if-range", etag) == etag:
+        try:
+            byte_range = parse_range(range_header, info.size)
+        except ValueError:
+            return Response(status_code=416, headers={"Content-Range": f"bytes */{info.size}"})
+        if byte_range:
+            start, end = byte_range
+            status_code = 206
+            response_headers["Content-Range"] = f"bytes {start}-{end - 1}/{info.size}"
+    response_headers["Content-Length"] = str(end - start)
+
+    return StreamingResponse(
+        storage.open_artifact(run_id, filename, start, end),
+        status_code=status_code,
+        media_type=info.content_type,
+        headers=response_headers,
+    )
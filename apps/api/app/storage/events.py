@@ -0,0 +1,157 @@
+"""In-process pub/sub for dossier changes, used to drive SSE streams."""
+import asyncio
+import json
+import logging
+import uuid
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, List, Optional
+
+from shared.models import VentureDossier
+from .jsonpatch import make_patch
+
+logger = logging.getLogger(__name__)
+
+# Events kept per run so lagging or reconnecting watchers can replay patches.
+HISTORY_SIZE = 32
+
+
+@dataclass(frozen=True)
+class DossierEvent:
+    """A dossier change, serialized once and shared by every watcher of the run.
+
+    ``payload`` is the full dossier JSON. ``patch`` holds the RFC 6902
+    operations (as a JSON array) that turn the previous event's dossier into
+    this one; it is None for the first event of a channel.
+    """
+
+    epoch: str
+    seq: int
+    status: str
+    current_step: Optional[str]
+    updated_at: datetime
+    payload: str
+    patch: Optional[str]
+
+    @property
+    def event_id(self) -> str:
+        return f"{self.epoch}:{self.seq}"
+
+
+class _Channel:
+    def __init__(self):
+        self.epoch = uuid.uuid4().hex[:8]
+        self.latest: Optional[DossierEvent] = None
+        self.history: Deque[DossierEvent] = deque(maxlen=HISTORY_SIZE)
+        self.changed = asyncio.Event()
+        self.subscribers = 0
+        self._doc: Optional[Dict[str, Any]] = None
+
+    def update(self, dossier: VentureDossier):
+        doc = dossier.model_dump(mode="json")
+        patch = None
+        if self._doc is not None:
+            patch = json.dumps(make_patch(self._doc, doc), separators=(",", ":"))
+        self._doc = doc
+
+        seq = self.latest.seq + 1 if self.latest else 0
+        self.latest = DossierEvent(
+            epoch=self.epoch,
+            seq=seq,
+            status=dossier.status,
+            current_step=dossier.current_step,
+            updated_at=dossier.updated_at,
+            payload=json.dumps(doc, separators=(",", ":")),
+            patch=patch,
+        )
+        self.history.append(self.latest)
+        changed, self.changed = self.changed, asyncio.Event()
+        changed.set()
+
+    def since(self, seq: int) -> Optional[List[DossierEvent]]:
+        """Events after ``seq``, or None if some have already left the history."""
+        if not self.history or self.history[0].seq > seq + 1:
+            return None
+        return [e for e in self.history if e.seq > seq]
+
+
+class DossierEventBus:
+    """Fan dossier saves out to the SSE watchers of the same run.
+
+    Saves for runs nobody is watching cost a dict lookup. Watchers fall back
+    to re-reading storage every ``poll_interval`` seconds so changes written
+    by other processes are still picked up.
+    """
+
+    def __init__(self):
+        self._channels: Dict[str, _Channel] = {}
+
+    def publish(self, dossier: VentureDossier):
+        """Record a new dossier state and wake its watchers."""
+        channel = self._channels.get(dossier.run_id)
+        if channel is not None:
+            channel.update(dossier)
+
+    def watcher_count(self, run_id: str) -> int:
+        channel = self._channels.get(run_id)
+        return channel.subscribers if channel else 0
+
+    async def watch(
+        self,
+        run_id: str,
+        fetch: Callable[[], Awaitable[Optional[VentureDossier]]],
+        poll_interval: float = 15.0,
+        replay: bool = False,
+        last_event_id: Optional[str] = None,
+    ) -> AsyncIterator[DossierEvent]:
+        """Yield the current dossier, then every change to it.
+
+        Stops without yielding if the run does not exist. By default watchers
+        that fall behind skip straight to the latest state; with ``replay``
+        they receive every event still in the history, and a ``last_event_id``
+        from the same channel resumes after that event instead of starting
+        from the current state.
+        """
+        channel = self._channels.setdefault(run_id, _Channel())
+        channel.subscribers += 1
+        try:
+            if channel.latest is None:
+                dossier = await fetch()
+                if dossier is None:
+                    return
+                if channel.latest is None:
+                    channel.update(dossier)
+
+            last_seq = -1
+            if replay and last_event_id:
+                epoch, _, seq = last_event_id.partition(":")
+                if epoch == channel.epoch and seq.isdigit():
+                    last_seq = int(seq)
+
+            while True:
+                event = channel.latest
+                if event.seq != last_seq:
+                    missed = channel.since(last_seq) if replay and last_seq >= 0 else None
+                    for event in missed or [event]:
+                        last_seq = event.seq
+                        yield event
+                    continue
+
+                try:
+                    await asyncio.wait_for(channel.changed.wait(), poll_interval)
+                except asyncio.TimeoutError:
+                    dossier = await fetch()
+                    if dossier is None:
+                        return
+                    if (dossier.updated_at, dossier.status, dossier.current_step) != (
+                        event.updated_at, event.status, event.current_step
+                    ):
+                        channel.update(dossier)
+        finally:
+            channel.subscribers -= 1
+            if channel.subscribers == 0 and self._channels.get(run_id) is channel:
+                del self._channels[run_id]
+
+
+event_bus = DossierEventBus()
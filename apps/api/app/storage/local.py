@@ -1,58 +1,135 @@
 """Local filesystem storage backend."""
 import json
+import logging
+import os
+import tempfile
 from pathlib import Path
-from typing import List, Optional
+from typing import AsyncIterator, Iterable, List, Optional
 
-from .base import StorageBackend
+try:
+    import orjson
+except ImportError:  # optional fast encoder
+    orjson = None
+
+from .base import ArtifactInfo, StorageBackend, decode_cursor, file_artifact_info, iter_file, normalize_domain
+from .catalog import RunCatalog
+from .events import event_bus
 from shared.models import VentureDossier
 
+logger = logging.getLogger(__name__)
+
+FSYNC_POLICIES = ("none", "file", "full")
+
 
 class LocalStorageBackend(StorageBackend):
-    """Local filesystem storage."""
+    """Local filesystem storage.
+
+    Dossiers are written to a temporary file and renamed into place, so
+    readers never see a partial file and a crash leaves the previous version
+    intact. ``fsync`` controls durability: "none" leaves flushing to the OS,
+    "file" syncs the data before the rename, "full" also syncs the directory
+    so the rename itself survives power loss.
+    """
+
+    indexes_citations = True
 
-    def __init__(self, base_path: str = "./artifacts"):
+    def __init__(self, base_path: str = "./artifacts", compact_json: bool = False, fsync: str = "none"):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"fsync must be one of {FSYNC_POLICIES}, got {fsync!r}")
         self.base_path = Path(base_path)
         self.runs_path = self.base_path / "runs"
         self.artifacts_path = self.base_path / "artifacts"
+        self.cache_path = self.base_path / "cache"
+        self.checkpoints_path = self.base_path / "checkpoints"
+        self.compact_json = compact_json
+        self.fsync = fsync
+        self.catalog = RunCatalog(self.runs_path / "catalog.sqlite3")
 
     async def initialize(self):
         """Create directories."""
         self.runs_path.mkdir(parents=True, exist_ok=True)
         self.artifacts_path.mkdir(parents=True, exist_ok=True)
+        run_files = sum(1 for _ in self.runs_path.glob("*.json"))
+        if run_files != self.catalog.count() or self.catalog.outdated:
+            self.rebuild_catalog()
+
+    async def close(self):
+        """Close the catalog connection."""
+        self.catalog.close()
 
     async def save_dossier(self, dossier: VentureDossier):
         """Save dossier as JSON file."""
         file_path = self.runs_path / f"{dossier.run_id}.json"
-        with open(file_path, "w") as f:
-            json.dump(dossier.model_dump(mode="json"), f, indent=2, default=str)
+        self._atomic_write(file_path, self._encode(dossier))
+        self.catalog.upsert(dossier)
+        event_bus.publish(dossier)
 
-    async def get_dossier(self, run_id: str) -> Optional[VentureDossier]:
+    async def get_dossier(
+        self, run_id: str, sections: Optional[Iterable[str]] = None
+    ) -> Optional[VentureDossier]:
         """Load dossier from JSON file."""
         file_path = self.runs_path / f"{run_id}.json"
-        if not file_path.exists():
+        try:
+            with open(file_path, "rb") as f:
+                raw = f.read()
+        except FileNotFoundError:
             return None
+        data = orjson.loads(raw) if orjson is not None else json.loads(raw)
+        return VentureDossier.model_validate(data)
+
+    def _encode(self, dossier: VentureDossier) -> bytes:
+        if orjson is not None:
+            option = 0 if self.compact_json else orjson.OPT_INDENT_2
+            return orjson.dumps(dossier.model_dump(mode="json"), option=option)
+        return dossier.model_dump_json(indent=None if self.compact_json else 2).encode("utf-8")
+
+    def _atomic_write(self, file_path: Path, content: bytes):
+        fd, tmp_name = tempfile.mkstemp(dir=file_path.parent, prefix=f".{file_path.stem}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(content)
+                if self.fsync != "none":
+                    f.flush()
+                    os.fsync(f.fileno())
+            os.replace(tmp_name, file_path)
+        except BaseException:
+            try:
+                os.unlink(tmp_name)
+            except FileNotFoundError:
+                pass
+            raise
+        if self.fsync == "full":
+            dir_fd = os.open(file_path.parent, os.O_RDONLY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
 
-        with open(file_path, "r") as f:
-            data = json.load(f)
-            return VentureDossier(**data)
-
-    async def list_runs(self, limit: int = 20) -> List[dict]:
-        """List recent runs."""
-        runs = []
-        for file_path in sorted(
-            self.runs_path.glob("*.json"),
-            key=lambda p: p.stat().st_mtime,
-            reverse=True,
-        )[:limit]:
-            with open(file_path, "r") as f:
-                data = json.load(f)
-                runs.append({
-                    "run_id": data["run_id"],
-                    "idea_text": data.get("idea_text", ""),
-                    "status": data["status"],
-                    "created_at": data.get("created_at", ""),
-                })
-        return runs
+    async def list_runs(
+        self, limit: int = 20, status: Optional[str] = None, cursor: Optional[str] = None
+    ) -> List[dict]:
+        """List recent runs from the catalog index."""
+        before = decode_cursor(cursor) if cursor else None
+        return self.catalog.list(limit=limit, status=status, before=before)
+
+    async def runs_citing_domain(self, domain: str, limit: int = 20) -> List[dict]:
+        """Runs citing ``domain``, newest first, served from the catalog's domain index."""
+        return self.catalog.runs_citing(normalize_domain(domain), limit=limit)
+
+    def rebuild_catalog(self):
+        """Re-index every dossier file (used when the catalog is missing or stale)."""
+        def dossiers():
+            for file_path in self.runs_path.glob("*.json"):
+                try:
+                    with open(file_path, "rb") as f:
+                        raw = f.read()
+                    data = orjson.loads(raw) if orjson is not None else json.loads(raw)
+                    yield VentureDossier.model_validate(data)
+                except (OSError, ValueError) as e:
+                    logger.warning(f"Skipping unreadable dossier {file_path.name}: {e}")
+
+        self.catalog.rebuild(dossiers())
+        logger.info(f"Run catalog rebuilt with {self.catalog.count()} runs")
 
     async def save_artifact(self, run_id: str, filename: str, content: bytes):
         """Save artifact to filesystem."""
@@ -69,3 +146,27 @@ class LocalStorageBackend(StorageBackend):
             raise FileNotFoundError(f"Artifact {filename} not found for run {run_id}")
         with open(file_path, "rb") as f:
             return f.read()
+
+    async def save_checkpoint(self, run_id: str, step: str, checkpoint: dict):
+        """Write the checkpoint under ``checkpoints/<run_id>/``, outside the artifacts."""
+        run_dir = self.checkpoints_path / run_id
+        run_dir.mkdir(parents=True, exist_ok=True)
+        self._atomic_write(run_dir / f"{step}.json", json.dumps(checkpoint, separators=(",", ":")).encode("utf-8"))
+
+    async def get_checkpoint(self, run_id: str, step: str) -> Optional[dict]:
+        """Read a step's checkpoint file, or None if there is none."""
+        try:
+            return json.loads((self.checkpoints_path / run_id / f"{step}.json").read_bytes())
+        except FileNotFoundError:
+            return None
+
+    async def stat_artifact(self, run_id: str, filename: str) -> ArtifactInfo:
+        """Stat the artifact file without reading it."""
+        return file_artifact_info(self.artifacts_path / run_id / filename)
+
+    async def open_artifact(
+        self, run_id: str, filename: str, start: int = 0, end: Optional[int] = None
+    ) -> AsyncIterator[bytes]:
+        """Stream the artifact file in chunks."""
+        async for chunk in iter_file(self.artifacts_path / run_id / filename, start, end):
+            yield chunk
@@ -1,88 +1,239 @@
-"""PostgreSQL storage backend using SQLModel."""
+"""PostgreSQL storage backend using SQLModel on an async SQLAlchemy engine."""
+import hashlib
 import json
 import logging
-from typing import List, Optional
+import os
+from collections import OrderedDict
+from pathlib import Path
+from typing import AsyncIterator, Iterable, List, Optional
 from datetime import datetime
 
-from sqlmodel import Session, create_engine, select, SQLModel
-from sqlalchemy.orm import sessionmaker
+from sqlmodel import SQLModel, select
+from sqlalchemy import Text, cast, delete, func, literal, text, tuple_, update
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, array, insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
 from app.config import settings
-from .base import StorageBackend
+from .base import (
+    ArtifactInfo,
+    StorageBackend,
+    citation_rows,
+    decode_cursor,
+    file_artifact_info,
+    iter_file,
+    normalize_domain,
+)
+from .events import event_bus
 from shared.models import VentureDossier, RunStatus
-from app.models.dossier import Run, Dossier, ResearchCitation, Artifact
+from app.models.dossier import Run, Dossier, ResearchCitation, Artifact, StepCheckpoint
 
 logger = logging.getLogger(__name__)
 
+# Rows per multi-VALUES citation insert (asyncpg caps a statement at 32767 parameters)
+CITATION_BATCH = 1000
+
+
+def _async_url(db_url: str) -> str:
+    """Point a plain postgres:// URL at the asyncpg driver."""
+    for prefix in ("postgresql+psycopg2://", "postgresql://", "postgres://"):
+        if db_url.startswith(prefix):
+            return "postgresql+asyncpg://" + db_url[len(prefix):]
+    return db_url
+
 
 class PostgresStorageBackend(StorageBackend):
-    """PostgreSQL storage backend."""
-    
+    """PostgreSQL storage backend.
+
+    Dossier saves only ship the sections that changed since the last save
+    from this process, applied with ``jsonb_set`` and guarded on the stored
+    ``updated_at`` still being the one this process wrote. The first save of
+    a run, one after a restart, or one after another process (a second
+    worker taking over an expired lease) wrote the run falls back to the
+    whole document. Per-run digests are kept only for runs in progress, in
+    a bounded LRU. Citations live in
+    their own table, one row per (run_id, url), and are only rewritten when
+    the run's citation list changes.
+    """
+
+    indexes_citations = True
+
     def __init__(self, db_url: str):
-        self.engine = create_engine(db_url)
-        self.SessionLocal = sessionmaker(
-            autocommit=False, autoflush=False, bind=self.engine, class_=Session
+        self.engine = create_async_engine(
+            _async_url(db_url),
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout,
+            pool_recycle=settings.db_pool_recycle,
+            pool_pre_ping=True,
+            connect_args={"prepared_statement_cache_size": settings.db_statement_cache_size},
         )
-    
+        self.SessionLocal = async_sessionmaker(self.engine, class_=AsyncSession, expire_on_commit=False)
+        # run_id -> (updated_at written, section name -> digest of the JSON last written for it)
+        self._section_digests: "OrderedDict[str, tuple]" = OrderedDict()
+        # run_id -> digest of the citation rows last written for it
+        self._citation_digests: "OrderedDict[str, str]" = OrderedDict()
+
     async def initialize(self):
         """Create tables if they don't exist."""
         try:
-            SQLModel.metadata.create_all(self.engine)
+            async with self.engine.begin() as conn:
+                # Citations used to be one JSON list per run; move that table aside
+                await conn.execute(text(
+                    """
+                    DO $$ BEGIN
+                        IF EXISTS (SELECT 1 FROM information_schema.columns
+                                   WHERE table_name = 'citations' AND column_name = 'data') THEN
+                            ALTER TABLE citations RENAME TO citations_legacy;
+                        END IF;
+                    END $$;
+                    """
+                ))
+                await conn.run_sync(SQLModel.metadata.create_all)
+                await self._migrate_legacy_citations(conn)
+                # Tables created before partial updates stored the dossier as json
+                await conn.execute(text(
+                    """
+                    DO $$ BEGIN
+                        IF (SELECT data_type FROM information_schema.columns
+                            WHERE table_name = 'dossiers' AND column_name = 'data') = 'json' THEN
+                            ALTER TABLE dossiers ALTER COLUMN data TYPE jsonb USING data::jsonb;
+                        END IF;
+                    END $$;
+                    """
+                ))
             logger.info("Postgres tables initialized.")
         except Exception as e:
             logger.error(f"Failed to initialize Postgres: {e}")
             raise
-    
+
+    async def _migrate_legacy_citations(self, conn):
+        """Explode rows of the old JSON-list citations table, then drop it."""
+        exists = (await conn.execute(text("SELECT to_regclass('citations_legacy')"))).scalar()
+        if not exists:
+            return
+        await conn.execute(text(
+            """
+            INSERT INTO citations (run_id, url, title, snippet, domain)
+            SELECT DISTINCT ON (l.run_id, c->>'url')
+                   l.run_id, c->>'url', COALESCE(c->>'title', ''), COALESCE(c->>'snippet', ''),
+                   lower(regexp_replace(COALESCE(NULLIF(c->>'domain', ''), c->>'url'),
+                                        '^([a-z]+://)?(www\.)?([^/:?#]*).*$', '\3', 'i'))
+            FROM citations_legacy l, json_array_elements(l.data::json) c
+            WHERE COALESCE(c->>'url', '') <> ''
+            ON CONFLICT (run_id, url) DO NOTHING
+            """
+        ))
+        await conn.execute(text("DROP TABLE citations_legacy"))
+        logger.info("Migrated legacy citation lists to per-URL rows.")
+
+    async def close(self):
+        await self.engine.dispose()
+
     async def save_dossier(self, dossier: VentureDossier):
         """Save or update a dossier in Postgres."""
-        with self.SessionLocal() as session:
-            # 1. Update Run
-            run = session.get(Run, dossier.run_id)
-            if not run:
-                run = Run(
+        doc = dossier.model_dump(mode="json")
+        encoded = {key: json.dumps(value, separators=(",", ":")) for key, value in doc.items()}
+        digests = {key: hashlib.sha1(value.encode("utf-8")).hexdigest() for key, value in encoded.items()}
+        previous_updated_at, previous = self._section_digests.get(dossier.run_id, (None, None))
+
+        async with self.SessionLocal() as session, session.begin():
+            # 1. Upsert the Run row in one statement
+            run_values = {
+                "status": dossier.status,
+                "current_step": dossier.current_step,
+                "updated_at": datetime.utcnow(),
+                "error": dossier.error,
+            }
+            await session.execute(
+                insert(Run)
+                .values(
                     id=dossier.run_id,
                     idea_text=dossier.idea_text,
                     created_at=dossier.created_at,
-                    version_of=dossier.version_of
+                    version_of=dossier.version_of,
+                    **run_values,
                 )
-                session.add(run)
-            
-            run.status = dossier.status
-            run.current_step = dossier.current_step
-            run.updated_at = datetime.utcnow()
-            run.error = dossier.error
-            
-            # 2. Update Dossier JSON
-            db_dossier = session.get(Dossier, dossier.run_id)
-            if not db_dossier:
-                db_dossier = Dossier(run_id=dossier.run_id)
-                session.add(db_dossier)
-            
-            db_dossier.data = dossier.model_dump(mode="json")
-            
-            # 3. Update Citations if present
-            citations_list = []
-            if dossier.market_research:
-                citations_list.extend([c.model_dump(mode="json") for c in dossier.market_research.citations])
-            if dossier.competitive_analysis:
-                citations_list.extend([c.model_dump(mode="json") for c in dossier.competitive_analysis.citations])
-            
-            if citations_list:
-                db_citations = session.exec(select(ResearchCitation).where(ResearchCitation.run_id == dossier.run_id)).first()
-                if not db_citations:
-                    db_citations = ResearchCitation(run_id=dossier.run_id)
-                    session.add(db_citations)
-                db_citations.data = citations_list
-
-            session.commit()
-
-    async def get_dossier(self, run_id: str) -> Optional[VentureDossier]:
+                .on_conflict_do_update(index_elements=[Run.id], set_=run_values)
+            )
+
+            # 2. Patch only the changed dossier sections
+            patched = False
+            if previous is not None and previous_updated_at is not None:
+                data = Dossier.data
+                for key, digest in digests.items():
+                    if previous.get(key) != digest:
+                        data = func.jsonb_set(data, cast(array([key]), ARRAY(Text)), literal(doc[key], JSONB))
+                # Matches no row if another process wrote the run since, so
+                # the digests are stale and the whole document is written
+                result = await session.execute(
+                    update(Dossier)
+                    .where(
+                        Dossier.run_id == dossier.run_id,
+                        Dossier.data["updated_at"].astext == previous_updated_at,
+                    )
+                    .values(data=data)
+                )
+                patched = result.rowcount == 1
+            if not patched:
+                await session.execute(
+                    insert(Dossier)
+                    .values(run_id=dossier.run_id, data=doc)
+                    .on_conflict_do_update(index_elements=[Dossier.run_id], set_={"data": doc})
+                )
+
+            # 3. Sync citation rows when the run's citation list changed
+            citations = citation_rows(dossier)
+            citation_digest = hashlib.sha1(
+                json.dumps(citations, separators=(",", ":")).encode("utf-8")
+            ).hexdigest()
+            # After a full write the cached citation digest may be stale too
+            if not patched or self._citation_digests.get(dossier.run_id) != citation_digest:
+                await self._write_citations(session, dossier.run_id, citations)
+
+        # A queued run may be picked up by another process, and a finished
+        # one is not saved again; only runs in progress keep their digests
+        if dossier.status in (RunStatus.QUEUED, RunStatus.DONE, RunStatus.ERROR):
+            self._section_digests.pop(dossier.run_id, None)
+            self._citation_digests.pop(dossier.run_id, None)
+        else:
+            self._remember(self._section_digests, dossier.run_id, (doc.get("updated_at"), digests))
+            self._remember(self._citation_digests, dossier.run_id, citation_digest)
+        event_bus.publish(dossier)
+
+    @staticmethod
+    def _remember(cache: OrderedDict, run_id: str, value):
+        cache[run_id] = value
+        cache.move_to_end(run_id)
+        while len(cache) > settings.db_digest_cache_entries:
+            cache.popitem(last=False)
+
+    async def _write_citations(self, session: AsyncSession, run_id: str, rows: List[dict]):
+        """Bulk upsert ``rows`` and delete the run's citations no longer listed."""
+        stale = delete(ResearchCitation).where(ResearchCitation.run_id == run_id)
+        if rows:
+            stale = stale.where(ResearchCitation.url.not_in([r["url"] for r in rows]))
+        await session.execute(stale)
+
+        for start in range(0, len(rows), CITATION_BATCH):
+            statement = insert(ResearchCitation).values(rows[start:start + CITATION_BATCH])
+            await session.execute(statement.on_conflict_do_update(
+                index_elements=[ResearchCitation.run_id, ResearchCitation.url],
+                set_={
+                    "title": statement.excluded.title,
+                    "snippet": statement.excluded.snippet,
+                    "domain": statement.excluded.domain,
+                },
+            ))
+
+    async def get_dossier(
+        self, run_id: str, sections: Optional[Iterable[str]] = None
+    ) -> Optional[VentureDossier]:
         """Load dossier from Postgres."""
-        with self.SessionLocal() as session:
-            db_dossier = session.get(Dossier, run_id)
+        async with self.SessionLocal() as session:
+            db_dossier = await session.get(Dossier, run_id)
             if not db_dossier:
                 # Try to get from Run if dossier record not yet created
-                run = session.get(Run, run_id)
+                run = await session.get(Run, run_id)
                 if not run:
                     return None
                 return VentureDossier(
@@ -91,14 +242,24 @@ class PostgresStorageBackend(StorageBackend):
                     status=run.status,
                     created_at=run.created_at
                 )
-            
+
             return VentureDossier(**db_dossier.data)
-    
-    async def list_runs(self, limit: int = 20) -> List[dict]:
+
+    async def list_runs(
+        self, limit: int = 20, status: Optional[str] = None, cursor: Optional[str] = None
+    ) -> List[dict]:
         """List recent runs."""
-        with self.SessionLocal() as session:
-            statement = select(Run).order_by(Run.created_at.desc()).limit(limit)
-            results = session.exec(statement).all()
+        async with self.SessionLocal() as session:
+            statement = select(Run)
+            if status:
+                statement = statement.where(Run.status == status)
+            if cursor:
+                created_at, run_id = decode_cursor(cursor)
+                statement = statement.where(
+                    tuple_(Run.created_at, Run.id) < tuple_(datetime.fromisoformat(created_at), run_id)
+                )
+            statement = statement.order_by(Run.created_at.desc(), Run.id.desc()).limit(limit)
+            results = (await session.execute(statement)).scalars().all()
             return [
                 {
                     "run_id": r.id,
@@ -108,43 +269,86 @@ class PostgresStorageBackend(StorageBackend):
                 }
                 for r in results
             ]
-    
+
+    async def runs_citing_domain(self, domain: str, limit: int = 20) -> List[dict]:
+        """Runs citing ``domain``, newest first, served from the domain index."""
+        async with self.SessionLocal() as session:
+            statement = (
+                select(Run.id, Run.idea_text, Run.status, Run.created_at, func.count())
+                .join(ResearchCitation, ResearchCitation.run_id == Run.id)
+                .where(ResearchCitation.domain == normalize_domain(domain))
+                .group_by(Run.id)
+                .order_by(Run.created_at.desc(), Run.id.desc())
+                .limit(limit)
+            )
+            rows = (await session.execute(statement)).all()
+            return [
+                {
+                    "run_id": r[0],
+                    "idea_text": r[1],
+                    "status": r[2],
+                    "created_at": r[3],
+                    "citations": r[4],
+                }
+                for r in rows
+            ]
+
     async def save_artifact(self, run_id: str, filename: str, content: bytes):
         """Save artifact path to DB (binary content should be handled by another service or stored as file)."""
         # For this requirement, we'll store PDFs on filesystem but keep paths in DB
-        import os
-        from app.config import settings
-        
         storage_dir = os.path.join(settings.pdf_storage_path, run_id)
         os.makedirs(storage_dir, exist_ok=True)
-        
+
         file_path = os.path.join(storage_dir, filename)
         with open(file_path, "wb") as f:
             f.write(content)
-            
-        with self.SessionLocal() as session:
-            art = session.get(Artifact, run_id)
+
+        async with self.SessionLocal() as session, session.begin():
+            art = await session.get(Artifact, run_id)
             if not art:
                 art = Artifact(run_id=run_id)
                 session.add(art)
-                
+
             if "market" in filename.lower() and filename.endswith(".pdf"):
                 art.market_pdf_path = file_path
             elif "competition" in filename.lower() and filename.endswith(".pdf"):
                 art.competition_pdf_path = file_path
             elif "strategy" in filename.lower() and filename.endswith(".pdf"):
                 art.strategy_pdf_path = file_path
-            
-            session.commit()
-    
+
     async def get_artifact(self, run_id: str, filename: str) -> bytes:
         """Get artifact from filesystem."""
-        # Implementation depends on save_artifact logic
-        import os
-        from app.config import settings
         file_path = os.path.join(settings.pdf_storage_path, run_id, filename)
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"Artifact {filename} not found for run {run_id}")
-        
+
         with open(file_path, "rb") as f:
             return f.read()
+
+    async def save_checkpoint(self, run_id: str, step: str, checkpoint: dict):
+        """Upsert the checkpoint into the step_checkpoints table."""
+        async with self.SessionLocal() as session, session.begin():
+            await session.execute(
+                insert(StepCheckpoint)
+                .values(run_id=run_id, step=step, data=checkpoint)
+                .on_conflict_do_update(
+                    index_elements=[StepCheckpoint.run_id, StepCheckpoint.step], set_={"data": checkpoint}
+                )
+            )
+
+    async def get_checkpoint(self, run_id: str, step: str) -> Optional[dict]:
+        """Read a step's checkpoint row, or None if there is none."""
+        async with self.SessionLocal() as session:
+            row = await session.get(StepCheckpoint, (run_id, step))
+        return row.data if row else None
+
+    async def stat_artifact(self, run_id: str, filename: str) -> ArtifactInfo:
+        """Stat the artifact file without reading it."""
+        return file_artifact_info(Path(settings.pdf_storage_path) / run_id / filename)
+
+    async def open_artifact(
+        self, run_id: str, filename: str, start: int = 0, end: Optional[int] = None
+    ) -> AsyncIterator[bytes]:
+        """Stream the artifact file in chunks."""
+        async for chunk in iter_file(Path(settings.pdf_storage_path) / run_id / filename, start, end):
+            yield chunk
@@ -0,0 +1,104 @@
+"""Load test: event-loop responsiveness while AWS-backed runs are saving.
+
+Saves dossiers from many concurrent "runs" against moto's in-memory AWS with
+a simulated network round-trip, while a probe coroutine measures how late
+the event loop wakes it up. Every API request and SSE tick waits on the same
+loop, so probe lateness is the latency they would see added.
+
+Compares the thread-pool backend with the same calls made inline (the old
+behaviour).
+
+Usage (from apps/api, requires moto):
+    python benchmarks/bench_aws_event_loop.py [--runs 20] [--saves 10] [--latency-ms 15]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../.."))
+
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "bench")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "bench")
+
+from moto import mock_aws  # noqa: E402
+
+from app.storage.aws import AWSStorageBackend  # noqa: E402
+from shared.models import RunStatus, VentureDossier  # noqa: E402
+
+
+class InlineBackend(AWSStorageBackend):
+    """boto3 calls made directly on the event loop."""
+
+    async def _call(self, fn, *args, **kwargs):
+        return fn(*args, **kwargs)
+
+
+async def probe(samples: list, stop: asyncio.Event, interval: float = 0.005):
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(interval)
+        samples.append((loop.time() - start - interval) * 1000)
+
+
+async def run_load(backend: AWSStorageBackend, runs: int, saves: int, latency: float) -> dict:
+    def slow_network(**kwargs):
+        time.sleep(latency)
+
+    backend.dynamodb.meta.events.register("before-send.dynamodb", slow_network)
+    await backend.initialize()
+
+    async def one_run(i: int):
+        dossier = VentureDossier(run_id=f"run-{i}", idea_text=f"idea {i}", status=RunStatus.RUNNING)
+        for _ in range(saves):
+            await backend.save_dossier(dossier)
+
+    lag: list = []
+    list_latency: list = []
+    stop = asyncio.Event()
+    prober = asyncio.create_task(probe(lag, stop))
+
+    async def lister():
+        while not stop.is_set():
+            start = time.perf_counter()
+            await backend.list_runs(limit=20)
+            list_latency.append((time.perf_counter() - start) * 1000)
+            await asyncio.sleep(0.02)
+
+    listing = asyncio.create_task(lister())
+    start = time.perf_counter()
+    await asyncio.gather(*(one_run(i) for i in range(runs)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await asyncio.gather(prober, listing)
+    await backend.close()
+
+    lag.sort()
+    return {
+        "saves/s": runs * saves / elapsed,
+        "loop lag p50 ms": statistics.median(lag),
+        "loop lag p99 ms": lag[int(len(lag) * 0.99) - 1] if lag else 0.0,
+        "list_runs p50 ms": statistics.median(list_latency) if list_latency else float("nan"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--saves", type=int, default=10)
+    parser.add_argument("--latency-ms", type=float, default=15.0)
+    args = parser.parse_args()
+
+    for name, cls in (("inline", InlineBackend), ("thread pool", AWSStorageBackend)):
+        with mock_aws():
+            backend = cls(table_name="bench-runs", bucket_name="bench-artifacts")
+            result = asyncio.run(run_load(backend, args.runs, args.saves, args.latency_ms / 1000))
+        print(f"{name:>12}: " + ", ".join(f"{k} {v:.1f}" for k, v in result.items()))
+
+
+if __name__ == "__main__":
+    main()
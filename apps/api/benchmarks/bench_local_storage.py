@@ -0,0 +1,93 @@
+"""Benchmark LocalStorageBackend write/read latency for large dossiers.
+
+Usage (from apps/api):
+    python benchmarks/bench_local_storage.py [--competitors 200] [--iterations 50]
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../.."))
+
+from app.storage.local import LocalStorageBackend  # noqa: E402
+from shared.models import (  # noqa: E402
+    Citation, ClarifiedIdea, Competitor, MarketResearch, VentureDossier,
+)
+
+
+def build_dossier(competitors: int) -> VentureDossier:
+    text = "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 4
+    return VentureDossier(
+        run_id="bench",
+        idea_text="AI meal planning for busy parents",
+        clarification=ClarifiedIdea(idea_title="MealMind", keywords=["meal", "ai", "parents"]),
+        market_research=MarketResearch(
+            summary=text,
+            market_gaps=[text] * 10,
+            competitors=[
+                Competitor(name=f"Comp {i}", description=text, features=[f"f{j}" for j in range(10)])
+                for i in range(competitors)
+            ],
+            citations=[
+                Citation(url=f"https://example.com/{i}", title=f"Source {i}", snippet=text)
+                for i in range(competitors)
+            ],
+        ),
+    )
+
+
+class LegacyBackend(LocalStorageBackend):
+    """The pre-atomic implementation: in-place json.dump with indent=2."""
+
+    async def save_dossier(self, dossier):
+        with open(self.runs_path / f"{dossier.run_id}.json", "w") as f:
+            json.dump(dossier.model_dump(mode="json"), f, indent=2, default=str)
+
+    async def get_dossier(self, run_id):
+        with open(self.runs_path / f"{run_id}.json", "r") as f:
+            return VentureDossier(**json.load(f))
+
+
+async def measure(backend: LocalStorageBackend, dossier: VentureDossier, iterations: int):
+    await backend.initialize()
+    writes, reads = [], []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await backend.save_dossier(dossier)
+        writes.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        await backend.get_dossier(dossier.run_id)
+        reads.append(time.perf_counter() - start)
+    size = (backend.runs_path / f"{dossier.run_id}.json").stat().st_size
+    return statistics.median(writes) * 1000, statistics.median(reads) * 1000, size
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--competitors", type=int, default=200)
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    dossier = build_dossier(args.competitors)
+    variants = [
+        ("legacy (in-place, indent=2)", lambda p: LegacyBackend(p)),
+        ("atomic, indent=2", lambda p: LocalStorageBackend(p)),
+        ("atomic, compact", lambda p: LocalStorageBackend(p, compact_json=True)),
+        ("atomic, compact, fsync=file", lambda p: LocalStorageBackend(p, compact_json=True, fsync="file")),
+        ("atomic, compact, fsync=full", lambda p: LocalStorageBackend(p, compact_json=True, fsync="full")),
+    ]
+    print(f"{'variant':32} {'write ms':>9} {'read ms':>9} {'bytes':>10}")
+    for name, factory in variants:
+        with tempfile.TemporaryDirectory() as tmp:
+            write_ms, read_ms, size = await measure(factory(tmp), dossier, args.iterations)
+        print(f"{name:32} {write_ms:9.2f} {read_ms:9.2f} {size:10d}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
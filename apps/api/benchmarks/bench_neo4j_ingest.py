@@ -0,0 +1,147 @@
+"""Benchmark market-graph ingest into Neo4j: per-row statements vs UNWIND batches.
+
+Writes a synthetic market graph (50 competitors x 10 segments by default)
+with the old per-row, auto-commit statements and with
+``Neo4jClient.store_market_graph``, reporting round-trips (statements sent)
+and median latency for each. A third column re-stores each batched run
+from the same client with one extra differentiator, to show the
+diff-based rewrite of a run the process has already written.
+
+Usage (from apps/api, against a throwaway local Neo4j):
+    docker run --rm -p 7687:7687 -e NEO4J_AUTH=neo4j/password neo4j:5.15
+    python benchmarks/bench_neo4j_ingest.py [--competitors 50] [--segments 10] [--repeat 10]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../.."))
+
+os.environ.setdefault("NEO4J_URI", "bolt://localhost:7687")
+
+from services.integrations.neo4j_client import (  # noqa: E402
+    Neo4jClient,
+    graph_state,
+    market_graph_rows,
+    market_graph_statements,
+)
+
+
+async def store_per_row(session, run_id, idea, competitors, segments, differentiators) -> int:
+    """The previous implementation: one auto-commit statement per node and edge."""
+    statements = 0
+
+    async def run(query, **params):
+        nonlocal statements
+        statements += 1
+        await (await session.run(query, **params)).consume()
+
+    await run(
+        "MERGE (i:Idea {run_id: $run_id}) SET i.description = $idea, i.updated_at = datetime()",
+        run_id=run_id, idea=idea,
+    )
+    for segment in segments:
+        await run(
+            """
+            MERGE (s:Segment {name: $name}) SET s.size_estimate = $size_estimate
+            WITH s MATCH (i:Idea {run_id: $run_id}) MERGE (i)-[:TARGETS]->(s)
+            """,
+            name=segment["name"], size_estimate=segment.get("size_estimate", ""), run_id=run_id,
+        )
+    for comp in competitors:
+        await run(
+            "MERGE (c:Competitor {name: $name}) SET c.description = $description, c.url = $url, c.pricing = $pricing",
+            name=comp["name"], description=comp["description"], url=comp["url"], pricing=comp["pricing"],
+        )
+        for segment in segments:
+            await run(
+                "MATCH (c:Competitor {name: $c}) MATCH (s:Segment {name: $s}) MERGE (c)-[:SERVES]->(s)",
+                c=comp["name"], s=segment["name"],
+            )
+        for strength in comp["strengths"][:3]:
+            await run(
+                """
+                MERGE (f:Feature {name: $feature})
+                WITH f MATCH (c:Competitor {name: $comp_name}) MERGE (c)-[:HAS_FEATURE]->(f)
+                """,
+                feature=strength, comp_name=comp["name"],
+            )
+    for diff in differentiators:
+        await run(
+            """
+            MERGE (d:Differentiator {name: $name})
+            WITH d MATCH (i:Idea {run_id: $run_id}) MERGE (i)-[:DIFFERS_ON]->(d)
+            """,
+            name=diff, run_id=run_id,
+        )
+    return statements
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--competitors", type=int, default=50)
+    parser.add_argument("--segments", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    competitors = [
+        {
+            "name": f"bench-competitor-{i}",
+            "description": f"competitor {i}",
+            "url": f"https://c{i}.example.com",
+            "pricing": "$10/mo",
+            "strengths": [f"bench-feature-{i % 7}", f"bench-feature-{i % 11}", f"bench-feature-{i % 13}"],
+        }
+        for i in range(args.competitors)
+    ]
+    segments = [{"name": f"bench-segment-{j}", "size_estimate": "$1B"} for j in range(args.segments)]
+    differentiators = [f"bench-diff-{k}" for k in range(5)]
+
+    client = Neo4jClient()
+    await client.connect()
+    if not client.driver:
+        sys.exit(f"Cannot reach Neo4j at {client.uri}")
+    await client.initialize_schema()
+
+    per_row, batched, rewrite, per_row_statements = [], [], [], 0
+    try:
+        for n in range(args.repeat):
+            async with client.driver.session() as session:
+                start = time.perf_counter()
+                per_row_statements = await store_per_row(
+                    session, f"bench-row-{n}", "idea", competitors, segments, differentiators
+                )
+                per_row.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            await client.store_market_graph(f"bench-batch-{n}", "idea", competitors, segments, differentiators)
+            batched.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            await client.store_market_graph(
+                f"bench-batch-{n}", "idea", competitors, segments, differentiators + ["bench-diff-extra"]
+            )
+            rewrite.append(time.perf_counter() - start)
+    finally:
+        async with client.driver.session() as session:
+            await session.run(
+                "MATCH (n) WHERE any(k IN ['run_id', 'name'] WHERE n[k] STARTS WITH 'bench-') DETACH DELETE n"
+            )
+        await client.close()
+
+    rows = market_graph_rows(competitors, segments, differentiators)
+    batched_statements = len(market_graph_statements("bench", "idea", rows))
+    rewrite_rows = market_graph_rows(competitors, segments, differentiators + ["bench-diff-extra"])
+    rewrite_statements = len(market_graph_statements("bench", "idea", rewrite_rows, graph_state("idea", rows)))
+    print(f"{args.competitors} competitors x {args.segments} segments, median of {args.repeat}")
+    print(f"per-row   {per_row_statements:5d} statements  {statistics.median(per_row) * 1000:8.1f} ms")
+    print(f"batched   {batched_statements:5d} statements  {statistics.median(batched) * 1000:8.1f} ms  (1 transaction)")
+    print(f"rewrite   {rewrite_statements:5d} statements  {statistics.median(rewrite) * 1000:8.1f} ms  (diff only)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,59 @@
+"""Benchmark run listing from the SQLite catalog at large run counts.
+
+Usage (from apps/api):
+    python benchmarks/bench_run_catalog.py [--runs 100000]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../.."))
+
+from app.storage.catalog import RunCatalog  # noqa: E402
+from shared.models import RunStatus, VentureDossier  # noqa: E402
+
+
+def timed(fn, repeat: int = 200) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=100_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        catalog = RunCatalog(Path(tmp) / "catalog.sqlite3")
+        base = datetime(2024, 1, 1)
+        statuses = list(RunStatus)
+        start = time.perf_counter()
+        catalog.rebuild(
+            VentureDossier(
+                run_id=f"run-{i:07d}",
+                idea_text=f"idea {i}",
+                status=statuses[i % len(statuses)],
+                created_at=base + timedelta(seconds=i),
+            )
+            for i in range(args.runs)
+        )
+        print(f"indexed {args.runs} runs in {time.perf_counter() - start:.2f}s")
+
+        middle = ((base + timedelta(seconds=args.runs // 2)).isoformat(timespec="microseconds"), f"run-{args.runs // 2:07d}")
+        print(f"first page            {timed(lambda: catalog.list(limit=20)):.3f} ms")
+        print(f"status filter         {timed(lambda: catalog.list(limit=20, status='done')):.3f} ms")
+        print(f"cursor (mid-table)    {timed(lambda: catalog.list(limit=20, before=middle)):.3f} ms")
+        print(f"upsert                {timed(lambda: catalog.upsert(VentureDossier(run_id='run-0000001', idea_text='x', created_at=base))):.3f} ms")
+
+if __name__ == "__main__":
+    main()
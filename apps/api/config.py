@@ -11,17 +11,93 @@ class Settings(BaseSettings):
     # API
     api_host: str = "0.0.0.0"
     api_port: int = 8000
+    sse_poll_interval: float = 15.0  # fallback storage re-read for SSE watchers
+    sse_worker_poll_interval: float = 2.0  # storage re-read for SSE watchers when runs execute in workers
+    save_coalesce_delay: float = 0.5  # seconds to batch step-start dossier saves
+
+    # Workflow job queue
+    job_runner: str = "api"  # api: the API process runs jobs | worker: only worker.py processes do
+    job_concurrency: int = 3  # workflow runs executing at once, per process
+    job_max_queued: int = 100  # runs waiting to start before create_run returns 429
+    job_max_priority: int = 0  # highest priority a client may request; higher values are lowered to this
+    job_queue_path: str = "./artifacts/jobs.sqlite3"
+    job_default_duration: float = 120.0  # seconds per run assumed for Retry-After until runs finish
+    job_lease_seconds: float = 60.0  # a claimed job returns to the queue this long after its worker stops renewing
+    job_poll_interval: float = 1.0  # seconds between queue checks by idle workers
+    step_checkpoints: bool = True  # record step outputs so resumed runs skip finished steps
 
     # LLM Provider — NVIDIA NIM (OpenAI-compatible)
     openai_api_key: str = ""
     openai_base_url: str = "https://integrate.api.nvidia.com/v1"
     llm_model: str = "moonshotai/kimi-k2.5"
+    llm_max_connections: int = 20
+    llm_max_keepalive: int = 10
+    llm_keepalive_expiry: float = 60.0  # seconds an idle connection is kept open
+    llm_http2: bool = False
+    llm_warmup: bool = True
+    llm_cache_enabled: bool = True
+    llm_cache_allow_sampling: bool = False  # also cache calls with temperature > 0
+    llm_cache_ttl: float = 86400.0
+    llm_cache_max_entries: int = 256
+    llm_cache_max_disk_entries: int = 5000
 
     # Tavily
     tavily_api_key: str = ""
+    tavily_max_concurrency: int = 3
+    tavily_max_connections: int = 10
+    tavily_timeout: float = 20.0  # seconds per query
+    tavily_http2: bool = True
+    search_cache_ttl: float = 259200.0  # 3 days
+    search_cache_max_entries: int = 512
+    search_cache_max_disk_entries: int = 20000
+    search_offline: bool = False  # serve only recorded search results
 
     # Database (optional — omit to use local JSON storage)
     database_url: Optional[str] = None
+    db_pool_size: int = 10
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 10.0  # seconds to wait for a pooled connection
+    db_pool_recycle: int = 1800
+    db_statement_cache_size: int = 256  # asyncpg prepared statements per connection
+    db_digest_cache_entries: int = 1024  # in-progress runs whose section digests are kept for partial saves
+    pdf_storage_path: str = "./artifacts/pdfs"
+
+    # AWS storage (used when aws_dynamodb_table is set and database_url is not)
+    aws_region: str = "us-east-1"
+    aws_access_key_id: Optional[str] = None
+    aws_secret_access_key: Optional[str] = None
+    aws_dynamodb_table: Optional[str] = None
+    aws_dynamodb_endpoint_url: Optional[str] = None  # e.g. DynamoDB Local
+    aws_s3_bucket: str = "ventureforge-artifacts"
+    aws_list_lookback_months: int = 24  # oldest creation month list_runs reaches back to
+    aws_max_pool_connections: int = 16  # also the size of the boto3 thread pool
+    aws_connect_timeout: float = 5.0
+    aws_read_timeout: float = 30.0
+    aws_retry_mode: str = "adaptive"  # legacy | standard | adaptive
+    aws_max_attempts: int = 5
+    aws_section_cache_entries: int = 256  # dossier sections kept in memory, by content hash
+    aws_s3_presign_downloads: bool = True  # redirect artifact downloads to presigned S3 URLs
+    aws_s3_presign_expiry: int = 300  # seconds a presigned download URL stays valid
+
+    # Market graph
+    graph_store: str = "auto"  # auto: Neo4j when neo4j_uri is set, else local | neo4j | local | none
+    graph_local_path: str = "./artifacts/graph.sqlite3"  # embedded graph store file
+
+    # Neo4j market graph (optional)
+    neo4j_uri: Optional[str] = None  # e.g. bolt://localhost:7687; the embedded graph store is used when unset
+    neo4j_user: str = "neo4j"
+    neo4j_password: str = "password"
+    neo4j_max_pool_size: int = 20
+    neo4j_acquisition_timeout: float = 10.0  # seconds a session waits for a pooled connection
+    neo4j_connect_timeout: float = 5.0
+    neo4j_health_interval: float = 30.0  # seconds between connectivity checks
+    neo4j_reconnect_backoff: float = 1.0  # first retry delay after a lost connection, doubling per failure
+    neo4j_reconnect_backoff_max: float = 60.0
+    neo4j_analytics_interval: float = 60.0  # seconds between cross-run aggregate refreshes; 0 disables
+
+    # Local storage
+    storage_compact_json: bool = False  # write dossiers without indentation
+    storage_fsync: str = "none"  # none | file | full
 
     class Config:
         env_file = "../../.env"
@@ -1,24 +1,35 @@
 """FastAPI main application for VentureForge."""
-import asyncio
 import logging
 import sys
 import os
 from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Optional
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
 from sse_starlette.sse import EventSourceResponse
 
 # Add project root to path so shared/ is importable
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../.."))
 
 from config import settings
-from app.storage import get_storage_backend
+from app.storage import DossierEvent, get_storage_backend, encode_cursor, event_bus
+from app.storage.download import artifact_response
+from services.integrations.llm_client import start_llm_client, close_llm_client, get_llm_cache, pool_stats
+from services.integrations.neo4j_client import (
+    start_neo4j_client,
+    close_neo4j_client,
+    get_neo4j_client,
+    graph_backend,
+    graph_metrics,
+)
+from services.integrations.tavily_client import close_tavily_client, get_search_cache
+from services.jobs import AlreadyQueued, QueueFull, get_job_queue, start_job_queue, stop_job_queue
+from services.persistence import flush_all
 from shared.models import (
     CreateRunRequest,
+    ForkRunRequest,
     RunResponse,
     VentureDossier,
     RunStatus,
@@ -35,8 +46,17 @@ async def lifespan(app: FastAPI):
     logger.info("VentureForge API starting up...")
     storage = get_storage_backend()
     await storage.initialize()
+    await start_llm_client()
+    await start_neo4j_client()
+    await start_job_queue()
     yield
     logger.info("VentureForge API shutting down...")
+    await stop_job_queue()
+    await flush_all()
+    await close_llm_client()
+    await close_tavily_client()
+    await close_neo4j_client()
+    await storage.close()
 
 
 app = FastAPI(
@@ -59,10 +79,46 @@ async def root():
     return {"name": "VentureForge API", "version": "1.0.0", "status": "running"}
 
 
+def _queue_full(retry_after: int) -> HTTPException:
+    return HTTPException(
+        status_code=429,
+        detail="Too many runs queued; try again later",
+        headers={"Retry-After": str(retry_after)},
+    )
+
+
+async def _submit(dossier: VentureDossier, priority: int = 0):
+    """Queue a saved run at a priority capped by ``job_max_priority``.
+
+    If the queue filled up after the caller checked it, the run is marked
+    ERROR so it does not sit QUEUED forever, and 429 is raised. If another
+    request queued the run first, 409 is raised and its job is left alone.
+    """
+    try:
+        await get_job_queue().submit(
+            dossier.run_id, dossier.idea_text, priority=min(priority, settings.job_max_priority)
+        )
+    except AlreadyQueued:
+        raise HTTPException(status_code=409, detail="Run is already queued or running")
+    except QueueFull as e:
+        dossier.status = RunStatus.ERROR
+        dossier.error = "Job queue was full; try again later"
+        dossier.updated_at = datetime.utcnow()
+        await get_storage_backend().save_dossier(dossier)
+        raise _queue_full(e.retry_after)
+
+
 @app.post("/api/runs", response_model=RunResponse)
 async def create_run(request: CreateRunRequest):
-    """Start a new VentureForge simulation run."""
+    """Queue a new VentureForge simulation run.
+
+    Returns 429 with Retry-After when the job queue is full.
+    """
     storage = get_storage_backend()
+    queue = get_job_queue()
+    # Checked before saving so a rejected request usually leaves no run behind
+    if await queue.full():
+        raise _queue_full(queue.retry_after())
 
     run_id = storage.generate_run_id()
     dossier = VentureDossier(
@@ -73,51 +129,110 @@ async def create_run(request: CreateRunRequest):
         updated_at=datetime.utcnow(),
     )
     await storage.save_dossier(dossier)
+    await _submit(dossier, request.priority)
 
-    # Start workflow in background
-    from services.workflow import WorkflowOrchestrator
-    orchestrator = WorkflowOrchestrator()
-    asyncio.create_task(orchestrator.run_workflow(run_id, request.idea_text))
+    return RunResponse(run_id=run_id, status=RunStatus.QUEUED)
+
+
+@app.post("/api/runs/{run_id}/resume", response_model=RunResponse)
+async def resume_run(run_id: str):
+    """Re-queue a failed or interrupted run.
+
+    Steps that completed with unchanged inputs are restored from their
+    checkpoints, so only the remaining steps call the LLM again.
+    """
+    storage = get_storage_backend()
+    dossier = await storage.get_dossier(run_id)
+    if not dossier:
+        raise HTTPException(status_code=404, detail="Run not found")
+    if dossier.status == RunStatus.DONE:
+        raise HTTPException(status_code=409, detail="Run already completed")
+    # Fast paths only: the job store settles concurrent resumes in _submit
+    queue = get_job_queue()
+    if await queue.store.contains(run_id):
+        raise HTTPException(status_code=409, detail="Run is already queued or running")
+    if await queue.full():
+        raise _queue_full(queue.retry_after())
+
+    dossier.status = RunStatus.QUEUED
+    dossier.updated_at = datetime.utcnow()
+    await storage.save_dossier(dossier)
+    await _submit(dossier)
 
     return RunResponse(run_id=run_id, status=RunStatus.QUEUED)
 
 
+@app.post("/api/runs/{run_id}/fork", response_model=RunResponse)
+async def fork_run(run_id: str, request: ForkRunRequest):
+    """Start a new version of a run with some sections edited.
+
+    Only steps downstream of the edited sections run again; the rest are
+    restored from the original run's checkpoints. The new run's
+    ``version_of`` points at the original. Returns 422 for sections that
+    cannot be edited, or when ``step_checkpoints`` is off.
+    """
+    storage = get_storage_backend()
+    queue = get_job_queue()
+    if await queue.full():
+        raise _queue_full(queue.retry_after())
+    parent = await storage.get_dossier(run_id)
+    if not parent:
+        raise HTTPException(status_code=404, detail="Run not found")
+
+    from services.workflow import WorkflowOrchestrator
+    try:
+        fork = await WorkflowOrchestrator().fork_run(parent, request.sections)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    # The fork is saved by now; if the queue filled up meanwhile it is marked ERROR
+    await _submit(fork, request.priority)
+
+    return RunResponse(run_id=fork.run_id, status=RunStatus.QUEUED)
+
+
 @app.get("/api/runs/{run_id}/events")
-async def stream_events(run_id: str):
-    """Stream SSE events for a project run."""
+async def stream_events(run_id: str, request: Request, mode: str = "snapshot"):
+    """Stream SSE events for a project run.
+
+    ``mode=snapshot`` (default) sends the full dossier on every ``update``.
+    ``mode=patch`` sends one ``snapshot`` event ({"seq", "dossier"}) followed
+    by ``patch`` events ({"seq", "ops"}) holding RFC 6902 operations. A client
+    that sees a gap in ``seq`` should reconnect; the server replies with a
+    fresh snapshot, or replays patches after the ``Last-Event-ID`` it sends.
+    """
     storage = get_storage_backend()
+    patch_mode = mode == "patch"
 
-    async def event_generator() -> AsyncGenerator[dict, None]:
-        last_step = None
-        last_status = None
+    def format_event(event: DossierEvent, previous_id: Optional[str]) -> dict:
+        if not patch_mode:
+            return {"event": "update", "data": event.payload}
+        if event.patch is not None and previous_id == f"{event.epoch}:{event.seq - 1}":
+            data = f'{{"seq":{event.seq},"ops":{event.patch}}}'
+            return {"event": "patch", "id": event.event_id, "data": data}
+        data = f'{{"seq":{event.seq},"dossier":{event.payload}}}'
+        return {"event": "snapshot", "id": event.event_id, "data": data}
 
-        while True:
-            try:
-                dossier = await storage.get_dossier(run_id)
-                if not dossier:
-                    yield {"event": "error", "data": '{"message": "Not found"}'}
-                    break
-
-                if dossier.current_step != last_step or dossier.status != last_status:
-                    yield {
-                        "event": "update",
-                        "data": dossier.model_dump_json(),
-                    }
-                    last_step = dossier.current_step
-                    last_status = dossier.status
-
-                if dossier.status in [RunStatus.DONE, RunStatus.ERROR]:
-                    yield {
-                        "event": "complete",
-                        "data": dossier.model_dump_json(),
-                    }
-                    break
-
-                await asyncio.sleep(1.0)
-            except Exception as e:
-                logger.error(f"SSE Error: {e}")
-                yield {"event": "error", "data": f'{{"message": "{str(e)}"}}'}
-                break
+    async def event_generator() -> AsyncGenerator[dict, None]:
+        last_event_id = request.headers.get("last-event-id") if patch_mode else None
+        previous_id = last_event_id
+        try:
+            async for event in event_bus.watch(
+                run_id,
+                lambda: storage.get_dossier(run_id),
+                # Worker processes cannot publish to this process's event bus
+                settings.sse_poll_interval if settings.job_runner == "api" else settings.sse_worker_poll_interval,
+                replay=patch_mode,
+                last_event_id=last_event_id,
+            ):
+                yield format_event(event, previous_id)
+                previous_id = event.event_id
+                if event.status in [RunStatus.DONE, RunStatus.ERROR]:
+                    yield {"event": "complete", "data": event.payload}
+                    return
+            yield {"event": "error", "data": '{"message": "Not found"}'}
+        except Exception as e:
+            logger.error(f"SSE Error: {e}")
+            yield {"event": "error", "data": f'{{"message": "{str(e)}"}}'}
 
     return EventSourceResponse(event_generator())
 
@@ -132,19 +247,64 @@ async def get_run(run_id: str):
     return dossier
 
 
+@app.get("/api/runs/{run_id}/artifacts/{filename}")
+async def download_artifact(run_id: str, filename: str, request: Request):
+    """Download an artifact (report.md, report.pdf or a section PDF).
+
+    Redirects to a presigned URL when the backend offers one (S3);
+    otherwise streams the artifact, honouring ``Range``, ``If-Range`` and
+    ``If-None-Match``.
+    """
+    return await artifact_response(get_storage_backend(), run_id, filename, request.headers)
+
+
 @app.get("/api/runs")
-async def list_runs(limit: int = 20):
-    """List recent runs."""
+async def list_runs(limit: int = 20, status: Optional[RunStatus] = None, cursor: Optional[str] = None):
+    """List recent runs, newest first. Pass ``next_cursor`` back as ``cursor`` for the next page."""
     storage = get_storage_backend()
-    runs = await storage.list_runs(limit=limit)
-    return {"runs": runs}
+    try:
+        runs = await storage.list_runs(limit=limit, status=status.value if status else None, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    next_cursor = encode_cursor(runs[-1]) if len(runs) == limit else None
+    return {"runs": runs, "next_cursor": next_cursor}
+
+
+@app.get("/api/citations/domains/{domain}/runs")
+async def runs_citing_domain(domain: str, limit: int = 20):
+    """Runs that cite a given domain, newest first.
+
+    Served by the local and Postgres backends; returns 501 on backends
+    without a citation index (AWS).
+    """
+    storage = get_storage_backend()
+    if not storage.indexes_citations:
+        raise HTTPException(status_code=501, detail=f"{type(storage).__name__} does not index citations")
+    runs = await storage.runs_citing_domain(domain, limit=limit)
+    return {"domain": domain, "runs": runs}
+
+
+@app.get("/api/metrics")
+async def metrics():
+    """Runtime counters for outbound connection pools, caches, the job queue and the graph store.
+
+    ``graph.backend`` says which graph store is active ("neo4j", "local" or
+    None); the other ``graph`` keys are that store's own counters.
+    """
+    return {
+        "llm_pool": pool_stats.as_dict(),
+        "llm_cache": get_llm_cache().stats(),
+        "search_cache": get_search_cache().stats(),
+        "job_queue": await get_job_queue().stats(),
+        "graph": await graph_metrics(),
+    }
 
 
 @app.get("/api/runs/{run_id}/graph", response_model=GraphData)
 async def get_graph(run_id: str):
     """Get graph data for visualization."""
     storage = get_storage_backend()
-    dossier = await storage.get_dossier(run_id)
+    dossier = await storage.get_dossier(run_id, sections=("clarification", "market_research"))
     if not dossier:
         raise HTTPException(status_code=404, detail="Run not found")
 
@@ -157,9 +317,40 @@ async def get_graph(run_id: str):
             nodes.append({"id": nid, "label": comp.name, "type": "Competitor", "properties": {"description": comp.description}})
             edges.append({"source": "root", "target": nid, "type": "COMPETES_WITH"})
 
+        # Cross-run frequency from the graph store, when available
+        if graph_backend():
+            try:
+                neo4j = await get_neo4j_client()
+                counts = await neo4j.get_competitor_run_counts([c.name for c in dossier.market_research.competitors])
+            except Exception as e:
+                logger.warning(f"Competitor run counts unavailable: {e}")
+                counts = {}
+            for node in nodes[1:]:
+                if node["label"] in counts:
+                    node["properties"]["run_count"] = counts[node["label"]]
+
     return {"nodes": nodes, "edges": edges}
 
 
+@app.get("/api/graph/analytics")
+async def graph_analytics(limit: int = 10):
+    """Cross-run market graph analytics: competitor frequency, segment
+    co-occurrence and feature-overlap similarity.
+
+    Served from aggregates the graph client refreshes every
+    ``neo4j_analytics_interval`` seconds, so the cost does not grow with the
+    number of runs; ``refreshed_at`` says how current they are. Without
+    Neo4j the embedded graph store answers. Returns 503 when graph features
+    are off or Neo4j is not reachable.
+    """
+    if not graph_backend():
+        raise HTTPException(status_code=503, detail="Graph store not configured")
+    neo4j = await get_neo4j_client()
+    if not neo4j.available:
+        raise HTTPException(status_code=503, detail="Graph store unavailable")
+    return await neo4j.get_graph_analytics(limit=max(1, min(limit, 100)))
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host=settings.api_host, port=settings.api_port)
@@ -0,0 +1,32 @@
+"""Add the run-listing index to an existing DynamoDB table and backfill its keys.
+
+Usage (from apps/api, with the AWS_* settings of the target environment):
+    python scripts/migrate_aws_run_index.py
+
+Safe to re-run. DynamoDB builds the new index in the background; listing
+only sees backfilled items once the index is ACTIVE.
+"""
+import asyncio
+import logging
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../.."))
+
+from app.config import settings  # noqa: E402
+from app.storage.aws import AWSStorageBackend  # noqa: E402
+
+
+async def main():
+    if not settings.aws_dynamodb_table:
+        sys.exit("aws_dynamodb_table is not set")
+    storage = AWSStorageBackend()
+    await storage.initialize()
+    updated = await storage.migrate_run_index()
+    print(f"Backfilled {updated} items in {storage.table_name}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=settings.log_level)
+    asyncio.run(main())
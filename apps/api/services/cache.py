@@ -0,0 +1,148 @@
+"""Two-tier (memory LRU + disk) response cache with TTLs and size caps."""
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def make_key(*parts: Any) -> str:
+    """Content-address a request: sha256 over the canonical JSON of its parts."""
+    raw = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Cache JSON-serializable values in an in-memory LRU backed by one file per key.
+
+    Entries older than ``ttl`` seconds are treated as misses. The memory tier
+    holds at most ``max_entries`` values; the disk tier at most
+    ``max_disk_entries`` files, evicting the least recently written first.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[Path],
+        ttl: float,
+        max_entries: int = 256,
+        max_disk_entries: int = 5000,
+    ):
+        self.directory = Path(directory) if directory else None
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self._memory: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._disk_count: Optional[int] = None
+        self.hits_memory = 0
+        self.hits_disk = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def get(self, key: str, max_age: Optional[float] = None) -> Optional[Any]:
+        """Return a fresh cached value, or None. ``max_age`` overrides the TTL."""
+        max_age = self.ttl if max_age is None else max_age
+        now = time.time()
+
+        entry = self._memory.get(key)
+        if entry is not None:
+            if now - entry[0] <= max_age:
+                self._memory.move_to_end(key)
+                self.hits_memory += 1
+                return entry[1]
+
+        entry = self._read_disk(key)
+        if entry is not None and now - entry[0] <= max_age:
+            self._remember(key, entry)
+            self.hits_disk += 1
+            return entry[1]
+
+        self.misses += 1
+        return None
+
+    def set(self, key: str, value: Any):
+        """Store a value in both tiers."""
+        entry = (time.time(), value)
+        self._remember(key, entry)
+        self._write_disk(key, entry)
+        self.stores += 1
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits_memory + self.hits_disk + self.misses
+        return {
+            "hits_memory": self.hits_memory,
+            "hits_disk": self.hits_disk,
+            "misses": self.misses,
+            "hit_ratio": round((self.hits_memory + self.hits_disk) / lookups, 3) if lookups else 0.0,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "memory_entries": len(self._memory),
+            "disk_entries": self._disk_count,
+        }
+
+    # ── memory tier ──────────────────────────────────────────────────
+
+    def _remember(self, key: str, entry: Tuple[float, Any]):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    # ── disk tier ────────────────────────────────────────────────────
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def _read_disk(self, key: str) -> Optional[Tuple[float, Any]]:
+        if self.directory is None:
+            return None
+        try:
+            with open(self._path(key), "r") as f:
+                record = json.load(f)
+            return record["t"], record["v"]
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Discarding unreadable cache entry {key[:12]}: {e}")
+            return None
+
+    def _write_disk(self, key: str, entry: Tuple[float, Any]):
+        if self.directory is None:
+            return
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            existed = path.exists()
+            tmp_path = path.with_suffix(".tmp")
+            with open(tmp_path, "w") as f:
+                json.dump({"t": entry[0], "v": entry[1]}, f, separators=(",", ":"))
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to write cache entry {key[:12]}: {e}")
+            return
+
+        if not existed:
+            if self._disk_count is None:
+                self._disk_count = sum(1 for _ in self.directory.glob("*/*.json"))
+            else:
+                self._disk_count += 1
+            if self._disk_count > self.max_disk_entries:
+                self._prune_disk()
+
+    def _prune_disk(self):
+        """Drop the oldest files until the disk tier is 10% under its cap."""
+        files = sorted(self.directory.glob("*/*.json"), key=lambda p: p.stat().st_mtime)
+        target = int(self.max_disk_entries * 0.9)
+        excess = len(files) - target
+        for path in files[:max(excess, 0)]:
+            try:
+                path.unlink()
+                self.evictions += 1
+            except OSError:
+                pass
+        self._disk_count = min(len(files), target)
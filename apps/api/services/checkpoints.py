@@ -0,0 +1,121 @@
+"""Step-level checkpoints so interrupted or failed runs resume where they stopped."""
+import asyncio
+import dataclasses
+import logging
+from typing import Any, Dict
+
+from pydantic import TypeAdapter
+from pydantic_core import to_jsonable_python
+
+from app.storage import StorageBackend
+from services.cache import make_key
+from services.scheduler import Step, StepGraph
+from shared.models import VentureDossier
+
+logger = logging.getLogger(__name__)
+
+
+def decode_output(name: str, value: Any) -> Any:
+    """Rebuild a checkpointed output: dossier sections as their models, other values as plain JSON."""
+    field = VentureDossier.model_fields.get(name)
+    if field is None or value is None:
+        return value
+    return TypeAdapter(field.annotation).validate_python(value)
+
+
+class StepCheckpointer:
+    """Record each step's outputs with a fingerprint of its inputs.
+
+    A wrapped step whose inputs hash the same as at its last successful
+    completion returns the recorded outputs instead of running, so a resumed
+    run only pays for the steps that had not finished. Steps downstream of
+    one whose output changed see different inputs and run again. A
+    ``pinned`` checkpoint holds user-edited outputs and is restored
+    whatever the inputs, once: it is then re-recorded with the inputs'
+    fingerprint, so later changes upstream of the edit invalidate it.
+
+    ``version`` (the model and prompt version) is part of every
+    fingerprint, so changing either re-runs steps rather than restoring
+    outputs they would no longer produce.
+    """
+
+    def __init__(self, storage: StorageBackend, run_id: str, version: str = ""):
+        self.storage = storage
+        self.run_id = run_id
+        self.version = version
+        self.restored: list = []
+
+    def wrap(self, graph: StepGraph) -> StepGraph:
+        return StepGraph([dataclasses.replace(step, fn=self._checkpointed(step)) for step in graph.steps])
+
+    def fingerprint(self, step: Step, inputs: Dict[str, Any]) -> str:
+        return make_key(self.version, step.name, to_jsonable_python(inputs))
+
+    def _checkpointed(self, step: Step):
+        async def run(**inputs):
+            fingerprint = self.fingerprint(step, inputs)
+            checkpoint = await self._load(step)
+            if checkpoint and (checkpoint.get("pinned") or checkpoint.get("fingerprint") == fingerprint):
+                try:
+                    outputs = tuple(decode_output(name, checkpoint["outputs"][name]) for name in step.outputs)
+                except (KeyError, ValueError) as e:
+                    logger.warning(f"Ignoring stale checkpoint {step.name} for {self.run_id}: {e}")
+                else:
+                    if checkpoint.get("pinned"):
+                        await self.storage.save_checkpoint(self.run_id, step.name, {
+                            "fingerprint": fingerprint,
+                            "outputs": checkpoint["outputs"],
+                        })
+                    self.restored.append(step.name)
+                    return outputs[0] if len(outputs) == 1 else outputs
+
+            result = await step.fn(**inputs)
+            values = (result,) if len(step.outputs) == 1 else result
+            await self.storage.save_checkpoint(self.run_id, step.name, {
+                "fingerprint": fingerprint,
+                "outputs": to_jsonable_python(dict(zip(step.outputs, values))),
+            })
+            return result
+
+        return run
+
+    async def _load(self, step: Step):
+        try:
+            return await self.storage.get_checkpoint(self.run_id, step.name)
+        except Exception as e:
+            # A corrupt checkpoint just means the step runs again
+            logger.warning(f"Ignoring unreadable checkpoint {step.name} for {self.run_id}: {e}")
+            return None
+
+
+async def fork_checkpoints(
+    storage: StorageBackend,
+    graph: StepGraph,
+    parent: VentureDossier,
+    run_id: str,
+    edits: Dict[str, Any],
+):
+    """Seed ``run_id`` with ``parent``'s checkpoints, pinning edited sections.
+
+    ``edits`` maps dossier sections to their new values. The step producing
+    an edited section is pinned to the edit (its other outputs come from the
+    parent dossier), so it does not run; steps downstream of it see new
+    inputs and run again, and every other step restores the parent's work.
+    Only this fork's edits are pinned: a pin inherited from a parent that
+    has not run yet is not copied, so that step runs again.
+    """
+    parent_doc = parent.model_dump(mode="json")
+
+    async def copy(step: Step):
+        if any(name in edits for name in step.outputs):
+            outputs = {name: parent_doc.get(name) for name in step.outputs}
+            outputs.update(to_jsonable_python({name: edits[name] for name in step.outputs if name in edits}))
+            checkpoint = {"fingerprint": None, "outputs": outputs, "pinned": True}
+        else:
+            checkpoint = await storage.get_checkpoint(parent.run_id, step.name)
+            if checkpoint and checkpoint.get("pinned"):
+                checkpoint = None
+        if checkpoint:
+            await storage.save_checkpoint(run_id, step.name, checkpoint)
+
+    await asyncio.gather(*(copy(step) for step in graph.steps))
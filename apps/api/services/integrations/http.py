@@ -0,0 +1,39 @@
+"""Shared construction of pooled httpx clients."""
+import logging
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+def build_async_client(
+    timeout: httpx.Timeout,
+    max_connections: int,
+    max_keepalive: int,
+    keepalive_expiry: float,
+    http2: bool = True,
+    **kwargs,
+) -> httpx.AsyncClient:
+    """Build a long-lived AsyncClient with keep-alive pooling.
+
+    HTTP/2 is only enabled when requested and the ``h2`` package is installed.
+    """
+    if http2 and not HTTP2_AVAILABLE:
+        logger.info("HTTP/2 requested but h2 is not installed; using HTTP/1.1")
+    limits = httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_keepalive,
+        keepalive_expiry=keepalive_expiry,
+    )
+    return httpx.AsyncClient(
+        timeout=timeout,
+        limits=limits,
+        http2=http2 and HTTP2_AVAILABLE,
+        **kwargs,
+    )
@@ -6,27 +6,118 @@ from typing import Any, Dict, Optional
 import httpx
 
 from config import settings
+from services.cache import ResponseCache, make_key
+from services.integrations.http import build_async_client
 
 logger = logging.getLogger(__name__)
 
 TIMEOUT = httpx.Timeout(180.0, connect=15.0)
 
+_client: Optional[httpx.AsyncClient] = None
+_cache: Optional[ResponseCache] = None
+
+
+class PoolStats:
+    """Counters describing how hard the shared LLM connection pool is used."""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.requests_total = 0
+        self.saturated_total = 0
+        self.errors_total = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "max_connections": settings.llm_max_connections,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "requests_total": self.requests_total,
+            "saturated_total": self.saturated_total,
+            "errors_total": self.errors_total,
+        }
+
+
+pool_stats = PoolStats()
+
+
+def get_llm_http_client() -> httpx.AsyncClient:
+    """Return the long-lived client, creating it on first use outside the API lifespan."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = build_async_client(
+            timeout=TIMEOUT,
+            max_connections=settings.llm_max_connections,
+            max_keepalive=settings.llm_max_keepalive,
+            keepalive_expiry=settings.llm_keepalive_expiry,
+            http2=settings.llm_http2,
+            base_url=settings.openai_base_url.rstrip("/"),
+            headers={
+                "Authorization": f"Bearer {settings.openai_api_key}",
+                "Content-Type": "application/json",
+            },
+        )
+    return _client
+
+
+async def start_llm_client():
+    """Open the shared client and, if enabled, warm a connection to the endpoint."""
+    client = get_llm_http_client()
+    if not settings.llm_warmup:
+        return
+    try:
+        resp = await client.get("/models", timeout=httpx.Timeout(10.0, connect=5.0))
+        logger.info(f"LLM connection warmed up ({resp.status_code})")
+    except httpx.HTTPError as e:
+        logger.warning(f"LLM warmup failed: {e}")
+
+
+def get_llm_cache() -> ResponseCache:
+    """Response cache stored under the local storage base path."""
+    global _cache
+    if _cache is None:
+        from app.storage.local import LocalStorageBackend
+        _cache = ResponseCache(
+            LocalStorageBackend().cache_path / "llm",
+            ttl=settings.llm_cache_ttl,
+            max_entries=settings.llm_cache_max_entries,
+            max_disk_entries=settings.llm_cache_max_disk_entries,
+        )
+    return _cache
+
+
+async def close_llm_client():
+    """Close the shared client (called on shutdown)."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
 
 async def llm_json(
     system_prompt: str,
     user_prompt: str,
     model: Optional[str] = None,
     temperature: float = 0.1,
+    cache: Optional[bool] = None,
 ) -> Dict[str, Any]:
-    """Call the LLM and parse a JSON response."""
+    """Call the LLM and parse a JSON response.
+
+    Responses are cached by (model, temperature, system, user). Sampled calls
+    (temperature > 0) bypass the cache unless ``cache=True`` or
+    ``llm_cache_allow_sampling`` is set.
+    """
     model = model or settings.llm_model
-    api_key = settings.openai_api_key
     base_url = settings.openai_base_url.rstrip("/")
 
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json",
-    }
+    if cache is None:
+        cache = settings.llm_cache_enabled and (temperature == 0 or settings.llm_cache_allow_sampling)
+    key = make_key(model, temperature, system_prompt, user_prompt) if cache else None
+    if key:
+        cached = get_llm_cache().get(key)
+        if cached is not None:
+            logger.info(f"LLM cache hit  model={model}")
+            return cached
 
     payload = {
         "model": model,
@@ -40,23 +131,34 @@ async def llm_json(
 
     logger.info(f"LLM call → {base_url}/chat/completions  model={model}")
 
-    async with httpx.AsyncClient(timeout=TIMEOUT) as client:
-        resp = await client.post(
-            f"{base_url}/chat/completions",
-            headers=headers,
-            json=payload,
-        )
+    client = get_llm_http_client()
+    if pool_stats.in_flight >= settings.llm_max_connections:
+        pool_stats.saturated_total += 1
+    pool_stats.in_flight += 1
+    pool_stats.peak_in_flight = max(pool_stats.peak_in_flight, pool_stats.in_flight)
+    pool_stats.requests_total += 1
+    try:
+        resp = await client.post("/chat/completions", json=payload)
+    except httpx.HTTPError:
+        pool_stats.errors_total += 1
+        raise
+    finally:
+        pool_stats.in_flight -= 1
 
-        if resp.status_code != 200:
-            body = resp.text
-            logger.error(f"LLM API error {resp.status_code}: {body[:500]}")
-            raise Exception(f"LLM API error {resp.status_code}: {body[:200]}")
+    if resp.status_code != 200:
+        pool_stats.errors_total += 1
+        body = resp.text
+        logger.error(f"LLM API error {resp.status_code}: {body[:500]}")
+        raise Exception(f"LLM API error {resp.status_code}: {body[:200]}")
 
-        data = resp.json()
+    data = resp.json()
 
     content = data["choices"][0]["message"]["content"]
     logger.info(f"LLM response length: {len(content)} chars")
-    return _extract_json(content)
+    result = _extract_json(content)
+    if key and "error" not in result:
+        get_llm_cache().set(key, result)
+    return result
 
 
 def _extract_json(text: str) -> Dict[str, Any]:
@@ -0,0 +1,312 @@
+"""Embedded market graph for deployments without Neo4j.
+
+Offers the same interface as ``Neo4jClient`` on an in-process graph whose
+nodes are keyed by (label, name) with per-relationship adjacency sets in
+both directions, so queries are dictionary walks rather than bolt
+round-trips. Every write is persisted to a SQLite file. Each write
+transaction stamps the rows it touches with the next sequence number, so
+when another process (the API or a worker) has committed, a process loads
+only the rows stamped after the last one it has seen. File I/O runs on a
+worker thread; the in-memory graph is only changed on the event loop.
+"""
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+from collections import Counter
+from datetime import datetime, timezone
+from itertools import combinations
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from app.storage.base import open_sqlite
+from services.integrations.neo4j_client import market_graph_rows
+
+logger = logging.getLogger(__name__)
+
+Node = Tuple[str, str]  # (label, name); an Idea's name is its run_id
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS nodes (
+    label TEXT NOT NULL,
+    name TEXT NOT NULL,
+    props TEXT NOT NULL,
+    seq INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (label, name)
+);
+CREATE TABLE IF NOT EXISTS edges (
+    src_label TEXT NOT NULL,
+    src TEXT NOT NULL,
+    type TEXT NOT NULL,
+    dst_label TEXT NOT NULL,
+    dst TEXT NOT NULL,
+    seq INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (src_label, src, type, dst_label, dst)
+);
+"""
+
+# Sequence number for the next write transaction; writers hold the write
+# lock while they read and use it, so numbers grow in commit order
+NEXT_SEQ = """
+SELECT max(coalesce((SELECT max(seq) FROM nodes), 0), coalesce((SELECT max(seq) FROM edges), 0)) + 1
+"""
+
+
+class LocalGraphStore:
+    """Market graph kept in memory and persisted to a local SQLite file."""
+
+    available = True
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._data_version: Optional[int] = None
+        # Highest sequence number loaded into memory; -1 means nothing is loaded
+        self._seq = -1
+        self._analytics: Optional[Dict[str, Any]] = None
+        self.nodes: Dict[Node, Dict[str, Any]] = {}
+        self.out: Dict[Node, Dict[str, Set[Node]]] = {}
+        self.inc: Dict[Node, Dict[str, Set[Node]]] = {}
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = open_sqlite(self.path, SCHEMA)
+            for table in ("nodes", "edges"):
+                # Files written before rows were sequenced load in full once
+                if "seq" not in {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}:
+                    conn.execute(f"ALTER TABLE {table} ADD COLUMN seq INTEGER NOT NULL DEFAULT 0")
+                conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_seq ON {table} (seq)")
+            self._conn = conn
+        return self._conn
+
+    async def start(self):
+        """Open the file and load the graph."""
+        await self._sync()
+        logger.info(f"Local graph store at {self.path}: {len(self.nodes)} nodes")
+
+    async def initialize_schema(self):
+        """Tables are created when the file is opened."""
+
+    async def close(self):
+        if self._conn is not None:
+            await asyncio.to_thread(self._conn.close)
+            self._conn = None
+            self._data_version = None
+
+    def metrics(self) -> Dict[str, Any]:
+        """Size of the in-memory graph, for /api/metrics."""
+        return {
+            "path": str(self.path),
+            "nodes": len(self.nodes),
+            "edges": sum(len(targets) for kinds in self.out.values() for targets in kinds.values()),
+            "seq": self._seq,
+        }
+
+    # ---------------------------------------------------------------- graph
+
+    async def _sync(self):
+        """Load the rows other connections committed since the last load."""
+        seq = self._seq
+        changes = await asyncio.to_thread(self._read_changes, seq)
+        if changes is None:
+            return
+        version, nodes, edges = changes
+        if seq < 0:
+            self.nodes, self.out, self.inc = {}, {}, {}
+        for label, name, props, row_seq in nodes:
+            self.nodes[(label, name)] = json.loads(props)
+            seq = max(seq, row_seq)
+        for src_label, src, kind, dst_label, dst, row_seq in edges:
+            self._link((src_label, src), kind, (dst_label, dst))
+            seq = max(seq, row_seq)
+        self._seq = max(self._seq, seq)
+        self._data_version = version
+        if nodes or edges:
+            self._analytics = None
+
+    def _read_changes(self, after: int) -> Optional[Tuple[int, list, list]]:
+        """(data_version, nodes, edges) stamped after ``after``, or None if nothing was committed."""
+        with self._lock:
+            version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+            if version == self._data_version:
+                return None
+            nodes = self.conn.execute("SELECT label, name, props, seq FROM nodes WHERE seq > ?", (after,)).fetchall()
+            edges = self.conn.execute(
+                "SELECT src_label, src, type, dst_label, dst, seq FROM edges WHERE seq > ?", (after,)
+            ).fetchall()
+        return version, nodes, edges
+
+    def _link(self, src: Node, kind: str, dst: Node) -> bool:
+        targets = self.out.setdefault(src, {}).setdefault(kind, set())
+        if dst in targets:
+            return False
+        targets.add(dst)
+        self.inc.setdefault(dst, {}).setdefault(kind, set()).add(src)
+        return True
+
+    def _neighbors(self, node: Node, kind: str, incoming: bool = False) -> Set[Node]:
+        return (self.inc if incoming else self.out).get(node, {}).get(kind, set())
+
+    async def store_market_graph(
+        self,
+        run_id: str,
+        idea: str,
+        competitors: List[Dict[str, Any]],
+        segments: List[Dict[str, Any]],
+        differentiators: List[str],
+    ):
+        """Merge a run's market graph, persisting only nodes and edges that changed."""
+        await self._sync()
+        rows = market_graph_rows(competitors, segments, differentiators)
+        changed_nodes: Dict[Node, Dict[str, Any]] = {}
+        new_edges: List[Tuple[Node, str, Node]] = []
+
+        def merge(node: Node, **props) -> Node:
+            merged = {**self.nodes.get(node, {}), **props}
+            if node not in self.nodes or merged != self.nodes[node]:
+                self.nodes[node] = changed_nodes[node] = merged
+            return node
+
+        def link(src: Node, kind: str, dst: Node):
+            if self._link(src, kind, dst):
+                new_edges.append((src, kind, dst))
+
+        idea_node = merge(("Idea", run_id), description=idea)
+        segment_nodes = []
+        for row in rows["segments"]:
+            segment = merge(("Segment", row["name"]), size_estimate=row["size_estimate"])
+            link(idea_node, "TARGETS", segment)
+            segment_nodes.append(segment)
+        for row in rows["competitors"]:
+            competitor = merge(
+                ("Competitor", row["name"]), description=row["description"], url=row["url"], pricing=row["pricing"]
+            )
+            link(idea_node, "COMPETES_WITH", competitor)
+            for feature in row["features"]:
+                link(competitor, "HAS_FEATURE", merge(("Feature", feature)))
+            # Every competitor serves every segment (simplified), as in Neo4j
+            for segment in segment_nodes:
+                link(competitor, "SERVES", segment)
+        for name in rows["differentiators"]:
+            link(idea_node, "DIFFERS_ON", merge(("Differentiator", name)))
+
+        if changed_nodes or new_edges:
+            self._analytics = None
+            node_rows = [(label, name, json.dumps(props)) for (label, name), props in changed_nodes.items()]
+            edge_rows = [(src[0], src[1], kind, dst[0], dst[1]) for src, kind, dst in new_edges]
+            try:
+                await asyncio.to_thread(self._persist, node_rows, edge_rows)
+            except Exception:
+                # Memory is ahead of the file now; reload it in full on the next call
+                self._data_version = None
+                self._seq = -1
+                raise
+
+    def _persist(self, nodes: List[tuple], edges: List[tuple]):
+        # Own rows are not counted as loaded: a row another process committed
+        # with an earlier number may not have been read yet
+        with self._lock:
+            conn = self.conn
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                seq = conn.execute(NEXT_SEQ).fetchone()[0]
+                conn.executemany(
+                    "INSERT INTO nodes (label, name, props, seq) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT (label, name) DO UPDATE SET props = excluded.props, seq = excluded.seq",
+                    [(*row, seq) for row in nodes],
+                )
+                conn.executemany(
+                    "INSERT OR IGNORE INTO edges VALUES (?, ?, ?, ?, ?, ?)",
+                    [(*row, seq) for row in edges],
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    async def get_top_competitors(self, run_id: str, limit: int = 5) -> List[Dict[str, Any]]:
+        """Get top competitors by segment overlap with the run's idea."""
+        await self._sync()
+        overlap: Counter = Counter()
+        for segment in self._neighbors(("Idea", run_id), "TARGETS"):
+            overlap.update(self._neighbors(segment, "SERVES", incoming=True))
+        ranked = sorted(overlap.items(), key=lambda item: (-item[1], item[0][1]))[:limit]
+        return [
+            {
+                "name": competitor[1],
+                "description": self.nodes[competitor].get("description"),
+                "segment_overlap": count,
+                "features": sorted(f[1] for f in self._neighbors(competitor, "HAS_FEATURE")),
+            }
+            for competitor, count in ranked
+        ]
+
+    # ------------------------------------------------------------ analytics
+
+    async def refresh_analytics(self, force: bool = False) -> bool:
+        """Recompute the cross-run aggregates if the graph changed since the last refresh."""
+        await self._sync()
+        if self._analytics is not None and not force:
+            return False
+
+        competitors = [node for node in self.nodes if node[0] == "Competitor"]
+        runs = [node for node in self.nodes if node[0] == "Idea"]
+
+        frequency = [
+            {"name": c[1], "runs": len(self._neighbors(c, "COMPETES_WITH", incoming=True))} for c in competitors
+        ]
+        frequency = sorted((row for row in frequency if row["runs"]), key=lambda r: (-r["runs"], r["name"]))
+
+        cooccurrence: Counter = Counter()
+        for run in runs:
+            names = sorted(s[1] for s in self._neighbors(run, "TARGETS"))
+            cooccurrence.update(combinations(names, 2))
+
+        shared: Counter = Counter()
+        for feature in (node for node in self.nodes if node[0] == "Feature"):
+            names = sorted(c[1] for c in self._neighbors(feature, "HAS_FEATURE", incoming=True))
+            shared.update(combinations(names, 2))
+        similarity = []
+        for (a, b), count in shared.items():
+            union = (
+                len(self._neighbors(("Competitor", a), "HAS_FEATURE"))
+                + len(self._neighbors(("Competitor", b), "HAS_FEATURE"))
+                - count
+            )
+            similarity.append({"competitor": a, "other": b, "score": count / union, "shared_features": count})
+
+        self._analytics = {
+            "refreshed_at": datetime.now(timezone.utc).isoformat(),
+            "runs": len(runs),
+            "competitors": len(competitors),
+            "competitor_frequency": frequency,
+            "segment_cooccurrence": [
+                {"segment": a, "other": b, "runs": n}
+                for (a, b), n in sorted(cooccurrence.items(), key=lambda item: (-item[1], item[0]))
+            ],
+            "feature_similarity": sorted(
+                similarity,
+                key=lambda r: (-r["score"], -r["shared_features"], r["competitor"], r["other"]),
+            ),
+        }
+        return True
+
+    async def get_graph_analytics(self, limit: int = 10) -> Dict[str, Any]:
+        """Cross-run aggregates, recomputed only after the graph changes."""
+        await self.refresh_analytics()
+        return {
+            key: value[:limit] if isinstance(value, list) else value
+            for key, value in self._analytics.items()
+        }
+
+    async def get_competitor_run_counts(self, names: List[str]) -> Dict[str, int]:
+        """How many runs each named competitor appeared in."""
+        await self._sync()
+        return {
+            name: len(self._neighbors(("Competitor", name), "COMPETES_WITH", incoming=True))
+            for name in names
+            if ("Competitor", name) in self.nodes
+        }
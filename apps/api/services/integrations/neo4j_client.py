@@ -0,0 +1,618 @@
+"""Neo4j market graph client."""
+import asyncio
+import hashlib
+import json
+import logging
+import random
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional
+
+try:
+    from neo4j import AsyncGraphDatabase
+    from neo4j.exceptions import ServiceUnavailable, SessionExpired
+
+    # Errors meaning the server is gone, not that a query failed
+    CONNECTION_ERRORS = (ServiceUnavailable, SessionExpired, OSError)
+except ImportError:  # optional graph store
+    AsyncGraphDatabase = None
+    CONNECTION_ERRORS = (OSError,)
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Features kept per competitor
+MAX_FEATURES = 3
+
+# Runs whose last written graph state is remembered in memory
+WRITTEN_RUNS_CACHE = 1024
+
+# store_market_graph writes a run's graph with these statements in a single
+# write transaction; list parameters are expanded server-side with UNWIND.
+# REMOVE drops the graph_state blob earlier versions kept on the Idea node.
+MERGE_IDEA = """
+MERGE (i:Idea {run_id: $run_id})
+SET i.description = $idea, i.updated_at = datetime()
+REMOVE i.graph_state
+"""
+
+MERGE_SEGMENTS = """
+MATCH (i:Idea {run_id: $run_id})
+UNWIND $rows AS row
+MERGE (s:Segment {name: row.name})
+SET s.size_estimate = row.size_estimate
+MERGE (i)-[:TARGETS]->(s)
+"""
+
+MERGE_COMPETITORS = """
+MATCH (i:Idea {run_id: $run_id})
+UNWIND $rows AS row
+MERGE (c:Competitor {name: row.name})
+SET c.description = row.description, c.url = row.url, c.pricing = row.pricing
+MERGE (i)-[:COMPETES_WITH]->(c)
+WITH c, row
+UNWIND row.features AS feature
+MERGE (f:Feature {name: feature})
+MERGE (c)-[:HAS_FEATURE]->(f)
+"""
+
+# Every competitor serves every segment (simplified); rows are [competitor, segment]
+MERGE_SERVES = """
+UNWIND $pairs AS pair
+MATCH (c:Competitor {name: pair[0]})
+MATCH (s:Segment {name: pair[1]})
+MERGE (c)-[:SERVES]->(s)
+"""
+
+MERGE_DIFFERENTIATORS = """
+MATCH (i:Idea {run_id: $run_id})
+UNWIND $rows AS name
+MERGE (d:Differentiator {name: name})
+MERGE (i)-[:DIFFERS_ON]->(d)
+"""
+
+
+class GraphPoolStats:
+    """Counters describing the Neo4j connection and the sessions this client opens on it.
+
+    The driver does not expose its connection pool, so load is measured in
+    this client's own sessions: ``sessions_in_flight_ratio`` is sessions
+    open against ``max_pool_size``, and ``sessions_over_pool_size_total``
+    counts sessions opened while that many were already open. Both are
+    proxies for pool pressure, not the pool's own numbers.
+    """
+
+    def __init__(self):
+        self.connected = False
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.sessions_total = 0
+        self.sessions_over_pool_size_total = 0
+        self.errors_total = 0
+        self.skipped_total = 0
+        self.busy_seconds_total = 0.0
+        self.reconnects_total = 0
+        self.last_error: Optional[str] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "connected": self.connected,
+            "max_pool_size": settings.neo4j_max_pool_size,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "sessions_in_flight_ratio": round(self.in_flight / max(settings.neo4j_max_pool_size, 1), 3),
+            "sessions_total": self.sessions_total,
+            "sessions_over_pool_size_total": self.sessions_over_pool_size_total,
+            "errors_total": self.errors_total,
+            "skipped_total": self.skipped_total,
+            "avg_session_ms": round(self.busy_seconds_total * 1000 / max(self.sessions_total, 1), 1),
+            "reconnects_total": self.reconnects_total,
+            "last_error": self.last_error,
+        }
+
+
+graph_stats = GraphPoolStats()
+
+# Cross-run aggregates, materialized by refresh_analytics so that analytics
+# reads only touch precomputed properties. Each statement recomputes its
+# aggregate in full; GraphStats records when that last happened.
+ANALYTICS_STALE = """
+OPTIONAL MATCH (g:GraphStats {id: 'market'})
+WITH coalesce(g.refreshed_at, datetime({epochMillis: 0})) AS since
+MATCH (i:Idea) WHERE i.updated_at > since
+RETURN count(i) AS changed
+"""
+
+REFRESH_COMPETITOR_COUNTS = """
+MATCH (c:Competitor)
+SET c.run_count = size([(c)<-[:COMPETES_WITH]-(:Idea) | 1])
+"""
+
+REFRESH_SEGMENT_COOCCURRENCE = """
+MATCH (a:Segment)<-[:TARGETS]-(i:Idea)-[:TARGETS]->(b:Segment)
+WHERE a.name < b.name
+WITH a, b, count(DISTINCT i) AS runs
+MERGE (a)-[r:CO_OCCURS]->(b)
+SET r.runs = runs
+"""
+
+# Jaccard similarity of competitors' feature sets
+REFRESH_FEATURE_SIMILARITY = """
+MATCH (a:Competitor)-[:HAS_FEATURE]->(f:Feature)<-[:HAS_FEATURE]-(b:Competitor)
+WHERE a.name < b.name
+WITH a, b, count(DISTINCT f) AS shared
+WITH a, b, shared,
+     size([(a)-[:HAS_FEATURE]->() | 1]) + size([(b)-[:HAS_FEATURE]->() | 1]) - shared AS total
+MERGE (a)-[r:SIMILAR_TO]->(b)
+SET r.shared = shared, r.score = toFloat(shared) / total
+"""
+
+# OPTIONAL MATCH keeps one row when a label has no nodes, so the stats are
+# always written, with zero counts on an empty graph
+REFRESH_GRAPH_STATS = """
+OPTIONAL MATCH (i:Idea)
+WITH count(i) AS runs
+OPTIONAL MATCH (c:Competitor)
+WITH runs, count(c) AS competitors
+MERGE (g:GraphStats {id: 'market'})
+SET g.refreshed_at = datetime(), g.runs = runs, g.competitors = competitors
+"""
+
+READ_GRAPH_STATS = """
+MATCH (g:GraphStats {id: 'market'})
+RETURN toString(g.refreshed_at) AS refreshed_at, g.runs AS runs, g.competitors AS competitors
+"""
+
+READ_COMPETITOR_FREQUENCY = """
+MATCH (c:Competitor) WHERE c.run_count > 0
+RETURN c.name AS name, c.run_count AS runs
+ORDER BY runs DESC, name
+LIMIT $limit
+"""
+
+READ_SEGMENT_COOCCURRENCE = """
+MATCH (a:Segment)-[r:CO_OCCURS]->(b:Segment)
+RETURN a.name AS segment, b.name AS other, r.runs AS runs
+ORDER BY runs DESC, segment, other
+LIMIT $limit
+"""
+
+READ_FEATURE_SIMILARITY = """
+MATCH (a:Competitor)-[r:SIMILAR_TO]->(b:Competitor)
+RETURN a.name AS competitor, b.name AS other, r.score AS score, r.shared AS shared_features
+ORDER BY score DESC, shared_features DESC, competitor, other
+LIMIT $limit
+"""
+
+READ_COMPETITOR_RUN_COUNTS = """
+UNWIND $names AS name
+MATCH (c:Competitor {name: name})
+RETURN c.name AS name, c.run_count AS runs
+"""
+
+
+def _digest(value: Any) -> str:
+    raw = json.dumps(value, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def market_graph_rows(
+    competitors: List[Dict[str, Any]],
+    segments: List[Dict[str, Any]],
+    differentiators: List[str],
+) -> Dict[str, List[Any]]:
+    """Parameter lists for the UNWIND statements, de-duplicated by name (last wins)."""
+    segment_rows = {
+        s["name"]: {"name": s["name"], "size_estimate": s.get("size_estimate") or ""}
+        for s in segments if s.get("name")
+    }
+    competitor_rows = {
+        c["name"]: {
+            "name": c["name"],
+            "description": c.get("description") or "",
+            "url": c.get("url") or "",
+            "pricing": c.get("pricing") or "",
+            # The pipeline fills Competitor.features; strengths is the older field
+            "features": list(dict.fromkeys(c.get("features") or c.get("strengths") or []))[:MAX_FEATURES],
+        }
+        for c in competitors if c.get("name")
+    }
+    return {
+        "segments": list(segment_rows.values()),
+        "competitors": list(competitor_rows.values()),
+        "differentiators": list(dict.fromkeys(d for d in differentiators if d)),
+    }
+
+
+class Neo4jClient:
+    """Neo4j client for market graph."""
+
+    def __init__(self):
+        self.uri = settings.neo4j_uri
+        self.user = settings.neo4j_user
+        self.password = settings.neo4j_password
+        self.driver = None
+        self.stats = graph_stats
+        # run_id -> graph_state() last written for the run by this process
+        self._written: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._monitor: Optional[asyncio.Task] = None
+        self._refresher: Optional[asyncio.Task] = None
+        self._lost = asyncio.Event()
+
+    @property
+    def available(self) -> bool:
+        return self.driver is not None
+
+    def metrics(self) -> Dict[str, Any]:
+        """Connection and session counters, for /api/metrics."""
+        return self.stats.as_dict()
+
+    async def connect(self) -> bool:
+        """Open a pooled driver and check the server answers; False if it does not."""
+        if AsyncGraphDatabase is None:
+            logger.warning("neo4j package not installed, graph features disabled")
+            return False
+        driver = AsyncGraphDatabase.driver(
+            self.uri,
+            auth=(self.user, self.password),
+            max_connection_pool_size=settings.neo4j_max_pool_size,
+            connection_acquisition_timeout=settings.neo4j_acquisition_timeout,
+            connection_timeout=settings.neo4j_connect_timeout,
+        )
+        try:
+            await driver.verify_connectivity()
+        except Exception as e:
+            self.stats.last_error = str(e)
+            await driver.close()
+            return False
+        self.driver = driver
+        self.stats.connected = True
+        self._lost.clear()
+        return True
+
+    async def start(self):
+        """Connect in the background and keep the connection healthy until ``close``.
+
+        Startup never waits on Neo4j: until the first connection succeeds,
+        and while reconnecting after a lost one, graph writes are skipped.
+        """
+        if AsyncGraphDatabase is None:
+            logger.warning("neo4j package not installed, graph features disabled")
+            return
+        if self._monitor is None:
+            self._monitor = asyncio.create_task(self._maintain())
+        if self._refresher is None and settings.neo4j_analytics_interval > 0:
+            self._refresher = asyncio.create_task(self._refresh_periodically())
+
+    async def _maintain(self):
+        delay = settings.neo4j_reconnect_backoff
+        connected_before = False
+        while True:
+            if self.driver is None:
+                if await self.connect():
+                    logger.info(f"Connected to Neo4j at {self.uri}")
+                    if connected_before:
+                        self.stats.reconnects_total += 1
+                    connected_before = True
+                    delay = settings.neo4j_reconnect_backoff
+                    await self.initialize_schema()
+                    continue
+                wait = delay * random.uniform(0.5, 1.0)
+                logger.warning(f"Neo4j unavailable ({self.stats.last_error}), retrying in {wait:.1f}s")
+                await asyncio.sleep(wait)
+                delay = min(delay * 2, settings.neo4j_reconnect_backoff_max)
+                continue
+
+            try:
+                await asyncio.wait_for(self._lost.wait(), timeout=settings.neo4j_health_interval)
+            except asyncio.TimeoutError:
+                try:
+                    await self.driver.verify_connectivity()
+                    continue
+                except Exception as e:
+                    self.stats.last_error = str(e)
+            logger.warning(f"Lost Neo4j connection: {self.stats.last_error}")
+            await self._drop_driver()
+
+    async def _drop_driver(self):
+        driver, self.driver = self.driver, None
+        self.stats.connected = False
+        if driver:
+            try:
+                await driver.close()
+            except Exception as e:
+                logger.debug(f"Neo4j driver close failed: {e}")
+
+    async def close(self):
+        """Stop the background tasks and close the driver."""
+        for task in (self._monitor, self._refresher):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._monitor = self._refresher = None
+        await self._drop_driver()
+
+    @asynccontextmanager
+    async def _session(self):
+        """A driver session, counted in the pool stats; connection errors trigger a reconnect."""
+        stats = self.stats
+        if stats.in_flight >= settings.neo4j_max_pool_size:
+            stats.sessions_over_pool_size_total += 1
+        stats.in_flight += 1
+        stats.peak_in_flight = max(stats.peak_in_flight, stats.in_flight)
+        start = time.perf_counter()
+        try:
+            async with self.driver.session() as session:
+                yield session
+        except CONNECTION_ERRORS as e:
+            stats.errors_total += 1
+            stats.last_error = str(e)
+            self._lost.set()
+            raise
+        except Exception:
+            stats.errors_total += 1
+            raise
+        finally:
+            stats.in_flight -= 1
+            stats.sessions_total += 1
+            stats.busy_seconds_total += time.perf_counter() - start
+
+    async def initialize_schema(self):
+        """Create indexes and constraints."""
+        if not self.driver:
+            return
+
+        queries = [
+            "CREATE CONSTRAINT IF NOT EXISTS FOR (i:Idea) REQUIRE i.run_id IS UNIQUE",
+            "CREATE CONSTRAINT IF NOT EXISTS FOR (c:Competitor) REQUIRE c.name IS UNIQUE",
+            "CREATE INDEX IF NOT EXISTS FOR (s:Segment) ON (s.name)",
+            "CREATE INDEX IF NOT EXISTS FOR (f:Feature) ON (f.name)",
+            "CREATE INDEX IF NOT EXISTS FOR (d:Differentiator) ON (d.name)",
+            "CREATE INDEX IF NOT EXISTS FOR (i:Idea) ON (i.updated_at)",
+            "CREATE INDEX IF NOT EXISTS FOR (c:Competitor) ON (c.run_count)",
+            "CREATE INDEX IF NOT EXISTS FOR ()-[r:CO_OCCURS]-() ON (r.runs)",
+            "CREATE INDEX IF NOT EXISTS FOR ()-[r:SIMILAR_TO]-() ON (r.score)",
+        ]
+
+        async with self.driver.session() as session:
+            for query in queries:
+                try:
+                    await session.run(query)
+                except Exception as e:
+                    logger.warning(f"Schema creation warning: {e}")
+
+    async def store_market_graph(
+        self,
+        run_id: str,
+        idea: str,
+        competitors: List[Dict[str, Any]],
+        segments: List[Dict[str, Any]],
+        differentiators: List[str],
+    ):
+        """Store market research as a graph in one write transaction.
+
+        When this process already wrote the run, only what changed since is
+        sent, and an identical graph is skipped without a round-trip. A run
+        this process has not written (new, or last written elsewhere) is
+        sent in full; the statements are idempotent MERGEs.
+        """
+        if not self.driver:
+            self.stats.skipped_total += 1
+            return
+
+        rows = market_graph_rows(competitors, segments, differentiators)
+        state = graph_state(idea, rows)
+        previous = self._written.get(run_id)
+        if previous == state:
+            return
+        statements = market_graph_statements(run_id, idea, rows, previous)
+        async with self._session() as session:
+            await session.execute_write(_write_market_graph, statements)
+        self._written[run_id] = state
+        self._written.move_to_end(run_id)
+        while len(self._written) > WRITTEN_RUNS_CACHE:
+            self._written.popitem(last=False)
+
+    async def get_top_competitors(self, run_id: str, limit: int = 5) -> List[Dict[str, Any]]:
+        """Get top competitors by feature overlap."""
+        if not self.driver:
+            return []
+
+        async with self._session() as session:
+            result = await session.run(
+                """
+                MATCH (i:Idea {run_id: $run_id})-[:TARGETS]->(s:Segment)<-[:SERVES]-(c:Competitor)
+                OPTIONAL MATCH (c)-[:HAS_FEATURE]->(f:Feature)
+                WITH c, count(DISTINCT s) as segment_overlap, collect(DISTINCT f.name) as features
+                RETURN c.name as name, c.description as description,
+                       segment_overlap, features
+                ORDER BY segment_overlap DESC
+                LIMIT $limit
+                """,
+                run_id=run_id,
+                limit=limit,
+            )
+
+            competitors = []
+            async for record in result:
+                competitors.append({
+                    "name": record["name"],
+                    "description": record["description"],
+                    "segment_overlap": record["segment_overlap"],
+                    "features": record["features"],
+                })
+
+            return competitors
+
+    async def refresh_analytics(self, force: bool = False) -> bool:
+        """Recompute the cross-run aggregates if any run changed since the last refresh.
+
+        Returns whether a refresh ran.
+        """
+        if not self.driver:
+            return False
+        async with self._session() as session:
+            return await session.execute_write(_refresh_analytics, force)
+
+    async def get_graph_analytics(self, limit: int = 10) -> Dict[str, Any]:
+        """Cross-run aggregates as of the last refresh; reads precomputed values only."""
+        async with self._session() as session:
+            return await session.execute_read(_read_analytics, limit)
+
+    async def get_competitor_run_counts(self, names: List[str]) -> Dict[str, int]:
+        """How many runs each named competitor appeared in, as of the last refresh."""
+        if not self.driver or not names:
+            return {}
+        async with self._session() as session:
+            result = await session.run(READ_COMPETITOR_RUN_COUNTS, names=names)
+            return {record["name"]: record["runs"] async for record in result if record["runs"] is not None}
+
+    async def _refresh_periodically(self):
+        while True:
+            await asyncio.sleep(settings.neo4j_analytics_interval)
+            if not self.driver:
+                continue
+            try:
+                start = time.perf_counter()
+                if await self.refresh_analytics():
+                    logger.info(f"Graph analytics refreshed in {time.perf_counter() - start:.2f}s")
+            except Exception as e:
+                logger.warning(f"Graph analytics refresh failed: {e}")
+
+
+def graph_state(idea: str, rows: Dict[str, List[Any]]) -> Dict[str, Any]:
+    """Digests of everything a run's graph write contains, keyed by node name."""
+    return {
+        "idea": _digest(idea),
+        "segments": {r["name"]: _digest(r) for r in rows["segments"]},
+        "competitors": {r["name"]: _digest(r) for r in rows["competitors"]},
+        "differentiators": sorted(rows["differentiators"]),
+    }
+
+
+def market_graph_statements(
+    run_id: str, idea: str, rows: Dict[str, List[Any]], previous: Optional[Dict[str, Any]] = None
+) -> List[tuple]:
+    """(query, parameters) pairs that bring a run's graph from ``previous`` to ``rows``.
+
+    Only nodes whose digest changed are re-merged, and only edges touching
+    a newly added node are created. With no ``previous`` state everything
+    is written. Removed items are left in place, as before.
+    """
+    previous = previous or {}
+    state = graph_state(idea, rows)
+    old_segments = previous.get("segments", {})
+    old_competitors = previous.get("competitors", {})
+    old_differentiators = set(previous.get("differentiators", []))
+
+    segments = [r for r in rows["segments"] if old_segments.get(r["name"]) != state["segments"][r["name"]]]
+    competitors = [
+        r for r in rows["competitors"] if old_competitors.get(r["name"]) != state["competitors"][r["name"]]
+    ]
+    pairs = [
+        [c, s]
+        for c in state["competitors"]
+        for s in state["segments"]
+        if c not in old_competitors or s not in old_segments
+    ]
+    differentiators = [d for d in rows["differentiators"] if d not in old_differentiators]
+
+    statements = [(MERGE_IDEA, {"run_id": run_id, "idea": idea})]
+    if segments:
+        statements.append((MERGE_SEGMENTS, {"run_id": run_id, "rows": segments}))
+    if competitors:
+        statements.append((MERGE_COMPETITORS, {"run_id": run_id, "rows": competitors}))
+    if pairs:
+        statements.append((MERGE_SERVES, {"pairs": pairs}))
+    if differentiators:
+        statements.append((MERGE_DIFFERENTIATORS, {"run_id": run_id, "rows": differentiators}))
+    return statements
+
+
+async def _refresh_analytics(tx, force: bool) -> bool:
+    if not force:
+        record = await (await tx.run(ANALYTICS_STALE)).single()
+        if not record["changed"]:
+            return False
+    for query in (
+        REFRESH_COMPETITOR_COUNTS,
+        REFRESH_SEGMENT_COOCCURRENCE,
+        REFRESH_FEATURE_SIMILARITY,
+        REFRESH_GRAPH_STATS,
+    ):
+        await (await tx.run(query)).consume()
+    return True
+
+
+async def _read_analytics(tx, limit: int) -> Dict[str, Any]:
+    async def rows(query):
+        return [record.data() async for record in await tx.run(query, limit=limit)]
+
+    stats = await (await tx.run(READ_GRAPH_STATS)).single()
+    return {
+        **(stats.data() if stats else {"refreshed_at": None, "runs": 0, "competitors": 0}),
+        "competitor_frequency": await rows(READ_COMPETITOR_FREQUENCY),
+        "segment_cooccurrence": await rows(READ_SEGMENT_COOCCURRENCE),
+        "feature_similarity": await rows(READ_FEATURE_SIMILARITY),
+    }
+
+
+async def _write_market_graph(tx, statements: List[tuple]):
+    for query, params in statements:
+        result = await tx.run(query, params)
+        await result.consume()
+
+
+_client = None  # Neo4jClient, or LocalGraphStore when the embedded store is used
+
+
+def graph_backend() -> Optional[str]:
+    """The graph store in use: "neo4j", "local", or None when graph features are off."""
+    backend = settings.graph_store
+    if backend == "auto":
+        backend = "neo4j" if settings.neo4j_uri and AsyncGraphDatabase is not None else "local"
+    return None if backend == "none" else backend
+
+
+async def start_neo4j_client():
+    """Create the shared graph client: Neo4j if configured, else the embedded store."""
+    global _client
+    if _client is None:
+        backend = graph_backend()
+        if backend == "local":
+            from services.integrations.local_graph import LocalGraphStore
+            _client = LocalGraphStore(settings.graph_local_path)
+            await _client.start()
+            return
+        _client = Neo4jClient()
+        if backend == "neo4j" and settings.neo4j_uri:
+            await _client.start()
+
+
+async def get_neo4j_client():
+    """Return the shared graph client, starting it on first use outside the API lifespan."""
+    if _client is None:
+        await start_neo4j_client()
+    return _client
+
+
+async def graph_metrics() -> Dict[str, Any]:
+    """Counters of the graph store in use, labelled with its backend."""
+    backend = graph_backend()
+    if backend is None:
+        return {"backend": None}
+    client = await get_neo4j_client()
+    return {"backend": backend, **client.metrics()}
+
+
+async def close_neo4j_client():
+    """Close the shared client (called on shutdown)."""
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
@@ -1,40 +1,134 @@
 """Tavily search client."""
 import logging
-from typing import List, Dict, Any
+import re
+import unicodedata
+from typing import List, Dict, Any, Optional
 
-from tavily import TavilyClient
+import httpx
 
 from config import settings
+from services.cache import ResponseCache, make_key
+from services.integrations.http import build_async_client
 
 logger = logging.getLogger(__name__)
 
+TAVILY_SEARCH_URL = "https://api.tavily.com/search"
+
+# Characters of page content kept per result; downstream prompts use at most this much.
+CONTENT_CHARS = 300
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from how in into is it of on or that the their "
+    "this to vs what which who with".split()
+)
+
+_client: Optional[httpx.AsyncClient] = None
+_cache: Optional[ResponseCache] = None
+
+
+def normalize_query(query: str) -> str:
+    """Canonical form of a query: casefolded, punctuation and stopwords dropped, terms sorted.
+
+    Terms are Unicode word characters, so non-Latin queries keep their
+    words; a query with no terms left falls back to its casefolded text.
+    """
+    text = unicodedata.normalize("NFKC", query).casefold()
+    terms = re.findall(r"[\w$%]+", text)
+    return " ".join(sorted({t for t in terms if t not in STOPWORDS})) or " ".join(text.split())
+
+
+def get_search_cache() -> ResponseCache:
+    """Search-result cache stored under the local storage base path."""
+    global _cache
+    if _cache is None:
+        from app.storage.local import LocalStorageBackend
+        _cache = ResponseCache(
+            LocalStorageBackend().cache_path / "search",
+            ttl=settings.search_cache_ttl,
+            max_entries=settings.search_cache_max_entries,
+            max_disk_entries=settings.search_cache_max_disk_entries,
+        )
+    return _cache
+
+
+def get_tavily_http_client() -> httpx.AsyncClient:
+    """Process-wide pooled client shared by all Tavily searches."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = build_async_client(
+            timeout=httpx.Timeout(settings.tavily_timeout, connect=10.0),
+            max_connections=settings.tavily_max_connections,
+            max_keepalive=settings.tavily_max_connections,
+            keepalive_expiry=30.0,
+            http2=settings.tavily_http2,
+        )
+    return _client
+
+
+async def close_tavily_client():
+    """Close the shared client (called on shutdown)."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+async def tavily_search(query: str, max_results: int = 8) -> List[Dict[str, Any]]:
+    """Run a Tavily web search and return results.
+
+    Results are cached by normalized query. With ``search_offline`` set, only
+    recorded results are served (regardless of age) and the network is never used.
+    """
+    key = make_key("tavily", normalize_query(query), max_results)
+    cache = get_search_cache()
+    cached = cache.get(key, max_age=float("inf") if settings.search_offline else None)
+    if cached is not None:
+        logger.info(f"Tavily cache hit: {query[:80]}")
+        return cached
+    if settings.search_offline:
+        logger.warning(f"Tavily offline, no recorded results for: {query[:80]}")
+        return []
 
-def tavily_search(query: str, max_results: int = 8) -> List[Dict[str, Any]]:
-    """Run a Tavily web search and return results."""
-    client = TavilyClient(api_key=settings.tavily_api_key)
     logger.info(f"Tavily search: {query[:80]}...")
 
     try:
-        response = client.search(
-            query=query,
-            search_depth="advanced",
-            max_results=max_results,
-            include_answer=False,
+        resp = await get_tavily_http_client().post(
+            TAVILY_SEARCH_URL,
+            json={
+                "api_key": settings.tavily_api_key,
+                "query": query,
+                "search_depth": "advanced",
+                "max_results": max_results,
+                "include_answer": False,
+            },
         )
-        results = response.get("results", [])
+        resp.raise_for_status()
+        results = [_compact(r) for r in resp.json().get("results", [])]
         logger.info(f"Tavily returned {len(results)} results")
+        if results:
+            cache.set(key, results)
         return results
     except Exception as e:
         logger.error(f"Tavily search failed: {e}")
         return []
 
 
+def _compact(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Keep only the fields the pipeline reads."""
+    return {
+        "url": result.get("url", ""),
+        "title": result.get("title", ""),
+        "content": (result.get("content") or "")[:CONTENT_CHARS],
+        "score": result.get("score"),
+    }
+
+
 def format_search_results(results: List[Dict[str, Any]]) -> str:
     """Format Tavily results into a text block for LLM consumption."""
     lines = []
     for i, r in enumerate(results, 1):
         lines.append(f"[{i}] {r.get('title', 'No title')}")
         lines.append(f"    URL: {r.get('url', '')}")
-        lines.append(f"    {r.get('content', '')[:300]}")
+        lines.append(f"    {r.get('content', '')[:CONTENT_CHARS]}")
         lines.append("")
     return "\n".join(lines)
@@ -0,0 +1,515 @@
+"""Bounded, persistent job queue for workflow runs.
+
+Runs execute either inside the API process (``job_runner="api"``) or in
+separate ``worker.py`` processes (``job_runner="worker"``), which claim jobs
+from the shared store and report progress by saving dossiers as usual.
+"""
+import asyncio
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from app.storage.base import open_sqlite
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[str, str], Awaitable[None]]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id TEXT NOT NULL UNIQUE,
+    idea_text TEXT NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 0,
+    state TEXT NOT NULL DEFAULT 'queued',
+    enqueued_at REAL NOT NULL,
+    worker TEXT,
+    lease_until REAL
+);
+"""
+
+PG_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS jobs (
+        seq BIGSERIAL PRIMARY KEY,
+        run_id TEXT NOT NULL UNIQUE,
+        idea_text TEXT NOT NULL,
+        priority INTEGER NOT NULL DEFAULT 0,
+        state TEXT NOT NULL DEFAULT 'queued',
+        enqueued_at DOUBLE PRECISION NOT NULL,
+        worker TEXT,
+        lease_until DOUBLE PRECISION
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS jobs_claim ON jobs (state, priority DESC, seq)",
+]
+
+# Highest priority first, then oldest; a running job whose lease ran out
+# belongs to a worker that died and is up for grabs again.
+CLAIMABLE = """
+    SELECT seq FROM jobs
+    WHERE state = 'queued' OR (state = 'running' AND lease_until < :now)
+    ORDER BY priority DESC, seq LIMIT 1
+"""
+
+
+# Postgres advisory lock key taken by submits that check the queue's capacity
+SUBMIT_LOCK = 0x6A6F6273
+
+
+class QueueFull(Exception):
+    """Raised when the queue holds ``max_queued`` jobs waiting to start."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Job queue is full; retry in {retry_after}s")
+        self.retry_after = retry_after
+
+
+class AlreadyQueued(Exception):
+    """Raised when a run already has an unfinished job."""
+
+    def __init__(self, run_id: str):
+        super().__init__(f"Run {run_id} is already queued or running")
+        self.run_id = run_id
+
+
+class JobStore(ABC):
+    """Durable table of jobs that have not finished yet.
+
+    A job is inserted when submitted, claimed with a lease by a worker,
+    and deleted when it finishes. Workers renew the lease while the job
+    runs, so a job whose worker died is claimable again once it expires.
+    """
+
+    async def initialize(self):
+        """Create the jobs table if needed."""
+        pass
+
+    @abstractmethod
+    async def add(self, run_id: str, idea_text: str, priority: int, max_queued: Optional[int] = None) -> bool:
+        """Insert a job; False, inserting nothing, if ``max_queued`` jobs already wait.
+
+        The capacity check and the insert are one atomic step, so
+        concurrent submits cannot overfill the queue. Raises AlreadyQueued
+        if the run has an unfinished job.
+        """
+        pass
+
+    @abstractmethod
+    async def claim(self, worker: str, lease: float) -> Optional[dict]:
+        """Take the next job for ``worker``, or None if nothing is claimable."""
+        pass
+
+    @abstractmethod
+    async def renew(self, run_id: str, worker: str, lease: float) -> bool:
+        """Extend the lease; False if ``worker`` no longer holds the job."""
+        pass
+
+    @abstractmethod
+    async def release(self, run_id: str, worker: str):
+        """Hand an unfinished job back to the queue."""
+        pass
+
+    @abstractmethod
+    async def remove(self, run_id: str):
+        pass
+
+    @abstractmethod
+    async def contains(self, run_id: str) -> bool:
+        """Whether the run has an unfinished job."""
+        pass
+
+    @abstractmethod
+    async def requeue_running(self) -> int:
+        """Release every claimed job, for a sole worker restarting after a crash."""
+        pass
+
+    @abstractmethod
+    async def counts(self) -> Dict[str, int]:
+        """Number of jobs per state."""
+        pass
+
+    async def close(self):
+        pass
+
+
+class SQLiteJobStore(JobStore):
+    """Jobs in a local SQLite file, shared by the API and workers on one host."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = open_sqlite(self.path, SCHEMA)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}
+            for column, kind in (("worker", "TEXT"), ("lease_until", "REAL")):
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {kind}")
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_claim ON jobs (state, priority DESC, seq)")
+            self._conn = conn
+        return self._conn
+
+    def _execute(self, sql: str, params=()) -> sqlite3.Cursor:
+        with self._lock:
+            return self.conn.execute(sql, params)
+
+    async def add(self, run_id: str, idea_text: str, priority: int, max_queued: Optional[int] = None) -> bool:
+        # A single statement holds SQLite's write lock throughout, across processes too
+        try:
+            cursor = self._execute(
+                """
+                INSERT INTO jobs (run_id, idea_text, priority, enqueued_at)
+                SELECT ?, ?, ?, ? WHERE ? IS NULL OR (SELECT COUNT(*) FROM jobs WHERE state = 'queued') < ?
+                """,
+                (run_id, idea_text, priority, time.time(), max_queued, max_queued),
+            )
+        except sqlite3.IntegrityError:
+            raise AlreadyQueued(run_id)
+        return cursor.rowcount == 1
+
+    async def claim(self, worker: str, lease: float) -> Optional[dict]:
+        now = time.time()
+        with self._lock:
+            row = self.conn.execute(
+                f"""
+                UPDATE jobs SET state = 'running', worker = :worker, lease_until = :lease_until
+                WHERE seq = ({CLAIMABLE})
+                RETURNING run_id, idea_text
+                """,
+                {"worker": worker, "lease_until": now + lease, "now": now},
+            ).fetchone()
+        return {"run_id": row[0], "idea_text": row[1]} if row else None
+
+    async def renew(self, run_id: str, worker: str, lease: float) -> bool:
+        cursor = self._execute(
+            "UPDATE jobs SET lease_until = ? WHERE run_id = ? AND worker = ? AND state = 'running'",
+            (time.time() + lease, run_id, worker),
+        )
+        return cursor.rowcount == 1
+
+    async def release(self, run_id: str, worker: str):
+        self._execute(
+            "UPDATE jobs SET state = 'queued', worker = NULL, lease_until = NULL WHERE run_id = ? AND worker = ?",
+            (run_id, worker),
+        )
+
+    async def remove(self, run_id: str):
+        self._execute("DELETE FROM jobs WHERE run_id = ?", (run_id,))
+
+    async def contains(self, run_id: str) -> bool:
+        return self._execute("SELECT 1 FROM jobs WHERE run_id = ?", (run_id,)).fetchone() is not None
+
+    async def requeue_running(self) -> int:
+        cursor = self._execute(
+            "UPDATE jobs SET state = 'queued', worker = NULL, lease_until = NULL WHERE state = 'running'"
+        )
+        return cursor.rowcount
+
+    async def counts(self) -> Dict[str, int]:
+        rows = self._execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall()
+        return {"queued": 0, "running": 0, **dict(rows)}
+
+    def pending(self) -> List[dict]:
+        """Unfinished jobs in submission order, including ones interrupted mid-run."""
+        rows = self._execute("SELECT seq, run_id, idea_text, priority, state FROM jobs ORDER BY seq").fetchall()
+        return [
+            {"seq": r[0], "run_id": r[1], "idea_text": r[2], "priority": r[3], "state": r[4]}
+            for r in rows
+        ]
+
+    async def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+class PostgresJobStore(JobStore):
+    """Jobs in Postgres, for workers spread over several hosts.
+
+    Claims use ``FOR UPDATE SKIP LOCKED`` so concurrent workers never wait
+    on each other or take the same job. Shares the storage backend's engine.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+
+    async def initialize(self):
+        from sqlalchemy import text
+        async with self.engine.begin() as conn:
+            for statement in PG_SCHEMA:
+                await conn.execute(text(statement))
+
+    async def _execute(self, sql: str, params: dict):
+        from sqlalchemy import text
+        async with self.engine.begin() as conn:
+            return await conn.execute(text(sql), params)
+
+    async def add(self, run_id: str, idea_text: str, priority: int, max_queued: Optional[int] = None) -> bool:
+        from sqlalchemy import text
+        from sqlalchemy.exc import IntegrityError
+        async with self.engine.begin() as conn:
+            if max_queued is not None:
+                # Serializes submits until commit, so two cannot both take the last slot
+                await conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": SUBMIT_LOCK})
+                queued = await conn.scalar(text("SELECT COUNT(*) FROM jobs WHERE state = 'queued'"))
+                if queued >= max_queued:
+                    return False
+            try:
+                await conn.execute(
+                    text(
+                        "INSERT INTO jobs (run_id, idea_text, priority, enqueued_at) "
+                        "VALUES (:run_id, :idea_text, :priority, :now)"
+                    ),
+                    {"run_id": run_id, "idea_text": idea_text, "priority": priority, "now": time.time()},
+                )
+            except IntegrityError:
+                raise AlreadyQueued(run_id)
+        return True
+
+    async def claim(self, worker: str, lease: float) -> Optional[dict]:
+        now = time.time()
+        result = await self._execute(
+            f"""
+            UPDATE jobs SET state = 'running', worker = :worker, lease_until = :lease_until
+            WHERE seq = ({CLAIMABLE} FOR UPDATE SKIP LOCKED)
+            RETURNING run_id, idea_text
+            """,
+            {"worker": worker, "lease_until": now + lease, "now": now},
+        )
+        row = result.first()
+        return {"run_id": row[0], "idea_text": row[1]} if row else None
+
+    async def renew(self, run_id: str, worker: str, lease: float) -> bool:
+        result = await self._execute(
+            "UPDATE jobs SET lease_until = :lease_until WHERE run_id = :run_id AND worker = :worker AND state = 'running'",
+            {"lease_until": time.time() + lease, "run_id": run_id, "worker": worker},
+        )
+        return result.rowcount == 1
+
+    async def release(self, run_id: str, worker: str):
+        await self._execute(
+            "UPDATE jobs SET state = 'queued', worker = NULL, lease_until = NULL WHERE run_id = :run_id AND worker = :worker",
+            {"run_id": run_id, "worker": worker},
+        )
+
+    async def remove(self, run_id: str):
+        await self._execute("DELETE FROM jobs WHERE run_id = :run_id", {"run_id": run_id})
+
+    async def contains(self, run_id: str) -> bool:
+        result = await self._execute("SELECT 1 FROM jobs WHERE run_id = :run_id", {"run_id": run_id})
+        return result.first() is not None
+
+    async def requeue_running(self) -> int:
+        result = await self._execute(
+            "UPDATE jobs SET state = 'queued', worker = NULL, lease_until = NULL WHERE state = 'running'", {}
+        )
+        return result.rowcount
+
+    async def counts(self) -> Dict[str, int]:
+        result = await self._execute("SELECT state, COUNT(*) FROM jobs GROUP BY state", {})
+        return {"queued": 0, "running": 0, **{row[0]: row[1] for row in result}}
+
+
+class JobQueue:
+    """Run workflow jobs on at most ``concurrency`` workers, highest priority first.
+
+    Jobs with equal priority run in submission order. At most ``max_queued``
+    jobs wait at once; ``submit`` raises QueueFull beyond that, with a
+    Retry-After estimate from recent job durations. With ``concurrency=0``
+    the queue only accepts jobs, leaving them to worker processes.
+
+    Idle workers poll the store every ``poll_interval`` seconds and are
+    woken immediately by local submits. A stopped worker hands its job back
+    to the queue; one that dies loses it only until its lease expires.
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        handler: Handler,
+        concurrency: int = 3,
+        max_queued: int = 100,
+        lease: float = 60.0,
+        poll_interval: float = 1.0,
+        worker_id: Optional[str] = None,
+    ):
+        if concurrency < 0:
+            raise ValueError("concurrency must not be negative")
+        self.store = store
+        self.handler = handler
+        self.concurrency = concurrency
+        self.max_queued = max_queued
+        self.lease = lease
+        self.poll_interval = poll_interval
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.completed = 0
+        self.failed = 0
+        self._running: Dict[str, float] = {}
+        self._workers: List[asyncio.Task] = []
+        self._wake = asyncio.Event()
+        self._avg_duration: Optional[float] = None
+
+    async def start(self, recover: bool = False):
+        """Start the workers.
+
+        ``recover`` re-queues jobs left running by a crashed process at once
+        rather than after their leases expire; only use it when this is the
+        sole process running jobs.
+        """
+        await self.store.initialize()
+        if recover:
+            requeued = await self.store.requeue_running()
+            if requeued:
+                logger.info(f"Re-queued {requeued} runs interrupted by the last shutdown")
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"job-worker-{i}") for i in range(self.concurrency)
+        ]
+
+    async def stop(self):
+        """Stop the workers, handing their unfinished jobs back to the queue."""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        await self.store.close()
+
+    async def full(self) -> bool:
+        return (await self.store.counts())["queued"] >= self.max_queued
+
+    async def submit(self, run_id: str, idea_text: str, priority: int = 0):
+        """Persist a job and wake a local worker, if any.
+
+        Raises QueueFull if ``max_queued`` jobs are already waiting, and
+        AlreadyQueued if the run has an unfinished job.
+        """
+        if not await self.store.add(run_id, idea_text, priority, max_queued=self.max_queued):
+            # A run already queued takes no slot of its own; say so rather than "full"
+            if await self.store.contains(run_id):
+                raise AlreadyQueued(run_id)
+            raise QueueFull(self.retry_after())
+        self._wake.set()
+
+    def retry_after(self) -> int:
+        """Seconds until a queue slot is likely to free up."""
+        avg = self._avg_duration or settings.job_default_duration
+        return max(1, int(avg / max(self.concurrency, 1)))
+
+    async def stats(self) -> dict:
+        counts = await self.store.counts()
+        return {
+            "queued": counts["queued"],
+            "running": counts["running"],
+            "running_here": len(self._running),
+            "concurrency": self.concurrency,
+            "max_queued": self.max_queued,
+            "completed": self.completed,
+            "failed": self.failed,
+            "avg_duration": self._avg_duration,
+        }
+
+    async def _worker(self):
+        while True:
+            self._wake.clear()
+            job = await self.store.claim(self.worker_id, self.lease)
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._run(job["run_id"], job["idea_text"])
+
+    async def _run(self, run_id: str, idea_text: str):
+        started = time.monotonic()
+        self._running[run_id] = started
+        heartbeat = asyncio.create_task(self._heartbeat(run_id))
+        try:
+            await self.handler(run_id, idea_text)
+            self.completed += 1
+        except asyncio.CancelledError:
+            await self.store.release(run_id, self.worker_id)
+            raise
+        except Exception as e:
+            self.failed += 1
+            logger.error(f"Job for run {run_id} failed: {e}", exc_info=True)
+        finally:
+            heartbeat.cancel()
+            self._running.pop(run_id, None)
+        await self.store.remove(run_id)
+        duration = time.monotonic() - started
+        self._avg_duration = duration if self._avg_duration is None else 0.8 * self._avg_duration + 0.2 * duration
+
+    async def _heartbeat(self, run_id: str):
+        while True:
+            await asyncio.sleep(self.lease / 3)
+            try:
+                if not await self.store.renew(run_id, self.worker_id, self.lease):
+                    logger.warning(f"Lost the lease on run {run_id}; another worker may run it too")
+                    return
+            except Exception as e:
+                logger.warning(f"Lease renewal for run {run_id} failed: {e}")
+
+
+_queue: Optional[JobQueue] = None
+
+
+async def _run_workflow(run_id: str, idea_text: str):
+    from services.workflow import WorkflowOrchestrator
+    await WorkflowOrchestrator().run_workflow(run_id, idea_text)
+
+
+def get_job_queue(concurrency: Optional[int] = None) -> JobQueue:
+    """Process-wide queue feeding ``WorkflowOrchestrator.run_workflow``.
+
+    Jobs are stored in Postgres when ``database_url`` is set, so workers
+    can run on any host; otherwise in ``job_queue_path``. ``concurrency``
+    defaults to ``job_concurrency`` when the API runs jobs itself and to 0
+    (submit only) when ``job_runner`` is "worker".
+    """
+    global _queue
+    if _queue is None:
+        if settings.database_url:
+            from app.storage import get_storage_backend
+            store: JobStore = PostgresJobStore(get_storage_backend().engine)
+        else:
+            store = SQLiteJobStore(Path(settings.job_queue_path))
+        if concurrency is None:
+            concurrency = settings.job_concurrency if settings.job_runner == "api" else 0
+        _queue = JobQueue(
+            store,
+            _run_workflow,
+            concurrency=concurrency,
+            max_queued=settings.job_max_queued,
+            lease=settings.job_lease_seconds,
+            poll_interval=settings.job_poll_interval,
+        )
+    return _queue
+
+
+async def start_job_queue():
+    """Start the API's queue.
+
+    When the API is the only process running jobs from a local store, jobs
+    it left running when it last stopped are resumed at once.
+    """
+    sole_runner = settings.job_runner == "api" and not settings.database_url
+    await get_job_queue().start(recover=sole_runner)
+
+
+async def stop_job_queue():
+    """Stop the workers (called on shutdown)."""
+    global _queue
+    if _queue is not None:
+        await _queue.stop()
+        _queue = None
@@ -0,0 +1,95 @@
+"""Write-behind dossier persistence that coalesces rapid successive saves."""
+import asyncio
+import logging
+import weakref
+from typing import Optional
+
+from app.storage import StorageBackend
+from shared.models import VentureDossier
+
+logger = logging.getLogger(__name__)
+
+_active: "weakref.WeakSet[WriteBehindSaver]" = weakref.WeakSet()
+_background: "set[asyncio.Task]" = set()
+
+
+class WriteBehindSaver:
+    """Persist one run's dossier, merging saves that arrive close together.
+
+    ``mark()`` records that the dossier changed and schedules a write after
+    ``delay`` seconds; further marks before then ride along with that write.
+    ``mark(urgent=True)`` writes on the next event-loop iteration instead, so
+    it still absorbs changes made synchronously right after it. Writes are
+    serialized and always persist the dossier's latest state, so a later
+    write never lands before an earlier one.
+    """
+
+    def __init__(self, storage: StorageBackend, dossier: VentureDossier, delay: float = 0.5):
+        self.storage = storage
+        self.dossier = dossier
+        self.delay = delay
+        self.writes = 0
+        self._dirty = False
+        self._deadline: Optional[float] = None
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._lock = asyncio.Lock()
+        _active.add(self)
+
+    def mark(self, urgent: bool = False):
+        """Note a change and schedule it to be written."""
+        self._dirty = True
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + (0 if urgent else self.delay)
+        if self._deadline is not None and self._deadline <= deadline:
+            return
+        if self._timer is not None:
+            self._timer.cancel()
+        self._deadline = deadline
+        self._timer = loop.call_at(deadline, self._background_flush)
+
+    async def flush(self):
+        """Write now if anything is pending, and wait for it to land."""
+        self._cancel_timer()
+        async with self._lock:
+            if not self._dirty:
+                return
+            self._dirty = False
+            try:
+                await self.storage.save_dossier(self.dossier)
+            except Exception:
+                self._dirty = True
+                raise
+            self.writes += 1
+
+    async def close(self):
+        """Flush and stop tracking this run."""
+        await self.flush()
+        _active.discard(self)
+
+    def _cancel_timer(self):
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = None
+        self._deadline = None
+
+    def _background_flush(self):
+        self._timer = None
+        self._deadline = None
+        task = asyncio.ensure_future(self._safe_flush())
+        _background.add(task)
+        task.add_done_callback(_background.discard)
+
+    async def _safe_flush(self):
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"Deferred save failed for {self.dossier.run_id}: {e}")
+
+
+async def flush_all():
+    """Flush every run with pending writes (called on shutdown)."""
+    for saver in list(_active):
+        try:
+            await saver.flush()
+        except Exception as e:
+            logger.error(f"Shutdown flush failed for {saver.dossier.run_id}: {e}")
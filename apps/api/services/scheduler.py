@@ -0,0 +1,172 @@
+"""Declarative step graph and asyncio scheduler for the VentureForge pipeline."""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+StepHook = Callable[["Step"], Awaitable[None]]
+CompleteHook = Callable[["Step", Dict[str, Any]], Awaitable[None]]
+
+
+@dataclass(frozen=True)
+class Step:
+    """One pipeline step: the values it reads and the values it produces.
+
+    ``fn`` is called with the input values as keyword arguments. A step with a
+    single output returns that value; a step with several outputs returns a
+    tuple in the same order as ``outputs``.
+    """
+
+    name: str
+    inputs: Tuple[str, ...]
+    outputs: Tuple[str, ...]
+    fn: Callable[..., Awaitable[Any]]
+
+
+@dataclass
+class StepTiming:
+    started: float
+    finished: float
+
+    @property
+    def duration(self) -> float:
+        return self.finished - self.started
+
+
+@dataclass
+class ScheduleReport:
+    """Per-run timing summary."""
+
+    timings: Dict[str, StepTiming] = field(default_factory=dict)
+    critical_path: List[str] = field(default_factory=list)
+    wall_time: float = 0.0
+
+    @property
+    def critical_path_time(self) -> float:
+        return sum(self.timings[name].duration for name in self.critical_path)
+
+    def describe(self) -> str:
+        path = " → ".join(
+            f"{name} ({self.timings[name].duration:.1f}s)" for name in self.critical_path
+        )
+        return f"wall={self.wall_time:.1f}s critical path: {path}"
+
+
+class StepGraph:
+    """A DAG of steps wired together by named values."""
+
+    def __init__(self, steps: List[Step]):
+        self.steps = steps
+        self.producers: Dict[str, Step] = {}
+        for step in steps:
+            for name in step.outputs:
+                if name in self.producers:
+                    raise ValueError(
+                        f"Value '{name}' produced by both {self.producers[name].name} and {step.name}"
+                    )
+                self.producers[name] = step
+
+    def dependencies(self, step: Step) -> List[Step]:
+        """Steps whose outputs ``step`` reads."""
+        deps = []
+        for name in step.inputs:
+            producer = self.producers.get(name)
+            if producer is not None and producer not in deps:
+                deps.append(producer)
+        return deps
+
+    def validate(self, provided: List[str]):
+        """Ensure every input is provided or produced, and that there are no cycles."""
+        available = set(provided)
+        remaining = list(self.steps)
+        while remaining:
+            ready = [s for s in remaining if all(i in available for i in s.inputs)]
+            if not ready:
+                missing = {
+                    s.name: [i for i in s.inputs if i not in available] for s in remaining
+                }
+                raise ValueError(f"Unsatisfiable step graph: {missing}")
+            for step in ready:
+                available.update(step.outputs)
+                remaining.remove(step)
+
+    async def run(
+        self,
+        values: Dict[str, Any],
+        on_start: Optional[StepHook] = None,
+        on_complete: Optional[CompleteHook] = None,
+    ) -> ScheduleReport:
+        """Run every step as soon as its inputs exist.
+
+        ``values`` is updated in place with each step's outputs. If a step
+        raises, the remaining in-flight steps are cancelled and the error
+        propagates.
+        """
+        self.validate(list(values))
+
+        report = ScheduleReport()
+        run_started = time.monotonic()
+        pending = list(self.steps)
+        running: Dict[asyncio.Task, Step] = {}
+
+        try:
+            while pending or running:
+                for step in [s for s in pending if all(i in values for i in s.inputs)]:
+                    pending.remove(step)
+                    if on_start:
+                        await on_start(step)
+                    kwargs = {name: values[name] for name in step.inputs}
+                    task = asyncio.create_task(self._timed(step, kwargs, report))
+                    running[task] = step
+
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    step = running.pop(task)
+                    outputs = task.result()
+                    values.update(outputs)
+                    if on_complete:
+                        await on_complete(step, outputs)
+        finally:
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+
+        report.wall_time = time.monotonic() - run_started
+        report.critical_path = self.critical_path(report.timings)
+        return report
+
+    async def _timed(self, step: Step, kwargs: Dict[str, Any], report: ScheduleReport) -> Dict[str, Any]:
+        started = time.monotonic()
+        try:
+            result = await step.fn(**kwargs)
+        finally:
+            report.timings[step.name] = StepTiming(started, time.monotonic())
+        if len(step.outputs) == 1:
+            result = (result,)
+        return dict(zip(step.outputs, result))
+
+    def critical_path(self, timings: Dict[str, StepTiming]) -> List[str]:
+        """Longest chain of dependent steps, weighted by measured duration."""
+        best: Dict[str, Tuple[float, List[str]]] = {}
+
+        def longest(step: Step) -> Tuple[float, List[str]]:
+            if step.name not in best:
+                prefix: Tuple[float, List[str]] = (0.0, [])
+                for dep in self.dependencies(step):
+                    candidate = longest(dep)
+                    if candidate[0] > prefix[0]:
+                        prefix = candidate
+                own = timings[step.name].duration if step.name in timings else 0.0
+                best[step.name] = (prefix[0] + own, prefix[1] + [step.name])
+            return best[step.name]
+
+        path: Tuple[float, List[str]] = (0.0, [])
+        for step in self.steps:
+            candidate = longest(step)
+            if candidate[0] > path[0]:
+                path = candidate
+        return [name for name in path[1] if name in timings]
@@ -3,7 +3,7 @@ import asyncio
 import json
 import logging
 from datetime import datetime
-from typing import Optional
+from typing import Any, Dict, List, Optional
 
 from config import settings
 from shared.models import (
@@ -13,7 +13,11 @@ from shared.models import (
     Scorecard, Competitor, Citation, VCQuestion,
 )
 from services.integrations.llm_client import llm_json
+from services.integrations.neo4j_client import get_neo4j_client, graph_backend
 from services.integrations.tavily_client import tavily_search, format_search_results
+from services.checkpoints import StepCheckpointer, decode_output, fork_checkpoints
+from services.persistence import WriteBehindSaver
+from services.scheduler import Step, StepGraph
 
 logger = logging.getLogger(__name__)
 
@@ -21,85 +25,171 @@ SYSTEM = """You are VentureForge, an AI-powered startup research engine.
 Return ONLY valid JSON. No commentary, no markdown outside JSON fences.
 If data is unknown, write "unknown". Be concise and analytical."""
 
+# Bump whenever SYSTEM or a step's prompt changes: step checkpoints are keyed
+# on it (and on the model), so outputs from the old prompts are not restored
+PROMPT_VERSION = 1
+
 
 class WorkflowOrchestrator:
-    """Runs the full pipeline in order, saving after each step."""
+    """Runs the pipeline as a step graph, saving as each step starts and finishes.
+
+    Pipeline prompts run at the default (low, non-zero) temperature but opt
+    in to the LLM response cache, so re-runs and retries of the same idea
+    reuse earlier answers instead of going to the network.
+    """
 
     def __init__(self):
         from app.storage import get_storage_backend
         self.storage = get_storage_backend()
 
+    def build_graph(self) -> StepGraph:
+        """Declare each step's inputs and outputs; independent steps run concurrently."""
+        return StepGraph([
+            Step(AgentStep.CLARIFIER.value, ("idea_text",), ("clarification",), self._clarify),
+            Step(AgentStep.MARKET_SEARCH.value, ("clarification",), ("search_results",), self._market_search),
+            Step(AgentStep.DEEP_EXTRACT.value, ("clarification", "search_results"), ("extracted",), self._deep_extract),
+            Step(
+                AgentStep.NORMALIZE.value,
+                ("clarification", "extracted", "search_results"),
+                ("market_research",),
+                self._normalize,
+            ),
+            Step(AgentStep.MARKET_SYNTHESIS.value, ("clarification", "market_research"), ("strategy",), self._synthesize),
+            Step(
+                AgentStep.COMPETITIVE_ANALYSIS.value,
+                ("clarification", "market_research"),
+                ("competitive_analysis",),
+                self._compete,
+            ),
+            Step(
+                AgentStep.VC_INTERVIEW.value,
+                ("clarification", "market_research", "strategy"),
+                ("vc_interview",),
+                self._vc_interview,
+            ),
+            Step(
+                AgentStep.FUNDING_STRATEGY.value,
+                ("clarification", "market_research", "vc_interview"),
+                ("funding_strategy", "scorecard"),
+                self._funding,
+            ),
+        ])
+
     async def run_workflow(self, run_id: str, idea_text: str):
-        """Execute all 8 steps."""
+        """Execute all 8 steps, running independent ones in parallel.
+
+        With ``step_checkpoints`` on, steps already completed with the same
+        inputs by an earlier attempt of this run are restored, not re-run.
+        """
         dossier = await self.storage.get_dossier(run_id)
         if not dossier:
             dossier = VentureDossier(run_id=run_id, idea_text=idea_text)
 
+        saver = WriteBehindSaver(self.storage, dossier, delay=settings.save_coalesce_delay)
         dossier.status = RunStatus.RUNNING
-        await self.storage.save_dossier(dossier)
+        dossier.error = None
+        saver.mark(urgent=True)
+
+        graph = self.build_graph()
+        checkpointer = None
+        if settings.step_checkpoints:
+            checkpointer = StepCheckpointer(self.storage, run_id, version=f"{settings.llm_model}:{PROMPT_VERSION}")
+            graph = checkpointer.wrap(graph)
+
+        async def on_start(step: Step):
+            self._set_step(saver, AgentStep(step.name))
+
+        async def on_complete(step: Step, outputs: dict):
+            for name, value in outputs.items():
+                if name in VentureDossier.model_fields:
+                    setattr(dossier, name, value)
+            dossier.updated_at = datetime.utcnow()
+            saver.mark(urgent=True)
 
         try:
-            # Step 1: Clarify
-            await self._set_step(dossier, AgentStep.CLARIFIER)
-            dossier.clarification = await self._clarify(idea_text)
-            await self.storage.save_dossier(dossier)
-
-            # Step 2: Market Search (Tavily)
-            await self._set_step(dossier, AgentStep.MARKET_SEARCH)
-            search_results = await self._market_search(dossier.clarification)
-            await self.storage.save_dossier(dossier)
-
-            # Step 3: Deep Extract (LLM-based extraction from search results)
-            await self._set_step(dossier, AgentStep.DEEP_EXTRACT)
-            extracted = await self._deep_extract(dossier.clarification, search_results)
-            await self.storage.save_dossier(dossier)
-
-            # Step 4: Normalize (structure the data)
-            await self._set_step(dossier, AgentStep.NORMALIZE)
-            dossier.market_research = await self._normalize(dossier.clarification, extracted, search_results)
-            await self.storage.save_dossier(dossier)
-
-            # Step 5: Market Synthesis
-            await self._set_step(dossier, AgentStep.MARKET_SYNTHESIS)
-            dossier.strategy = await self._synthesize(dossier.clarification, dossier.market_research)
-            await self.storage.save_dossier(dossier)
-
-            # Step 6: Competitive Analysis
-            await self._set_step(dossier, AgentStep.COMPETITIVE_ANALYSIS)
-            dossier.competitive_analysis = await self._compete(dossier.clarification, dossier.market_research)
-            await self.storage.save_dossier(dossier)
-
-            # Step 7: VC Interview Simulation
-            await self._set_step(dossier, AgentStep.VC_INTERVIEW)
-            dossier.vc_interview = await self._vc_interview(dossier)
-            await self.storage.save_dossier(dossier)
-
-            # Step 8: Funding Strategy + Scorecard
-            await self._set_step(dossier, AgentStep.FUNDING_STRATEGY)
-            funding, scorecard = await self._funding(dossier)
-            dossier.funding_strategy = funding
-            dossier.scorecard = scorecard
-            await self.storage.save_dossier(dossier)
+            report = await graph.run(
+                {"idea_text": idea_text}, on_start=on_start, on_complete=on_complete
+            )
+            logger.info(f"Pipeline timing for {run_id}: {report.describe()}")
+            if checkpointer and checkpointer.restored:
+                logger.info(f"Restored from checkpoints for {run_id}: {', '.join(checkpointer.restored)}")
+            await self._store_market_graph(dossier)
 
             # DONE
             dossier.status = RunStatus.DONE
             dossier.current_step = None
             dossier.updated_at = datetime.utcnow()
-            await self.storage.save_dossier(dossier)
-            logger.info(f"Pipeline DONE for {run_id}")
+            saver.mark()
+            await saver.close()
+            logger.info(f"Pipeline DONE for {run_id} ({saver.writes} writes)")
 
         except Exception as e:
             logger.error(f"Pipeline FAILED for {run_id}: {e}", exc_info=True)
             dossier.status = RunStatus.ERROR
             dossier.error = str(e)
-            await self.storage.save_dossier(dossier)
+            saver.mark()
+            await saver.close()
+
+    def editable_sections(self) -> List[str]:
+        """Dossier sections produced by a step, which a fork may replace."""
+        return [name for name in self.build_graph().producers if name in VentureDossier.model_fields]
+
+    async def fork_run(self, parent: VentureDossier, edits: Dict[str, Any]) -> VentureDossier:
+        """Save a new run copied from ``parent`` with some sections replaced.
+
+        The fork's checkpoints are seeded from the parent's so that, once
+        queued, only the steps downstream of an edited section run again.
+        Raises ValueError for sections that cannot be edited or fail
+        validation, and when ``step_checkpoints`` is off: the edits live
+        only in checkpoints, so without them every step would run again and
+        overwrite them.
+        """
+        if not settings.step_checkpoints:
+            raise ValueError("Forking a run requires step_checkpoints to be enabled")
+        unknown = set(edits) - set(self.editable_sections())
+        if unknown:
+            raise ValueError(f"Sections cannot be edited: {', '.join(sorted(unknown))}")
+        sections = {name: decode_output(name, value) for name, value in edits.items()}
+
+        now = datetime.utcnow()
+        fork = parent.model_copy(deep=True, update={
+            **sections,
+            "run_id": self.storage.generate_run_id(),
+            "version_of": parent.run_id,
+            "status": RunStatus.QUEUED,
+            "current_step": None,
+            "error": None,
+            "created_at": now,
+            "updated_at": now,
+        })
+        await fork_checkpoints(self.storage, self.build_graph(), parent, fork.run_id, sections)
+        await self.storage.save_dossier(fork)
+        return fork
 
     # ── helpers ──────────────────────────────────────────────────────
 
-    async def _set_step(self, dossier: VentureDossier, step: AgentStep):
-        dossier.current_step = step
-        dossier.updated_at = datetime.utcnow()
-        await self.storage.save_dossier(dossier)
+    async def _store_market_graph(self, dossier: VentureDossier):
+        """Mirror the run's market research into the graph store, Neo4j or embedded (best effort)."""
+        market = dossier.market_research
+        if not graph_backend() or not market:
+            return
+        analysis = dossier.competitive_analysis
+        try:
+            neo4j = await get_neo4j_client()
+            await neo4j.store_market_graph(
+                run_id=dossier.run_id,
+                idea=dossier.idea_text,
+                competitors=[c.model_dump() for c in market.competitors],
+                segments=[{"name": s} for s in market.segments],
+                differentiators=analysis.differentiation_opportunities if analysis else [],
+            )
+        except Exception as e:
+            logger.warning(f"Graph storage failed for {dossier.run_id}: {e}")
+
+    def _set_step(self, saver: WriteBehindSaver, step: AgentStep):
+        saver.dossier.current_step = step
+        saver.dossier.updated_at = datetime.utcnow()
+        saver.mark()
 
     # ── Step 1: Clarify ──────────────────────────────────────────────
 
@@ -118,7 +208,7 @@ Return JSON:
   "measurable_outcome": "KPI to measure success",
   "keywords": ["keyword1", "keyword2", "keyword3", "keyword4"]
 }}"""
-        data = await llm_json(SYSTEM, prompt)
+        data = await llm_json(SYSTEM, prompt, cache=settings.llm_cache_enabled)
         return ClarifiedIdea(**data)
 
     # ── Step 2: Market Search ────────────────────────────────────────
@@ -130,9 +220,18 @@ Return JSON:
             f"{' '.join(keywords[:3])} startups companies",
             f"{clarification.core_problem} solutions pricing",
         ]
+        semaphore = asyncio.Semaphore(settings.tavily_max_concurrency)
+
+        async def search(q: str) -> list:
+            async with semaphore:
+                try:
+                    return await asyncio.wait_for(tavily_search(q, 5), settings.tavily_timeout)
+                except asyncio.TimeoutError:
+                    logger.warning(f"Tavily search timed out after {settings.tavily_timeout}s: {q[:80]}")
+                    return []
+
         all_results = []
-        for q in queries:
-            results = await asyncio.to_thread(tavily_search, q, 5)
+        for results in await asyncio.gather(*(search(q) for q in queries)):
             all_results.extend(results)
         return all_results
 
@@ -161,7 +260,7 @@ Return JSON:
   ],
   "market_signals": ["signal1", "signal2"]
 }}"""
-        return await llm_json(SYSTEM, prompt)
+        return await llm_json(SYSTEM, prompt, cache=settings.llm_cache_enabled)
 
     # ── Step 4: Normalize ────────────────────────────────────────────
 
@@ -201,7 +300,7 @@ Return JSON:
   "segments": ["segment1", "segment2", "segment3"],
   "market_gaps": ["gap1", "gap2", "gap3", "gap4"]
 }}"""
-        synthesis = await llm_json(SYSTEM, prompt)
+        synthesis = await llm_json(SYSTEM, prompt, cache=settings.llm_cache_enabled)
 
         # Deduplicate competitors by name
         seen = set()
@@ -221,7 +320,7 @@ Return JSON:
 
     # ── Step 5: Synthesize (Strategy) ────────────────────────────────
 
-    async def _synthesize(self, clarification: ClarifiedIdea, market: MarketResearch) -> StrategyPositioning:
+    async def _synthesize(self, clarification: ClarifiedIdea, market_research: MarketResearch) -> StrategyPositioning:
         prompt = f"""Given this startup and market research, create strategic positioning.
 
 Idea: {clarification.idea_title}
@@ -229,9 +328,9 @@ Problem: {clarification.core_problem}
 Solution: {clarification.proposed_solution}
 Customer: {clarification.target_customer}
 
-Market: {market.summary}
-Gaps: {json.dumps(market.market_gaps)}
-Competitors: {json.dumps([c.name for c in market.competitors])}
+Market: {market_research.summary}
+Gaps: {json.dumps(market_research.market_gaps)}
+Competitors: {json.dumps([c.name for c in market_research.competitors])}
 
 Return JSON:
 {{
@@ -242,13 +341,13 @@ Return JSON:
   "risks": ["risk1", "risk2", "risk3"],
   "recommended_next_steps": ["step1", "step2", "step3"]
 }}"""
-        data = await llm_json(SYSTEM, prompt)
+        data = await llm_json(SYSTEM, prompt, cache=settings.llm_cache_enabled)
         return StrategyPositioning(**data)
 
     # ── Step 6: Competitive Analysis ─────────────────────────────────
 
-    async def _compete(self, clarification: ClarifiedIdea, market: MarketResearch) -> CompetitiveAnalysis:
-        comp_data = json.dumps([c.model_dump() for c in market.competitors], indent=2)
+    async def _compete(self, clarification: ClarifiedIdea, market_research: MarketResearch) -> CompetitiveAnalysis:
+        comp_data = json.dumps([c.model_dump() for c in market_research.competitors], indent=2)
         prompt = f"""Deep competitive analysis for "{clarification.idea_title}".
 
 Competitors:
@@ -271,17 +370,19 @@ Return JSON:
     }}
   ]
 }}"""
-        data = await llm_json(SYSTEM, prompt)
+        data = await llm_json(SYSTEM, prompt, cache=settings.llm_cache_enabled)
         return CompetitiveAnalysis(**data)
 
     # ── Step 7: VC Interview ─────────────────────────────────────────
 
-    async def _vc_interview(self, dossier: VentureDossier) -> VCInterview:
-        context = f"""Startup: {dossier.clarification.idea_title}
-Problem: {dossier.clarification.core_problem}
-Solution: {dossier.clarification.proposed_solution}
-Market: {dossier.market_research.summary if dossier.market_research else 'N/A'}
-Strategy: {dossier.strategy.positioning_statement if dossier.strategy else 'N/A'}"""
+    async def _vc_interview(
+        self, clarification: ClarifiedIdea, market_research: MarketResearch, strategy: StrategyPositioning
+    ) -> VCInterview:
+        context = f"""Startup: {clarification.idea_title}
+Problem: {clarification.core_problem}
+Solution: {clarification.proposed_solution}
+Market: {market_research.summary if market_research else 'N/A'}
+Strategy: {strategy.positioning_statement if strategy else 'N/A'}"""
 
         prompt = f"""Simulate a 5-question VC interview for this startup.
 
@@ -302,7 +403,7 @@ Return JSON:
   "vc_feedback": "overall VC feedback paragraph",
   "investment_risk_level": "Low|Medium|High"
 }}"""
-        data = await llm_json(SYSTEM, prompt)
+        data = await llm_json(SYSTEM, prompt, cache=settings.llm_cache_enabled)
         questions = [VCQuestion(**q) for q in data.get("questions", [])]
         return VCInterview(
             questions=questions,
@@ -312,11 +413,13 @@ Return JSON:
 
     # ── Step 8: Funding + Scorecard ──────────────────────────────────
 
-    async def _funding(self, dossier: VentureDossier) -> tuple:
-        context = f"""Startup: {dossier.clarification.idea_title}
-Solution: {dossier.clarification.proposed_solution}
-Market: {dossier.market_research.summary if dossier.market_research else ''}
-Risk: {dossier.vc_interview.investment_risk_level if dossier.vc_interview else 'Medium'}"""
+    async def _funding(
+        self, clarification: ClarifiedIdea, market_research: MarketResearch, vc_interview: VCInterview
+    ) -> tuple:
+        context = f"""Startup: {clarification.idea_title}
+Solution: {clarification.proposed_solution}
+Market: {market_research.summary if market_research else ''}
+Risk: {vc_interview.investment_risk_level if vc_interview else 'Medium'}"""
 
         prompt = f"""Given this startup context, recommend funding strategy AND provide a scorecard.
 
@@ -344,7 +447,7 @@ Return JSON:
     "recommendation": "Go/No-Go recommendation paragraph"
   }}
 }}"""
-        data = await llm_json(SYSTEM, prompt)
+        data = await llm_json(SYSTEM, prompt, cache=settings.llm_cache_enabled)
         funding = FundingStrategy(**data.get("funding", {}))
         scorecard = Scorecard(**data.get("scorecard", {}))
         return funding, scorecard
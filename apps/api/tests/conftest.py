@@ -0,0 +1,6 @@
+"""Shared pytest configuration."""
+import os
+import sys
+
+# Add project root to path so shared/ is importable (mirrors main.py)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../.."))
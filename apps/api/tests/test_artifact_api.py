@@ -0,0 +1,89 @@
+"""Tests for the artifact download endpoint."""
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from app.storage.local import LocalStorageBackend
+
+CONTENT = b"%PDF" + bytes(range(256)) * 40
+URL = "/api/runs/r1/artifacts/report.pdf"
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    storage = LocalStorageBackend(tmp_path)
+    asyncio.run(storage.initialize())
+    asyncio.run(storage.save_artifact("r1", "report.pdf", CONTENT))
+    monkeypatch.setattr(main, "get_storage_backend", lambda: storage)
+    # No context manager: the lifespan (LLM, Neo4j, job queue) is not needed here
+    return TestClient(main.app)
+
+
+def test_full_download(client):
+    resp = client.get(URL)
+
+    assert resp.status_code == 200
+    assert resp.content == CONTENT
+    assert resp.headers["content-type"] == "application/pdf"
+    assert resp.headers["content-length"] == str(len(CONTENT))
+    assert resp.headers["content-disposition"] == "attachment; filename=r1_report.pdf"
+    assert resp.headers["accept-ranges"] == "bytes"
+
+
+def test_range_request_returns_partial_content(client):
+    resp = client.get(URL, headers={"Range": "bytes=4-99"})
+
+    assert resp.status_code == 206
+    assert resp.content == CONTENT[4:100]
+    assert resp.headers["content-range"] == f"bytes 4-99/{len(CONTENT)}"
+
+    # A stale If-Range falls back to the whole artifact
+    resp = client.get(URL, headers={"Range": "bytes=4-99", "If-Range": '"stale"'})
+    assert resp.status_code == 200
+    assert resp.content == CONTENT
+
+
+def test_matching_etag_is_not_modified(client):
+    etag = client.get(URL).headers["etag"]
+
+    resp = client.get(URL, headers={"If-None-Match": f'"other", {etag}'})
+
+    assert resp.status_code == 304
+    assert resp.headers["etag"] == etag
+    assert resp.content == b""
+
+
+def test_unsatisfiable_range(client):
+    resp = client.get(URL, headers={"Range": f"bytes={len(CONTENT)}-"})
+
+    assert resp.status_code == 416
+    assert resp.headers["content-range"] == f"bytes */{len(CONTENT)}"
+
+
+def test_missing_artifact_and_dot_segments_are_not_found(client):
+    assert client.get("/api/runs/r1/artifacts/missing.pdf").status_code == 404
+    assert client.get("/api/runs/r1/artifacts/.env").status_code == 404
+
+
+def test_s3_backend_redirects_to_a_presigned_url(monkeypatch):
+    moto = pytest.importorskip("moto")
+    from app.storage.aws import AWSStorageBackend
+
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    with moto.mock_aws():
+        storage = AWSStorageBackend(table_name="runs-test", bucket_name="artifacts-test")
+        asyncio.run(storage.initialize())
+        asyncio.run(storage.save_artifact("r1", "report.pdf", CONTENT))
+        monkeypatch.setattr(main, "get_storage_backend", lambda: storage)
+
+        resp = TestClient(main.app).get(URL, follow_redirects=False)
+        missing = TestClient(main.app).get("/api/runs/r1/artifacts/missing.pdf", follow_redirects=False)
+        asyncio.run(storage.close())
+
+    assert resp.status_code == 307
+    assert "r1/report.pdf" in resp.headers["location"]
+    assert "Signature=" in resp.headers["location"]
+    assert missing.status_code == 404
@@ -0,0 +1,190 @@
+"""Tests for the AWS storage backend against moto's in-memory DynamoDB."""
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+moto = pytest.importorskip("moto")
+
+from app.storage import encode_cursor  # noqa: E402
+from app.storage.aws import AWSStorageBackend  # noqa: E402
+from shared.models import ClarifiedIdea, MarketResearch, RunStatus, VentureDossier  # noqa: E402
+
+
+@pytest.fixture
+async def storage(monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    with moto.mock_aws():
+        backend = AWSStorageBackend(table_name="runs-test", bucket_name="artifacts-test")
+        await backend.initialize()
+        yield backend
+        await backend.close()
+
+
+async def _seed(storage, count: int, start: datetime, step: timedelta):
+    for i in range(count):
+        await storage.save_dossier(VentureDossier(
+            run_id=f"run-{i:03d}",
+            idea_text=f"idea {i}",
+            status=RunStatus.DONE if i % 2 else RunStatus.ERROR,
+            created_at=start + step * i,
+        ))
+
+
+@pytest.mark.asyncio
+async def test_list_runs_pages_newest_first_across_months(storage):
+    start = datetime.utcnow() - timedelta(days=90)
+    await _seed(storage, 30, start, timedelta(days=3))
+
+    seen, cursor = [], None
+    while True:
+        page = await storage.list_runs(limit=7, cursor=cursor)
+        seen.extend(r["run_id"] for r in page)
+        if len(page) < 7:
+            break
+        cursor = encode_cursor(page[-1])
+
+    assert seen == [f"run-{i:03d}" for i in reversed(range(30))]
+
+
+@pytest.mark.asyncio
+async def test_list_runs_filters_by_status(storage):
+    await _seed(storage, 10, datetime.utcnow() - timedelta(days=1), timedelta(minutes=1))
+
+    page = await storage.list_runs(limit=3, status=RunStatus.DONE.value)
+
+    assert [r["run_id"] for r in page] == ["run-009", "run-007", "run-005"]
+    assert {r["status"] for r in page} == {RunStatus.DONE.value}
+
+
+@pytest.mark.asyncio
+async def test_migration_backfills_legacy_items(storage):
+    created_at = datetime.utcnow() - timedelta(hours=1)
+    dossier = VentureDossier(run_id="legacy", idea_text="old", created_at=created_at)
+    item = storage._serialize(dossier.model_dump(mode="json"))
+    storage.dynamodb.put_item(TableName=storage.table_name, Item=item)
+    assert await storage.list_runs() == []
+
+    assert await storage.migrate_run_index() == 1
+    assert await storage.migrate_run_index() == 0
+
+    runs = await storage.list_runs()
+    assert [r["run_id"] for r in runs] == ["legacy"]
+    loaded = await storage.get_dossier("legacy")
+    assert loaded.created_at == created_at
+
+
+@pytest.mark.asyncio
+async def test_boto3_calls_run_off_the_event_loop(storage, monkeypatch):
+    threads = []
+    put_item = storage.dynamodb.put_item
+
+    def recording_put_item(**kwargs):
+        threads.append(threading.current_thread())
+        return put_item(**kwargs)
+
+    monkeypatch.setattr(storage.dynamodb, "put_item", recording_put_item)
+    await storage.save_dossier(VentureDossier(run_id="r1", idea_text="idea"))
+
+    assert threads and threads[0] is not threading.main_thread()
+    assert threads[0].name.startswith("aws-storage")
+
+
+@pytest.mark.asyncio
+async def test_sections_are_split_to_s3_and_deduplicated(storage, monkeypatch):
+    dossier = VentureDossier(
+        run_id="r1",
+        idea_text="idea",
+        clarification=ClarifiedIdea(idea_title="Title"),
+        market_research=MarketResearch(summary="x" * 10_000),
+    )
+    await storage.save_dossier(dossier)
+
+    item = storage.dynamodb.get_item(TableName=storage.table_name, Key={"run_id": {"S": "r1"}})["Item"]
+    assert "market_research" not in item
+    assert set(item["sections"]["M"]) == {"clarification", "market_research"}
+
+    puts = []
+    put_object = storage.s3.put_object
+    monkeypatch.setattr(storage.s3, "put_object", lambda **kw: puts.append(kw["Key"]) or put_object(**kw))
+    dossier.status = RunStatus.RUNNING
+    dossier.clarification.idea_title = "Renamed"
+    await storage.save_dossier(dossier)
+    assert len(puts) == 1
+
+    fresh = AWSStorageBackend(table_name="runs-test", bucket_name="artifacts-test")
+    loaded = await fresh.get_dossier("r1")
+    await fresh.close()
+    assert loaded.status == RunStatus.RUNNING
+    assert loaded.clarification.idea_title == "Renamed"
+    assert loaded.market_research.summary == "x" * 10_000
+
+
+@pytest.mark.asyncio
+async def test_sections_load_lazily_and_survive_a_small_cache(storage, monkeypatch):
+    await storage.save_dossier(VentureDossier(
+        run_id="r1",
+        idea_text="idea",
+        clarification=ClarifiedIdea(idea_title="Title"),
+        market_research=MarketResearch(summary="summary"),
+    ))
+
+    fresh = AWSStorageBackend(table_name="runs-test", bucket_name="artifacts-test")
+    fresh._section_cache_size = 1
+    gets = []
+    get_object = fresh.s3.get_object
+    monkeypatch.setattr(fresh.s3, "get_object", lambda **kw: gets.append(kw["Key"]) or get_object(**kw))
+
+    partial = await fresh.get_dossier("r1", sections=("clarification",))
+    assert partial.clarification.idea_title == "Title" and partial.market_research is None
+    assert len(gets) == 1
+
+    full = await fresh.get_dossier("r1")
+    assert full.market_research.summary == "summary"
+    await fresh.close()
+
+
+@pytest.mark.asyncio
+async def test_unreferenced_sections_are_collected(storage, monkeypatch):
+    from app.storage import aws
+
+    dossier = VentureDossier(run_id="r1", idea_text="idea", clarification=ClarifiedIdea(idea_title="v1"))
+    await storage.save_dossier(dossier)
+    dossier.clarification.idea_title = "v2"
+    await storage.save_dossier(dossier)
+
+    with pytest.raises(ValueError):
+        await storage.collect_sections(grace_seconds=0)
+    monkeypatch.setattr(aws, "UPLOAD_MEMORY_SECONDS", 0)
+    assert await storage.collect_sections(grace_seconds=0) == 1
+
+    keys = [o["Key"] for o in storage.s3.list_objects_v2(Bucket="artifacts-test", Prefix="sections/")["Contents"]]
+    assert len(keys) == 1
+    assert (await storage.get_dossier("r1")).clarification.idea_title == "v2"
+
+
+@pytest.mark.asyncio
+async def test_artifacts_stream_ranges_and_presign(storage):
+    content = b"%PDF" + bytes(200_000)
+    await storage.save_artifact("r1", "report.pdf", content)
+
+    info = await storage.stat_artifact("r1", "report.pdf")
+    assert (info.size, info.content_type) == (len(content), "application/pdf")
+    assert b"".join([c async for c in storage.open_artifact("r1", "report.pdf", 2, 10)]) == content[2:10]
+    assert b"".join([c async for c in storage.open_artifact("r1", "report.pdf")]) == content
+
+    url = await storage.artifact_url("r1", "report.pdf", "attachment; filename=r1_report.pdf")
+    assert "r1/report.pdf" in url and "Signature=" in url
+    with pytest.raises(FileNotFoundError):
+        await storage.artifact_url("r1", "missing.pdf", "attachment")
+
+
+@pytest.mark.asyncio
+async def test_checkpoints_use_their_own_prefix(storage):
+    assert await storage.get_checkpoint("r1", "clarify") is None
+    await storage.save_checkpoint("r1", "clarify", {"fingerprint": "f", "outputs": {}})
+
+    assert await storage.get_checkpoint("r1", "clarify") == {"fingerprint": "f", "outputs": {}}
+    keys = [o["Key"] for o in storage.s3.list_objects_v2(Bucket="artifacts-test")["Contents"]]
+    assert keys == ["checkpoints/r1/clarify.json"]
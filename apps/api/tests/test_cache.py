@@ -0,0 +1,84 @@
+"""Tests for the two-tier response cache."""
+import time
+
+import pytest
+
+from services.cache import ResponseCache, make_key
+
+
+def test_key_is_stable_and_content_addressed():
+    assert make_key("m", 0.0, "sys", "user") == make_key("m", 0.0, "sys", "user")
+    assert make_key("m", 0.0, "sys", "user") != make_key("m", 0.1, "sys", "user")
+
+
+def test_memory_lru_eviction_falls_back_to_disk(tmp_path):
+    cache = ResponseCache(tmp_path, ttl=60, max_entries=2)
+    for i in range(3):
+        cache.set(f"k{i}", {"i": i})
+
+    assert "k0" not in cache._memory
+    assert cache.get("k0") == {"i": 0}
+    assert cache.hits_disk == 1
+    assert cache.get("k0") == {"i": 0}
+    assert cache.hits_memory == 1
+
+
+def test_expired_entries_are_misses(tmp_path):
+    cache = ResponseCache(tmp_path, ttl=60)
+    cache.set("k", {"v": 1})
+    cache._memory["k"] = (time.time() - 120, {"v": 1})
+    (tmp_path / "k" / "k.json").write_text('{"t": 0, "v": {"v": 1}}')
+
+    assert cache.get("k") is None
+    assert cache.get("k", max_age=float("inf")) == {"v": 1}
+
+
+def test_disk_tier_is_capped(tmp_path):
+    cache = ResponseCache(tmp_path, ttl=60, max_entries=1, max_disk_entries=10)
+    for i in range(25):
+        cache.set(make_key(i), i)
+
+    assert len(list(tmp_path.glob("*/*.json"))) <= 10
+    assert cache.evictions > 0
+
+
+def test_search_queries_normalize_to_the_same_key():
+    from services.integrations.tavily_client import normalize_query
+
+    assert normalize_query("MealPal  competitors, market") == normalize_query("the market for mealpal competitors")
+    assert normalize_query("AI meal planning") != normalize_query("AI meal delivery")
+
+
+@pytest.mark.asyncio
+async def test_repeated_pipeline_step_is_served_from_the_llm_cache(tmp_path, monkeypatch):
+    import httpx
+
+    from services.integrations import llm_client
+    from services.workflow import WorkflowOrchestrator
+
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json={"choices": [{"message": {"content": '{"idea_title": "MealPal"}'}}]})
+
+    monkeypatch.setattr(llm_client, "_client", httpx.AsyncClient(transport=httpx.MockTransport(handler), base_url="http://llm"))
+    monkeypatch.setattr(llm_client, "_cache", ResponseCache(tmp_path, ttl=60))
+    orchestrator = WorkflowOrchestrator()
+
+    first = await orchestrator._clarify("meal planning for students")
+    second = await orchestrator._clarify("meal planning for students")
+
+    assert first == second and first.idea_title == "MealPal"
+    assert len(requests) == 1
+    assert llm_client._cache.hits_memory == 1
+
+
+def test_non_latin_queries_keep_their_terms():
+    from services.integrations.tavily_client import normalize_query
+
+    assert normalize_query("市场 竞争对手") == "市场 竞争对手"
+    assert normalize_query("市场 竞争对手") != normalize_query("餐饮 市场")
+    assert normalize_query("Über app for München") == "app münchen über"
+    assert normalize_query("ÜBER app") == normalize_query("über app")
+    assert normalize_query("поиск конкурентов") == "конкурентов поиск"
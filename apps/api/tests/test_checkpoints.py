@@ -0,0 +1,161 @@
+"""Tests for step checkpoints and resume."""
+import pytest
+
+from app.storage.local import LocalStorageBackend
+from services.checkpoints import StepCheckpointer
+from services.scheduler import Step, StepGraph
+from shared.models import ClarifiedIdea
+
+
+@pytest.fixture
+async def storage(tmp_path):
+    backend = LocalStorageBackend(str(tmp_path))
+    await backend.initialize()
+    yield backend
+    await backend.close()
+
+
+def _graph(calls, fail_at=None):
+    def step(name, value):
+        async def fn(**inputs):
+            calls.append(name)
+            if name == fail_at:
+                raise RuntimeError(f"{name} failed")
+            return value(**inputs)
+        return fn
+
+    return StepGraph([
+        Step("clarify", ("idea_text",), ("clarification",), step("clarify", lambda idea_text: ClarifiedIdea(idea_title=idea_text))),
+        Step("search", ("clarification",), ("search_results",), step("search", lambda clarification: [{"url": clarification.idea_title}])),
+        Step("pair", ("search_results",), ("a", "b"), step("pair", lambda search_results: (len(search_results), "b"))),
+    ])
+
+
+@pytest.mark.asyncio
+async def test_resume_skips_completed_steps(storage):
+    calls = []
+    with pytest.raises(RuntimeError):
+        await StepCheckpointer(storage, "r1").wrap(_graph(calls, fail_at="pair")).run({"idea_text": "idea"})
+    assert calls == ["clarify", "search", "pair"]
+
+    calls.clear()
+    checkpointer = StepCheckpointer(storage, "r1")
+    values = {"idea_text": "idea"}
+    await checkpointer.wrap(_graph(calls)).run(values)
+
+    assert calls == ["pair"]
+    assert checkpointer.restored == ["clarify", "search"]
+    assert values["clarification"] == ClarifiedIdea(idea_title="idea")
+    assert (values["a"], values["b"]) == (1, "b")
+
+
+@pytest.mark.asyncio
+async def test_changed_inputs_rerun_the_step_and_its_dependents(storage):
+    calls = []
+    await StepCheckpointer(storage, "r1").wrap(_graph(calls)).run({"idea_text": "idea"})
+    calls.clear()
+
+    await StepCheckpointer(storage, "r1").wrap(_graph(calls)).run({"idea_text": "other idea"})
+    assert calls == ["clarify", "search", "pair"]
+
+    calls.clear()
+    checkpointer = StepCheckpointer(storage, "r2")
+    await checkpointer.wrap(_graph(calls)).run({"idea_text": "idea"})
+    assert calls == ["clarify", "search", "pair"] and checkpointer.restored == []
+
+
+@pytest.mark.asyncio
+async def test_new_model_or_prompt_version_reruns_every_step(storage):
+    calls = []
+    await StepCheckpointer(storage, "r1", version="model-a:1").wrap(_graph(calls)).run({"idea_text": "idea"})
+    calls.clear()
+
+    await StepCheckpointer(storage, "r1", version="model-a:1").wrap(_graph(calls)).run({"idea_text": "idea"})
+    assert calls == []
+    await StepCheckpointer(storage, "r1", version="model-b:1").wrap(_graph(calls)).run({"idea_text": "idea"})
+    assert calls == ["clarify", "search", "pair"]
+
+
+@pytest.mark.asyncio
+async def test_checkpoints_are_not_stored_with_artifacts(storage):
+    await StepCheckpointer(storage, "r1").wrap(_graph([])).run({"idea_text": "idea"})
+
+    assert (await storage.get_checkpoint("r1", "clarify"))["outputs"]["clarification"]["idea_title"] == "idea"
+    assert not (storage.artifacts_path / "r1").exists()
+    with pytest.raises(FileNotFoundError):
+        await storage.stat_artifact("r1", "clarify.json")
+
+
+def _mocked_orchestrator(storage):
+    from unittest.mock import AsyncMock
+
+    from services.workflow import WorkflowOrchestrator
+    from shared.models import FundingStrategy, Scorecard, StrategyPositioning, VCInterview
+
+    orchestrator = WorkflowOrchestrator()
+    orchestrator.storage = storage
+    replies = {
+        "_clarify": ClarifiedIdea(idea_title="Meals"),
+        "_market_search": [],
+        "_deep_extract": {"competitors": []},
+        "_normalize": None,
+        "_synthesize": StrategyPositioning(),
+        "_compete": None,
+        "_vc_interview": VCInterview(),
+        "_funding": (FundingStrategy(), Scorecard(overall_score=7)),
+    }
+    return orchestrator, {name: AsyncMock(return_value=value) for name, value in replies.items()}
+
+
+@pytest.mark.asyncio
+async def test_fork_reruns_only_steps_downstream_of_the_edit(storage):
+    from unittest.mock import patch
+
+    from shared.models import RunStatus
+
+    orchestrator, mocks = _mocked_orchestrator(storage)
+    with patch.multiple(orchestrator, **mocks):
+        await orchestrator.run_workflow("parent", "AI meal planning")
+        parent = await storage.get_dossier("parent")
+        assert parent.status == RunStatus.DONE
+
+        for mock in mocks.values():
+            mock.reset_mock()
+        with pytest.raises(ValueError):
+            await orchestrator.fork_run(parent, {"status": "done"})
+        fork = await orchestrator.fork_run(parent, {"vc_interview": {"vc_feedback": "strong team"}})
+        await orchestrator.run_workflow(fork.run_id, fork.idea_text)
+
+    assert [name for name, mock in mocks.items() if mock.await_count] == ["_funding"]
+    loaded = await storage.get_dossier(fork.run_id)
+    assert loaded.version_of == "parent"
+    assert loaded.status == RunStatus.DONE
+    assert loaded.vc_interview.vc_feedback == "strong team"
+    assert loaded.clarification.idea_title == "Meals"
+
+
+@pytest.mark.asyncio
+async def test_edit_inherited_by_a_fork_of_a_fork_yields_to_upstream_changes(storage):
+    from unittest.mock import patch
+
+    orchestrator, mocks = _mocked_orchestrator(storage)
+    with patch.multiple(orchestrator, **mocks):
+        await orchestrator.run_workflow("parent", "AI meal planning")
+        first = await orchestrator.fork_run(
+            await storage.get_dossier("parent"), {"vc_interview": {"vc_feedback": "strong team"}}
+        )
+        await orchestrator.run_workflow(first.run_id, first.idea_text)
+
+        for mock in mocks.values():
+            mock.reset_mock()
+        second = await orchestrator.fork_run(
+            await storage.get_dossier(first.run_id), {"clarification": {"idea_title": "Meal kits"}}
+        )
+        await orchestrator.run_workflow(second.run_id, second.idea_text)
+
+    # The interview's inputs include the clarification, so the inherited edit is regenerated
+    assert mocks["_clarify"].await_count == 0
+    assert mocks["_vc_interview"].await_count == 1
+    loaded = await storage.get_dossier(second.run_id)
+    assert loaded.clarification.idea_title == "Meal kits"
+    assert loaded.vc_interview.vc_feedback != "strong team"
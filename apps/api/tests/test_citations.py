@@ -0,0 +1,80 @@
+"""Tests for citation rows and the runs-citing-domain index."""
+import pytest
+
+from app.storage.base import citation_rows, normalize_domain
+from app.storage.local import LocalStorageBackend
+from shared.models import Citation, CompetitiveAnalysis, MarketResearch, RunStatus, VentureDossier
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("https://WWW.Example.com/path?q=1", "example.com"),
+    ("example.com", "example.com"),
+    ("http://docs.example.org:8080/", "docs.example.org"),
+    ("", ""),
+])
+def test_normalize_domain(value, expected):
+    assert normalize_domain(value) == expected
+
+
+def test_citation_rows_dedupe_by_url_and_normalize_domain():
+    dossier = VentureDossier(
+        run_id="r1",
+        idea_text="idea",
+        market_research=MarketResearch(citations=[
+            Citation(url="https://www.a.com/1", title="first"),
+            Citation(url="https://b.io/x", domain="B.io"),
+        ]),
+        competitive_analysis=CompetitiveAnalysis(citations=[
+            Citation(url="https://www.a.com/1", title="duplicate"),
+            Citation(url=""),
+        ]),
+    )
+
+    rows = citation_rows(dossier)
+
+    assert [(r["url"], r["domain"], r["title"]) for r in rows] == [
+        ("https://www.a.com/1", "a.com", "first"),
+        ("https://b.io/x", "b.io", ""),
+    ]
+    assert all(r["run_id"] == "r1" for r in rows)
+
+
+def _cited(run_id, *urls, status=RunStatus.DONE):
+    return VentureDossier(
+        run_id=run_id,
+        idea_text=run_id,
+        status=status,
+        market_research=MarketResearch(citations=[Citation(url=u) for u in urls]),
+    )
+
+
+@pytest.mark.asyncio
+async def test_local_backend_indexes_citation_domains(tmp_path):
+    storage = LocalStorageBackend(str(tmp_path))
+    await storage.initialize()
+    assert storage.indexes_citations
+
+    await storage.save_dossier(_cited("r1", "https://www.a.com/1", "https://a.com/2", "https://b.io/"))
+    await storage.save_dossier(_cited("r2", "https://b.io/x"))
+    assert [(r["run_id"], r["citations"]) for r in await storage.runs_citing_domain("A.com")] == [("r1", 2)]
+    assert {r["run_id"] for r in await storage.runs_citing_domain("https://b.io")} == {"r1", "r2"}
+
+    # A later save replaces the run's citations
+    await storage.save_dossier(_cited("r1", "https://c.dev/"))
+    assert await storage.runs_citing_domain("a.com") == []
+    await storage.close()
+
+
+@pytest.mark.asyncio
+async def test_catalog_from_before_the_citation_index_is_rebuilt(tmp_path):
+    storage = LocalStorageBackend(str(tmp_path))
+    await storage.initialize()
+    await storage.save_dossier(_cited("r1", "https://a.com/"))
+    storage.catalog.conn.execute("DELETE FROM citations")
+    storage.catalog.conn.execute("PRAGMA user_version = 0")
+    await storage.close()
+
+    reopened = LocalStorageBackend(str(tmp_path))
+    await reopened.initialize()
+    assert [r["run_id"] for r in await reopened.runs_citing_domain("a.com")] == ["r1"]
+    await reopened.close()
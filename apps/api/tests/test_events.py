@@ -0,0 +1,95 @@
+"""Tests for the dossier event bus."""
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.storage.events import DossierEventBus
+from shared.models import AgentStep, RunStatus, VentureDossier
+
+
+@pytest.mark.asyncio
+async def test_watchers_share_one_snapshot_and_wake_on_publish():
+    bus = DossierEventBus()
+    dossier = VentureDossier(run_id="r1", idea_text="idea")
+    fetch = AsyncMock(return_value=dossier)
+
+    async def collect():
+        events = []
+        async for event in bus.watch("r1", fetch, poll_interval=5):
+            events.append(event)
+            if event.status == RunStatus.DONE:
+                return events
+
+    watchers = [asyncio.create_task(collect()) for _ in range(3)]
+    await asyncio.sleep(0)
+    assert bus.watcher_count("r1") == 3
+
+    dossier.current_step = AgentStep.CLARIFIER
+    bus.publish(dossier)
+    await asyncio.sleep(0.01)
+    dossier.status = RunStatus.DONE
+    bus.publish(dossier)
+
+    results = await asyncio.gather(*watchers)
+    assert fetch.await_count == 1
+    for events in results:
+        assert [e.seq for e in events] == [0, 1, 2]
+    assert results[0][-1] is results[1][-1]
+    assert bus.watcher_count("r1") == 0
+
+
+@pytest.mark.asyncio
+async def test_watch_falls_back_to_storage_when_nothing_is_published():
+    bus = DossierEventBus()
+    initial = VentureDossier(run_id="r2", idea_text="idea")
+    finished = initial.model_copy(update={"status": RunStatus.DONE})
+    fetch = AsyncMock(side_effect=[initial, finished])
+
+    statuses = []
+    async for event in bus.watch("r2", fetch, poll_interval=0.01):
+        statuses.append(event.status)
+        if event.status == RunStatus.DONE:
+            break
+    assert statuses == [RunStatus.QUEUED, RunStatus.DONE]
+
+
+@pytest.mark.asyncio
+async def test_unknown_run_yields_nothing():
+    bus = DossierEventBus()
+    events = [e async for e in bus.watch("missing", AsyncMock(return_value=None))]
+    assert events == []
+
+
+def test_patch_roundtrip_on_dossier_documents():
+    from app.storage.jsonpatch import apply_patch, make_patch
+
+    old = VentureDossier(run_id="r3", idea_text="idea").model_dump(mode="json")
+    new = dict(old, status="running", current_step="clarifier", clarification={"idea_title": "X", "keywords": ["a/b", "c"]})
+    newer = dict(new, clarification={"idea_title": "X", "keywords": ["c"]}, error=None)
+
+    for before, after in [(old, new), (new, newer), (newer, old)]:
+        ops = make_patch(before, after)
+        assert apply_patch(before, ops) == after
+    assert make_patch(old, old) == []
+    assert make_patch({"a": 1}, {"a": True}) == [{"op": "replace", "path": "/a", "value": True}]
+
+
+@pytest.mark.asyncio
+async def test_replay_resumes_from_last_event_id():
+    bus = DossierEventBus()
+    dossier = VentureDossier(run_id="r4", idea_text="idea")
+    fetch = AsyncMock(return_value=dossier)
+
+    first = bus.watch("r4", fetch, poll_interval=5, replay=True)
+    initial = await first.__anext__()
+    for step in [AgentStep.CLARIFIER, AgentStep.MARKET_SEARCH]:
+        dossier.current_step = step
+        bus.publish(dossier)
+
+    second = bus.watch("r4", fetch, poll_interval=5, replay=True, last_event_id=initial.event_id)
+    replayed = [await second.__anext__(), await second.__anext__()]
+    assert [e.seq for e in replayed] == [1, 2]
+    assert all(e.patch is not None for e in replayed)
+    await first.aclose()
+    await second.aclose()
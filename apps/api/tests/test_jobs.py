@@ -0,0 +1,123 @@
+"""Tests for the workflow job queue."""
+import asyncio
+
+import pytest
+
+from services.jobs import AlreadyQueued, JobQueue, QueueFull, SQLiteJobStore
+
+
+def _recorder(log, gate=None):
+    async def handler(run_id, idea_text):
+        log.append(("start", run_id))
+        if gate is not None:
+            await gate.wait()
+        log.append(("end", run_id))
+    return handler
+
+
+async def _drained(store):
+    for _ in range(200):
+        if not store.pending():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"jobs left: {store.pending()}")
+
+
+@pytest.mark.asyncio
+async def test_concurrency_is_bounded_and_priority_wins(tmp_path):
+    log, gate = [], asyncio.Event()
+    queue = JobQueue(SQLiteJobStore(tmp_path / "jobs.sqlite3"), _recorder(log, gate), concurrency=2)
+    for i, priority in enumerate([0, 0, 0, 5]):
+        await queue.submit(f"r{i}", "idea", priority=priority)
+    await queue.start()
+
+    await asyncio.sleep(0.05)
+    assert {e for e in log if e[0] == "start"} == {("start", "r3"), ("start", "r0")}
+    stats = await queue.stats()
+    assert (stats["running"], stats["queued"]) == (2, 2)
+
+    gate.set()
+    await _drained(queue.store)
+    assert queue.completed == 4
+    await queue.stop()
+
+
+@pytest.mark.asyncio
+async def test_full_queue_rejects_with_retry_after(tmp_path):
+    queue = JobQueue(SQLiteJobStore(tmp_path / "jobs.sqlite3"), _recorder([]), concurrency=0, max_queued=2)
+    await queue.submit("r0", "idea")
+    await queue.submit("r1", "idea")
+
+    assert await queue.full()
+    with pytest.raises(QueueFull) as exc:
+        await queue.submit("r2", "idea")
+    assert exc.value.retry_after >= 1
+    await queue.store.close()
+
+
+@pytest.mark.asyncio
+async def test_stopped_worker_hands_its_job_back(tmp_path):
+    path = tmp_path / "jobs.sqlite3"
+    log, gate = [], asyncio.Event()
+    queue = JobQueue(SQLiteJobStore(path), _recorder(log, gate), concurrency=1)
+    await queue.start()
+    await queue.submit("r0", "idea")
+    await queue.submit("r1", "idea")
+    await asyncio.sleep(0.05)
+    assert log == [("start", "r0")]
+    await queue.stop()
+
+    log = []
+    restarted = JobQueue(SQLiteJobStore(path), _recorder(log), concurrency=1)
+    await restarted.start()
+    await _drained(restarted.store)
+    assert log == [("start", "r0"), ("end", "r0"), ("start", "r1"), ("end", "r1")]
+    await restarted.stop()
+
+
+@pytest.mark.asyncio
+async def test_expired_lease_lets_another_worker_take_over(tmp_path):
+    path = tmp_path / "jobs.sqlite3"
+    api = JobQueue(SQLiteJobStore(path), _recorder([]), concurrency=0)
+    await api.submit("r0", "idea")
+
+    crashed = SQLiteJobStore(path)
+    assert (await crashed.claim("dead-worker", lease=0.05))["run_id"] == "r0"
+    assert await crashed.claim("other", lease=60) is None
+
+    await asyncio.sleep(0.1)
+    log = []
+    worker = JobQueue(SQLiteJobStore(path), _recorder(log), concurrency=1, poll_interval=0.01)
+    await worker.start()
+    await _drained(worker.store)
+    assert log == [("start", "r0"), ("end", "r0")]
+    assert not await crashed.renew("r0", "dead-worker", lease=60)
+    await worker.stop()
+    await crashed.close()
+    await api.store.close()
+
+
+@pytest.mark.asyncio
+async def test_capacity_is_checked_atomically_across_processes(tmp_path):
+    path = tmp_path / "jobs.sqlite3"
+    api = JobQueue(SQLiteJobStore(path), _recorder([]), concurrency=0, max_queued=2)
+    other = JobQueue(SQLiteJobStore(path), _recorder([]), concurrency=0, max_queued=2)
+    await api.submit("r0", "idea")
+    await other.submit("r1", "idea")
+
+    with pytest.raises(QueueFull):
+        await api.submit("r2", "idea")
+    assert [job["run_id"] for job in api.store.pending()] == ["r0", "r1"]
+    await api.store.close()
+    await other.store.close()
+
+
+@pytest.mark.asyncio
+async def test_second_submit_of_a_run_is_rejected(tmp_path):
+    queue = JobQueue(SQLiteJobStore(tmp_path / "jobs.sqlite3"), _recorder([]), concurrency=0)
+    await queue.submit("r0", "idea")
+
+    with pytest.raises(AlreadyQueued):
+        await queue.submit("r0", "idea")
+    assert len(queue.store.pending()) == 1
+    await queue.store.close()
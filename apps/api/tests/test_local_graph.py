@@ -0,0 +1,149 @@
+"""Tests for the embedded market graph store."""
+import threading
+
+import pytest
+
+from services.integrations.local_graph import LocalGraphStore
+
+
+COMPETITORS = [
+    {"name": "Acme", "description": "a", "strengths": ["fast", "cheap"]},
+    {"name": "Beta", "description": "b", "strengths": ["fast", "secure"]},
+]
+
+
+@pytest.mark.asyncio
+async def test_top_competitors_and_reload_from_disk(tmp_path):
+    store = LocalGraphStore(tmp_path / "graph.sqlite3")
+    await store.start()
+    await store.store_market_graph("r1", "idea", COMPETITORS, [{"name": "smb"}, {"name": "enterprise"}], ["price"])
+
+    top = await store.get_top_competitors("r1")
+    assert [(c["name"], c["segment_overlap"]) for c in top] == [("Acme", 2), ("Beta", 2)]
+    assert top[0]["features"] == ["cheap", "fast"]
+
+    reopened = LocalGraphStore(tmp_path / "graph.sqlite3")
+    await reopened.start()
+    assert await reopened.get_top_competitors("r1") == top
+    assert reopened.out[("Idea", "r1")]["DIFFERS_ON"] == {("Differentiator", "price")}
+    await store.close()
+    await reopened.close()
+
+
+@pytest.mark.asyncio
+async def test_other_process_writes_are_picked_up_and_unchanged_writes_skipped(tmp_path):
+    api = LocalGraphStore(tmp_path / "graph.sqlite3")
+    worker = LocalGraphStore(tmp_path / "graph.sqlite3")
+    await api.start()
+    await worker.start()
+
+    await worker.store_market_graph("r1", "idea", COMPETITORS, [{"name": "smb"}], [])
+    assert await api.get_competitor_run_counts(["Acme", "Nope"]) == {"Acme": 1}
+
+    # Re-storing the same graph commits nothing, so the API keeps its copy
+    version = api._data_version
+    await worker.store_market_graph("r1", "idea", COMPETITORS, [{"name": "smb"}], [])
+    await api.get_top_competitors("r1")
+    assert api._data_version == version
+    await api.close()
+    await worker.close()
+
+
+@pytest.mark.asyncio
+async def test_analytics_are_recomputed_only_after_changes(tmp_path):
+    store = LocalGraphStore(tmp_path / "graph.sqlite3")
+    await store.start()
+    await store.store_market_graph("r1", "idea", COMPETITORS, [{"name": "smb"}, {"name": "enterprise"}], [])
+    await store.store_market_graph("r2", "idea", COMPETITORS[:1], [{"name": "smb"}, {"name": "enterprise"}], [])
+
+    analytics = await store.get_graph_analytics(limit=5)
+    assert analytics["runs"] == 2
+    assert analytics["competitor_frequency"] == [{"name": "Acme", "runs": 2}, {"name": "Beta", "runs": 1}]
+    assert analytics["segment_cooccurrence"] == [{"segment": "enterprise", "other": "smb", "runs": 2}]
+    similarity = analytics["feature_similarity"][0]
+    assert (similarity["competitor"], similarity["other"], similarity["shared_features"]) == ("Acme", "Beta", 1)
+    assert similarity["score"] == pytest.approx(1 / 3)
+
+    assert not await store.refresh_analytics()
+    await store.store_market_graph("r3", "idea", COMPETITORS[1:], [], [])
+    assert await store.refresh_analytics()
+    await store.close()
+
+
+@pytest.mark.asyncio
+async def test_other_process_writes_load_incrementally_off_the_event_loop(tmp_path, monkeypatch):
+    api = LocalGraphStore(tmp_path / "graph.sqlite3")
+    worker = LocalGraphStore(tmp_path / "graph.sqlite3")
+    await api.start()
+    await worker.start()
+    await worker.store_market_graph("r1", "idea", COMPETITORS, [{"name": "smb"}], [])
+    await api.get_top_competitors("r1")
+
+    reads = []
+    read_changes = api._read_changes
+
+    def recording_read_changes(after):
+        changes = read_changes(after)
+        reads.append((threading.current_thread(), changes))
+        return changes
+
+    monkeypatch.setattr(api, "_read_changes", recording_read_changes)
+    changed = [{**COMPETITORS[0], "description": "renamed"}]
+    await worker.store_market_graph("r2", "other idea", changed, [{"name": "smb"}], [])
+
+    assert await api.get_competitor_run_counts(["Acme", "Beta"]) == {"Acme": 2, "Beta": 1}
+    assert api.nodes[("Competitor", "Acme")]["description"] == "renamed"
+    thread, (_, nodes, edges) = reads[0]
+    assert thread is not threading.main_thread()
+    # Only the second run's rows: its Idea and the renamed competitor, and their two edges
+    assert sorted(row[:2] for row in nodes) == [("Competitor", "Acme"), ("Idea", "r2")]
+    assert len(edges) == 2
+    await api.close()
+    await worker.close()
+
+
+@pytest.mark.asyncio
+async def test_metrics_report_the_local_store(tmp_path, monkeypatch):
+    from services.integrations import neo4j_client
+
+    store = LocalGraphStore(tmp_path / "graph.sqlite3")
+    await store.start()
+    await store.store_market_graph("r1", "idea", COMPETITORS[:1], [{"name": "smb"}], [])
+    monkeypatch.setattr(neo4j_client.settings, "graph_store", "local")
+    monkeypatch.setattr(neo4j_client, "_client", store)
+
+    metrics = await neo4j_client.graph_metrics()
+
+    assert metrics["backend"] == "local"
+    # Idea, Acme, smb, fast, cheap; TARGETS, COMPETES_WITH, SERVES and two HAS_FEATURE
+    assert (metrics["nodes"], metrics["edges"]) == (5, 5)
+    await store.close()
+
+
+@pytest.mark.asyncio
+async def test_pipeline_competitors_get_feature_edges(tmp_path, monkeypatch):
+    from services import workflow
+    from shared.models import Competitor, MarketResearch, VentureDossier
+
+    store = LocalGraphStore(tmp_path / "graph.sqlite3")
+    await store.start()
+
+    async def get_store():
+        return store
+
+    monkeypatch.setattr(workflow, "graph_backend", lambda: "local")
+    monkeypatch.setattr(workflow, "get_neo4j_client", get_store)
+    dossier = VentureDossier(run_id="r1", idea_text="idea", market_research=MarketResearch(
+        segments=["smb"],
+        competitors=[
+            Competitor(name="Acme", features=["ai planner", "sync"]),
+            Competitor(name="Beta", features=["sync"]),
+        ],
+    ))
+    await workflow.WorkflowOrchestrator()._store_market_graph(dossier)
+
+    top = await store.get_top_competitors("r1")
+    assert [c["features"] for c in top] == [["ai planner", "sync"], ["sync"]]
+    similarity = (await store.get_graph_analytics())["feature_similarity"]
+    assert similarity[0]["score"] == pytest.approx(1 / 2)
+    await store.close()
@@ -0,0 +1,99 @@
+"""Tests for the local filesystem storage backend."""
+import pytest
+
+from app.storage.local import LocalStorageBackend
+from shared.models import RunStatus, VentureDossier
+
+
+@pytest.fixture
+async def storage(tmp_path):
+    backend = LocalStorageBackend(str(tmp_path), compact_json=True, fsync="full")
+    await backend.initialize()
+    return backend
+
+
+@pytest.mark.asyncio
+async def test_save_is_atomic_and_roundtrips(storage):
+    dossier = VentureDossier(run_id="r1", idea_text="idea", status=RunStatus.RUNNING)
+    await storage.save_dossier(dossier)
+    dossier.status = RunStatus.DONE
+    await storage.save_dossier(dossier)
+
+    assert [p.name for p in storage.runs_path.glob("*.json")] == ["r1.json"]
+    assert not list(storage.runs_path.glob("*.tmp"))
+    assert b"\n" not in (storage.runs_path / "r1.json").read_bytes()
+    loaded = await storage.get_dossier("r1")
+    assert loaded.status == RunStatus.DONE
+
+
+@pytest.mark.asyncio
+async def test_missing_run_returns_none(storage):
+    assert await storage.get_dossier("nope") is None
+
+
+def test_rejects_unknown_fsync_policy(tmp_path):
+    with pytest.raises(ValueError):
+        LocalStorageBackend(str(tmp_path), fsync="sometimes")
+
+
+@pytest.mark.asyncio
+async def test_list_runs_paginates_newest_first_with_status_filter(storage):
+    from datetime import datetime, timedelta
+
+    from app.storage import encode_cursor
+
+    base = datetime(2025, 1, 1)
+    for i in range(5):
+        status = RunStatus.DONE if i % 2 == 0 else RunStatus.ERROR
+        await storage.save_dossier(
+            VentureDossier(run_id=f"r{i}", idea_text=f"idea {i}", status=status, created_at=base + timedelta(minutes=i))
+        )
+
+    first = await storage.list_runs(limit=2)
+    assert [r["run_id"] for r in first] == ["r4", "r3"]
+    second = await storage.list_runs(limit=2, cursor=encode_cursor(first[-1]))
+    assert [r["run_id"] for r in second] == ["r2", "r1"]
+    done = await storage.list_runs(limit=10, status="done")
+    assert [r["run_id"] for r in done] == ["r4", "r2", "r0"]
+
+
+@pytest.mark.asyncio
+async def test_catalog_is_rebuilt_from_existing_files(storage, tmp_path):
+    await storage.save_dossier(VentureDossier(run_id="r1", idea_text="idea"))
+    storage.catalog.close()
+    for path in storage.runs_path.glob("catalog.sqlite3*"):
+        path.unlink()
+
+    reopened = LocalStorageBackend(str(tmp_path))
+    await reopened.initialize()
+    assert [r["run_id"] for r in await reopened.list_runs()] == ["r1"]
+
+
+@pytest.mark.asyncio
+async def test_artifacts_stream_in_ranges(storage):
+    content = bytes(range(256)) * 1024
+    await storage.save_artifact("r1", "report.pdf", content)
+
+    info = await storage.stat_artifact("r1", "report.pdf")
+    assert (info.size, info.content_type) == (len(content), "application/pdf")
+    assert b"".join([c async for c in storage.open_artifact("r1", "report.pdf")]) == content
+    chunks = [c async for c in storage.open_artifact("r1", "report.pdf", 100, 70000)]
+    assert len(chunks) == 2 and b"".join(chunks) == content[100:70000]
+
+    with pytest.raises(FileNotFoundError):
+        await storage.stat_artifact("r1", "missing.pdf")
+
+
+def test_parse_range():
+    from app.storage import parse_range
+
+    assert parse_range("bytes=0-99", 1000) == (0, 100)
+    assert parse_range("bytes=900-", 1000) == (900, 1000)
+    assert parse_range("bytes=-100", 1000) == (900, 1000)
+    assert parse_range("bytes=-5000", 1000) == (0, 1000)
+    assert parse_range("bytes=500-5000", 1000) == (500, 1000)
+    for ignored in ("items=0-1", "bytes=0-1,5-6", "bytes=abc", "bytes=9-3"):
+        assert parse_range(ignored, 1000) is None
+    for unsatisfiable in ("bytes=1000-", "bytes=2000-2100", "bytes=-0"):
+        with pytest.raises(ValueError):
+            parse_range(unsatisfiable, 1000)
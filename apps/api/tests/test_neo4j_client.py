@@ -0,0 +1,348 @@
+"""Tests for the Neo4j market graph client.
+
+The tests at the end run against a real server when ``NEO4J_TEST_URI``
+(plus ``NEO4J_TEST_USER`` / ``NEO4J_TEST_PASSWORD``) points at a throwaway
+Neo4j, e.g. ``docker run --rm -p 7687:7687 -e NEO4J_AUTH=neo4j/password
+neo4j:5.15``, and are skipped otherwise.
+"""
+import asyncio
+import os
+
+import pytest
+from neo4j.exceptions import ServiceUnavailable
+
+from services.integrations import neo4j_client
+from services.integrations.neo4j_client import (
+    MERGE_COMPETITORS,
+    MERGE_DIFFERENTIATORS,
+    MERGE_IDEA,
+    MERGE_SERVES,
+    READ_COMPETITOR_FREQUENCY,
+    READ_GRAPH_STATS,
+    REFRESH_GRAPH_STATS,
+    Neo4jClient,
+    market_graph_rows,
+)
+
+
+class FakeRecord(dict):
+    def data(self):
+        return dict(self)
+
+
+class FakeResult:
+    def __init__(self, record=None, records=None):
+        self.records = [FakeRecord(r) for r in records or ([record] if record else [])]
+
+    async def single(self):
+        return self.records[0] if self.records else None
+
+    async def consume(self):
+        pass
+
+    def __aiter__(self):
+        async def records():
+            for record in self.records:
+                yield record
+        return records()
+
+
+class FakeTx:
+    """Logs statements and answers them from the driver's canned responses."""
+
+    def __init__(self, driver):
+        self.driver = driver
+
+    async def run(self, query, params=None, **kwargs):
+        self.driver.statements.append((query, params or kwargs))
+        return FakeResult(records=self.driver.responses.get(query))
+
+
+class FakeSession:
+    def __init__(self, driver):
+        self.driver = driver
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+    async def execute_write(self, fn, *args):
+        self.driver.transactions += 1
+        return await fn(FakeTx(self.driver), *args)
+
+    async def execute_read(self, fn, *args):
+        return await fn(FakeTx(self.driver), *args)
+
+
+class FakeDriver:
+    def __init__(self):
+        self.statements = []
+        self.transactions = 0
+        self.responses = {}
+
+    def session(self):
+        return FakeSession(self)
+
+
+@pytest.mark.asyncio
+async def test_market_graph_is_written_in_one_transaction_of_batched_statements():
+    client = Neo4jClient()
+    client.driver = FakeDriver()
+    competitors = [
+        {"name": f"c{i}", "description": "d", "strengths": ["fast", "cheap", "fast", "big", "old"]}
+        for i in range(50)
+    ]
+    segments = [{"name": f"s{j}"} for j in range(10)]
+
+    await client.store_market_graph("r1", "idea", competitors, segments, ["price", "price", "speed"])
+
+    assert client.driver.transactions == 1
+    assert len(client.driver.statements) == 5
+    serves = next(params for query, params in client.driver.statements if query == MERGE_SERVES)
+    assert len(serves["pairs"]) == 500
+
+
+@pytest.mark.asyncio
+async def test_rewrites_send_only_what_changed():
+    client = Neo4jClient()
+    client.driver = driver = FakeDriver()
+    competitors = [{"name": f"c{i}", "strengths": ["fast"]} for i in range(5)]
+    segments = [{"name": "s0"}, {"name": "s1"}]
+    await client.store_market_graph("r1", "idea", competitors, segments, [])
+
+    # Same graph again: skipped without a transaction
+    await client.store_market_graph("r1", "idea", competitors, segments, [])
+    assert driver.transactions == 1
+
+    # Second pass adds differentiators and changes one competitor
+    driver.statements.clear()
+    competitors[2] = {"name": "c2", "strengths": ["fast", "cheap"]}
+    await client.store_market_graph("r1", "idea", competitors, segments, ["price"])
+    sent = dict(driver.statements)
+    assert set(sent) == {MERGE_IDEA, MERGE_COMPETITORS, MERGE_DIFFERENTIATORS}
+    assert [r["name"] for r in sent[MERGE_COMPETITORS]["rows"]] == ["c2"]
+    assert sent[MERGE_DIFFERENTIATORS]["rows"] == ["price"]
+
+    # A process that has not written the run sends it in full, without reading first
+    other = Neo4jClient()
+    other.driver = driver
+    driver.statements.clear()
+    await other.store_market_graph("r1", "idea", competitors, segments + [{"name": "s2"}], ["price"])
+    sent = dict(driver.statements)
+    assert len(driver.statements) == 5 and driver.transactions == 3
+    assert len(sent[MERGE_COMPETITORS]["rows"]) == 5
+    assert len(sent[MERGE_SERVES]["pairs"]) == 15
+
+
+def test_rows_are_deduplicated_and_features_capped():
+    rows = market_graph_rows(
+        [{"name": "a", "strengths": ["x", "x", "y", "z", "w"], "url": None}, {"name": ""}],
+        [{"name": "s"}, {"name": "s", "size_estimate": "$1B"}],
+        ["d", "", "d"],
+    )
+
+    assert rows["competitors"] == [
+        {"name": "a", "description": "", "url": "", "pricing": "", "features": ["x", "y", "z"]}
+    ]
+    assert rows["segments"] == [{"name": "s", "size_estimate": "$1B"}]
+    assert rows["differentiators"] == ["d"]
+
+
+@pytest.mark.asyncio
+async def test_analytics_refresh_only_when_runs_changed_and_reads_aggregates():
+    client = Neo4jClient()
+    client.driver = driver = FakeDriver()
+
+    driver.responses[neo4j_client.ANALYTICS_STALE] = [{"changed": 0}]
+    assert not await client.refresh_analytics()
+    assert len(driver.statements) == 1
+
+    driver.responses[neo4j_client.ANALYTICS_STALE] = [{"changed": 3}]
+    assert await client.refresh_analytics()
+    assert driver.statements[-1][0] == REFRESH_GRAPH_STATS
+
+    driver.statements.clear()
+    driver.responses[READ_GRAPH_STATS] = [{"refreshed_at": "2026-01-01T00:00:00Z", "runs": 3, "competitors": 2}]
+    driver.responses[READ_COMPETITOR_FREQUENCY] = [{"name": "Acme", "runs": 3}, {"name": "Beta", "runs": 1}]
+    analytics = await client.get_graph_analytics(limit=5)
+    assert analytics["runs"] == 3
+    assert analytics["competitor_frequency"][0] == {"name": "Acme", "runs": 3}
+    assert analytics["segment_cooccurrence"] == [] and analytics["feature_similarity"] == []
+    assert all(params == {"limit": 5} for query, params in driver.statements if query != READ_GRAPH_STATS)
+
+
+def test_features_come_from_the_pipeline_competitor_model():
+    from shared.models import Competitor
+
+    rows = market_graph_rows(
+        [
+            Competitor(name="Acme", features=["ai planner", "sync"], strengths=["cheap"]).model_dump(),
+            Competitor(name="Beta", strengths=["secure"]).model_dump(),
+        ],
+        [],
+        [],
+    )
+
+    assert [r["features"] for r in rows["competitors"]] == [["ai planner", "sync"], ["secure"]]
+
+
+def test_competitors_are_linked_to_their_run():
+    rows = market_graph_rows([{"name": "a"}], [{"name": "s"}], [])
+
+    sent = dict(neo4j_client.market_graph_statements("r1", "idea", rows))
+    assert sent[MERGE_IDEA] == {"run_id": "r1", "idea": "idea"}
+    assert sent[MERGE_COMPETITORS]["run_id"] == "r1"
+    assert sent[MERGE_SERVES]["pairs"] == [["a", "s"]]
+
+
+class FlakyDriver(FakeDriver):
+    """A driver whose server is down for the first ``failures`` connectivity checks."""
+
+    attempts = 0
+    failures = 0
+
+    def __init__(self, uri, **kwargs):
+        super().__init__()
+        self.kwargs = kwargs
+        self.closed = False
+
+    async def verify_connectivity(self):
+        FlakyDriver.attempts += 1
+        if FlakyDriver.attempts <= FlakyDriver.failures:
+            raise ServiceUnavailable("connection refused")
+
+    async def close(self):
+        self.closed = True
+
+
+class FlakyGraphDatabase:
+    @staticmethod
+    def driver(uri, **kwargs):
+        return FlakyDriver(uri, **kwargs)
+
+
+async def _until(predicate):
+    for _ in range(200):
+        if predicate():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("condition not reached")
+
+
+@pytest.mark.asyncio
+async def test_client_reconnects_with_backoff_and_reports_pool_stats(monkeypatch):
+    monkeypatch.setattr(neo4j_client, "AsyncGraphDatabase", FlakyGraphDatabase)
+    monkeypatch.setattr(neo4j_client, "graph_stats", neo4j_client.GraphPoolStats())
+    monkeypatch.setattr(neo4j_client.settings, "neo4j_reconnect_backoff", 0.01)
+    monkeypatch.setattr(neo4j_client.settings, "neo4j_max_pool_size", 7)
+    monkeypatch.setattr(FlakyDriver, "attempts", 0)
+    monkeypatch.setattr(FlakyDriver, "failures", 2)
+    client = Neo4jClient()
+    client.initialize_schema = lambda: asyncio.sleep(0)
+
+    # Down at startup: start() returns at once and writes are skipped
+    await client.start()
+    await client.store_market_graph("r1", "idea", [], [], [])
+    assert client.stats.skipped_total == 1
+
+    await _until(lambda: client.driver is not None)
+    assert FlakyDriver.attempts == 3
+    assert client.driver.kwargs["max_connection_pool_size"] == 7
+    await client.store_market_graph("r1", "idea", [], [], [])
+    stats = client.stats.as_dict()
+    assert stats["connected"] and stats["sessions_total"] == 1 and stats["in_flight"] == 0
+    assert stats["sessions_in_flight_ratio"] == 0 and stats["sessions_over_pool_size_total"] == 0
+
+    # A connection error mid-write drops the driver and reconnects
+    lost = client.driver
+
+    async def broken(fn, *args):
+        raise ServiceUnavailable("gone")
+
+    monkeypatch.setattr(FakeSession, "execute_write", lambda self, fn, *args: broken(fn, *args))
+    with pytest.raises(ServiceUnavailable):
+        await client.store_market_graph("r2", "idea", [], [], [])
+    await _until(lambda: client.driver is not None and client.driver is not lost)
+    assert lost.closed
+    assert client.stats.reconnects_total == 1 and client.stats.errors_total == 1
+
+    await client.close()
+    assert client.driver is None and not client.stats.connected
+
+
+def test_embedded_store_is_used_without_a_neo4j_uri(monkeypatch):
+    monkeypatch.setattr(neo4j_client.settings, "graph_store", "auto")
+    monkeypatch.setattr(neo4j_client.settings, "neo4j_uri", None)
+    assert neo4j_client.graph_backend() == "local"
+    monkeypatch.setattr(neo4j_client.settings, "neo4j_uri", "bolt://localhost:7687")
+    assert neo4j_client.graph_backend() == "neo4j"
+    monkeypatch.setattr(neo4j_client.settings, "graph_store", "none")
+    assert neo4j_client.graph_backend() is None
+
+
+# ------------------------------------------------------------ live server
+
+@pytest.fixture
+async def live_client(monkeypatch):
+    uri = os.environ.get("NEO4J_TEST_URI")
+    if not uri:
+        pytest.skip("NEO4J_TEST_URI not set")
+    monkeypatch.setattr(neo4j_client.settings, "neo4j_uri", uri)
+    monkeypatch.setattr(neo4j_client.settings, "neo4j_user", os.environ.get("NEO4J_TEST_USER", "neo4j"))
+    monkeypatch.setattr(neo4j_client.settings, "neo4j_password", os.environ.get("NEO4J_TEST_PASSWORD", "password"))
+    monkeypatch.setattr(neo4j_client, "graph_stats", neo4j_client.GraphPoolStats())
+    client = Neo4jClient()
+    if not await client.connect():
+        pytest.skip(f"Neo4j not reachable at {uri}: {client.stats.last_error}")
+    await client.initialize_schema()
+    yield client
+    async with client.driver.session() as session:
+        await (await session.run(
+            "MATCH (n) WHERE any(k IN ['run_id', 'name'] WHERE n[k] STARTS WITH 'itest-') DETACH DELETE n"
+        )).consume()
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_live_analytics_are_refreshed_and_read_back(live_client):
+    competitors = [
+        {"name": "itest-acme", "strengths": ["itest-fast", "itest-cheap"]},
+        {"name": "itest-beta", "strengths": ["itest-fast", "itest-secure"]},
+    ]
+    segments = [{"name": "itest-smb"}, {"name": "itest-enterprise"}]
+    await live_client.store_market_graph("itest-r1", "idea", competitors, segments, ["itest-price"])
+    await live_client.store_market_graph("itest-r2", "idea", competitors[:1], segments, [])
+
+    assert await live_client.refresh_analytics()
+    assert not await live_client.refresh_analytics()
+    analytics = await live_client.get_graph_analytics(limit=100)
+
+    assert analytics["refreshed_at"] and analytics["runs"] >= 2
+    assert await live_client.get_competitor_run_counts(["itest-acme", "itest-beta"]) == {
+        "itest-acme": 2,
+        "itest-beta": 1,
+    }
+    cooccurrence = {(r["segment"], r["other"]): r["runs"] for r in analytics["segment_cooccurrence"]}
+    assert cooccurrence[("itest-enterprise", "itest-smb")] == 2
+    similarity = {(r["competitor"], r["other"]): r for r in analytics["feature_similarity"]}
+    assert similarity[("itest-acme", "itest-beta")]["shared_features"] == 1
+    assert similarity[("itest-acme", "itest-beta")]["score"] == pytest.approx(1 / 3)
+    top = await live_client.get_top_competitors("itest-r1")
+    assert {c["name"] for c in top} == {"itest-acme", "itest-beta"}
+
+
+@pytest.mark.asyncio
+async def test_live_graph_stats_are_written_without_competitors(live_client):
+    # Emptied inside a transaction that is rolled back, so the server's data survives
+    async with live_client.driver.session() as session:
+        tx = await session.begin_transaction()
+        try:
+            await (await tx.run("MATCH (n) WHERE n:Competitor OR n:GraphStats DETACH DELETE n")).consume()
+            await (await tx.run(REFRESH_GRAPH_STATS)).consume()
+            record = await (await tx.run(READ_GRAPH_STATS)).single()
+        finally:
+            await tx.rollback()
+
+    assert record is not None and record["competitors"] == 0
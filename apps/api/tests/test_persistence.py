@@ -0,0 +1,87 @@
+"""Tests for write-behind dossier persistence."""
+import asyncio
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from services.persistence import WriteBehindSaver, flush_all
+from shared.models import ClarifiedIdea, RunStatus, VentureDossier
+
+
+def _storage():
+    storage = Mock()
+    storage.saved = []
+    storage.save_dossier = AsyncMock(side_effect=lambda d: storage.saved.append(d.model_copy(deep=True)))
+    storage.get_checkpoint = AsyncMock(return_value=None)
+    storage.save_checkpoint = AsyncMock()
+    return storage
+
+
+@pytest.mark.asyncio
+async def test_rapid_marks_coalesce_into_one_write():
+    storage = _storage()
+    dossier = VentureDossier(run_id="r1", idea_text="idea")
+    saver = WriteBehindSaver(storage, dossier, delay=0.01)
+
+    for status in [RunStatus.RUNNING, RunStatus.DONE]:
+        dossier.status = status
+        saver.mark()
+    await asyncio.sleep(0.05)
+
+    assert len(storage.saved) == 1
+    assert storage.saved[0].status == RunStatus.DONE
+
+
+@pytest.mark.asyncio
+async def test_urgent_mark_preempts_pending_delay():
+    storage = _storage()
+    saver = WriteBehindSaver(storage, VentureDossier(run_id="r2", idea_text="idea"), delay=10)
+    saver.mark()
+    saver.mark(urgent=True)
+    await asyncio.sleep(0.01)
+    assert saver.writes == 1
+
+
+@pytest.mark.asyncio
+async def test_flush_all_writes_pending_changes():
+    storage = _storage()
+    saver = WriteBehindSaver(storage, VentureDossier(run_id="r3", idea_text="idea"), delay=10)
+    saver.mark()
+    await flush_all()
+    assert saver.writes == 1
+    await flush_all()
+    assert saver.writes == 1
+
+
+@pytest.mark.asyncio
+async def test_workflow_saves_once_per_step_boundary():
+    from services.workflow import WorkflowOrchestrator
+
+    storage = _storage()
+    storage.get_dossier = AsyncMock(return_value=None)
+    orchestrator = WorkflowOrchestrator()
+    orchestrator.storage = storage
+
+    clarified = ClarifiedIdea(idea_title="Meals", keywords=["meal"])
+    replies = {
+        "_clarify": clarified,
+        "_market_search": [],
+        "_deep_extract": {"competitors": []},
+        "_normalize": None,
+        "_synthesize": None,
+        "_compete": None,
+        "_vc_interview": None,
+        "_funding": (None, None),
+    }
+    patches = [patch.object(orchestrator, name, AsyncMock(return_value=value)) for name, value in replies.items()]
+    for p in patches:
+        p.start()
+    try:
+        await orchestrator.run_workflow("r4", "AI meal planning")
+    finally:
+        for p in patches:
+            p.stop()
+
+    assert storage.saved[-1].status == RunStatus.DONE
+    assert storage.saved[-1].clarification == clarified
+    assert len(storage.saved) <= 8
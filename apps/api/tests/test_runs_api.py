@@ -0,0 +1,107 @@
+"""Tests for queueing runs through the API."""
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app.storage
+import main
+from app.storage.local import LocalStorageBackend
+from services.jobs import JobQueue, SQLiteJobStore
+from shared.models import RunStatus, VentureDossier
+
+
+async def _idle(run_id, idea_text):
+    pass
+
+
+@pytest.fixture
+def api(tmp_path, monkeypatch):
+    storage = LocalStorageBackend(tmp_path)
+    asyncio.run(storage.initialize())
+    # concurrency=0: jobs are only stored, never run
+    queue = JobQueue(SQLiteJobStore(tmp_path / "jobs.sqlite3"), _idle, concurrency=0, max_queued=1)
+    # Installed as the process-wide backend, which the orchestrator looks up too
+    monkeypatch.setattr(app.storage, "_backend", storage)
+    monkeypatch.setattr(main, "get_job_queue", lambda: queue)
+    yield TestClient(main.app), storage, queue
+    asyncio.run(queue.store.close())
+
+
+def test_priority_is_capped_and_must_not_be_negative(api, monkeypatch):
+    client, storage, queue = api
+    monkeypatch.setattr(main.settings, "job_max_priority", 3)
+
+    assert client.post("/api/runs", json={"idea_text": "idea", "priority": -1}).status_code == 422
+    resp = client.post("/api/runs", json={"idea_text": "idea", "priority": 99})
+
+    assert resp.status_code == 200
+    assert queue.store.pending()[0]["priority"] == 3
+
+
+def test_queue_filling_up_after_the_check_marks_the_run_failed(api, monkeypatch):
+    client, storage, queue = api
+    assert client.post("/api/runs", json={"idea_text": "first"}).status_code == 200
+
+    async def not_full():
+        return False
+
+    # Another request takes the last slot between full() and submit()
+    monkeypatch.setattr(queue, "full", not_full)
+    resp = client.post("/api/runs", json={"idea_text": "second"})
+
+    assert resp.status_code == 429
+    assert int(resp.headers["retry-after"]) >= 1
+    runs = asyncio.run(storage.list_runs())
+    assert sorted(r["status"] for r in runs) == [RunStatus.ERROR.value, RunStatus.QUEUED.value]
+    assert len(queue.store.pending()) == 1
+
+
+def test_concurrent_resume_gets_conflict_not_server_error(api, monkeypatch):
+    client, storage, queue = api
+    asyncio.run(storage.save_dossier(VentureDossier(run_id="r1", idea_text="idea", status=RunStatus.ERROR)))
+    assert client.post("/api/runs/r1/resume").status_code == 200
+
+    async def no(*args):
+        return False
+
+    # A second resume that passed both checks before the first one submitted
+    monkeypatch.setattr(queue, "full", no)
+    contains = queue.store.contains
+    checks = iter([no, contains])
+    monkeypatch.setattr(queue.store, "contains", lambda run_id: next(checks)(run_id))
+    resp = client.post("/api/runs/r1/resume")
+
+    assert resp.status_code == 409
+    assert asyncio.run(storage.get_dossier("r1")).status == RunStatus.QUEUED
+
+
+def test_fork_rejected_by_a_full_queue_is_not_left_queued(api, monkeypatch):
+    client, storage, queue = api
+    asyncio.run(storage.save_dossier(VentureDossier(run_id="parent", idea_text="idea", status=RunStatus.DONE)))
+    assert client.post("/api/runs", json={"idea_text": "fills the queue"}).status_code == 200
+    assert client.post("/api/runs/parent/fork", json={"priority": -1}).status_code == 422
+
+    async def not_full():
+        return False
+
+    monkeypatch.setattr(queue, "full", not_full)
+    resp = client.post("/api/runs/parent/fork", json={"sections": {}})
+
+    assert resp.status_code == 429
+    others = [r for r in asyncio.run(storage.list_runs()) if r["run_id"] != "parent"]
+    assert sorted(r["status"] for r in others) == [RunStatus.ERROR.value, RunStatus.QUEUED.value]
+    assert len(queue.store.pending()) == 1
+
+
+def test_fork_is_refused_without_step_checkpoints(api, monkeypatch):
+    client, storage, queue = api
+    asyncio.run(storage.save_dossier(VentureDossier(run_id="parent", idea_text="idea", status=RunStatus.DONE)))
+    monkeypatch.setattr(main.settings, "step_checkpoints", False)
+
+    resp = client.post("/api/runs/parent/fork", json={"sections": {"clarification": {"idea_title": "edited"}}})
+
+    assert resp.status_code == 422
+    assert "step_checkpoints" in resp.json()["detail"]
+    assert [r["run_id"] for r in asyncio.run(storage.list_runs())] == ["parent"]
+    assert queue.store.pending() == []
@@ -0,0 +1,78 @@
+"""Tests for the step-graph scheduler."""
+import asyncio
+
+import pytest
+
+from services.scheduler import Step, StepGraph
+
+
+def _sleeper(delay: float, value):
+    async def fn(**kwargs):
+        await asyncio.sleep(delay)
+        return value
+    return fn
+
+
+@pytest.mark.asyncio
+async def test_independent_steps_run_concurrently():
+    """Two steps that share only upstream inputs overlap in time."""
+    graph = StepGraph([
+        Step("a", ("seed",), ("x",), _sleeper(0.01, 1)),
+        Step("b", ("x",), ("y",), _sleeper(0.1, 2)),
+        Step("c", ("x",), ("z",), _sleeper(0.1, 3)),
+        Step("d", ("y", "z"), ("w", "v"), _sleeper(0.01, (4, 5))),
+    ])
+    values = {"seed": 0}
+    report = await graph.run(values)
+
+    assert values == {"seed": 0, "x": 1, "y": 2, "z": 3, "w": 4, "v": 5}
+    assert report.timings["c"].started < report.timings["b"].finished
+    assert report.wall_time < 0.2
+
+
+@pytest.mark.asyncio
+async def test_critical_path_follows_slowest_chain():
+    graph = StepGraph([
+        Step("a", ("seed",), ("x",), _sleeper(0.01, 1)),
+        Step("fast", ("x",), ("y",), _sleeper(0.01, 2)),
+        Step("slow", ("x",), ("z",), _sleeper(0.08, 3)),
+        Step("end", ("y",), ("w",), _sleeper(0.01, 4)),
+    ])
+    report = await graph.run({"seed": 0})
+    assert report.critical_path == ["a", "slow"]
+
+
+@pytest.mark.asyncio
+async def test_failure_cancels_in_flight_steps():
+    cancelled = asyncio.Event()
+
+    async def boom(**kwargs):
+        raise RuntimeError("LLM down")
+
+    async def long(**kwargs):
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    graph = StepGraph([
+        Step("a", ("seed",), ("x",), boom),
+        Step("b", ("seed",), ("y",), long),
+    ])
+    with pytest.raises(RuntimeError, match="LLM down"):
+        await graph.run({"seed": 0})
+    assert cancelled.is_set()
+
+
+def test_unsatisfiable_graph_is_rejected():
+    graph = StepGraph([Step("a", ("missing",), ("x",), _sleeper(0, 1))])
+    with pytest.raises(ValueError, match="Unsatisfiable"):
+        graph.validate(["seed"])
+
+
+def test_workflow_graph_is_valid():
+    from services.workflow import WorkflowOrchestrator
+
+    orchestrator = WorkflowOrchestrator()
+    orchestrator.build_graph().validate(["idea_text"])
@@ -0,0 +1,70 @@
+"""Standalone VentureForge worker: runs queued workflow runs outside the API.
+
+Start the API with JOB_RUNNER=worker and run any number of these, on one
+host (sharing the SQLite job queue) or several (with DATABASE_URL set):
+
+    python worker.py --concurrency 4
+
+Progress reaches clients through the storage backend; the API re-reads
+dossiers every ``sse_worker_poll_interval`` seconds for SSE watchers.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import signal
+import sys
+
+# Add project root to path so shared/ is importable
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../.."))
+
+from config import settings
+from app.storage import get_storage_backend
+from services.integrations.llm_client import start_llm_client, close_llm_client
+from services.integrations.neo4j_client import start_neo4j_client, close_neo4j_client
+from services.integrations.tavily_client import close_tavily_client
+from services.jobs import get_job_queue, stop_job_queue
+from services.persistence import flush_all
+
+logging.basicConfig(level=settings.log_level)
+logger = logging.getLogger(__name__)
+
+
+async def run_worker(concurrency: int):
+    """Run jobs until SIGINT/SIGTERM, then hand unfinished ones back to the queue."""
+    storage = get_storage_backend()
+    await storage.initialize()
+    await start_llm_client()
+    await start_neo4j_client()
+    queue = get_job_queue(concurrency=concurrency)
+    await queue.start()
+    logger.info(f"Worker {queue.worker_id} running up to {concurrency} jobs")
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    await stop.wait()
+
+    logger.info(f"Worker {queue.worker_id} shutting down...")
+    await stop_job_queue()
+    await flush_all()
+    await close_llm_client()
+    await close_tavily_client()
+    await close_neo4j_client()
+    await storage.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--concurrency", type=int, default=settings.job_concurrency, help="runs executed at once by this process"
+    )
+    args = parser.parse_args()
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    asyncio.run(run_worker(args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
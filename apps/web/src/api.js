@@ -25,11 +25,11 @@ export const listRuns = async (limit = 20) => {
 }
 
 export const downloadMarkdown = (runId) => {
-  return `${API_URL}/api/runs/${runId}/artifact/report.md`
+  return `${API_URL}/api/runs/${runId}/artifacts/report.md`
 }
 
 export const downloadPDF = (runId) => {
-  return `${API_URL}/api/runs/${runId}/artifact/report.pdf`
+  return `${API_URL}/api/runs/${runId}/artifacts/report.pdf`
 }
 
 export const streamEvents = (runId, onEvent, onError) => {
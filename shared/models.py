@@ -137,6 +137,12 @@ class VentureDossier(BaseModel):
 
 class CreateRunRequest(BaseModel):
     idea_text: str
+    priority: int = Field(0, ge=0)  # higher runs first when backed up; capped at settings.job_max_priority
+
+
+class ForkRunRequest(BaseModel):
+    sections: Dict[str, Any] = {}  # dossier sections to replace, e.g. {"clarification": {...}}
+    priority: int = Field(0, ge=0)  # capped at settings.job_max_priority, as for new runs
 
 
 class RunResponse(BaseModel):